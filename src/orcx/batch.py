@@ -0,0 +1,171 @@
+"""Batch execution of many requests through a bounded worker pool."""
+
+from __future__ import annotations
+
+import json
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from pydantic import BaseModel, Field, ValidationError
+
+from orcx.errors import OrcxError
+from orcx.schema import OrcxRequest, OrcxResponse
+
+DEFAULT_CONCURRENCY = 4
+
+
+class BatchResult(BaseModel):
+    """Outcome of one request in a batch."""
+
+    index: int
+    response: OrcxResponse | None = None
+    error: str | None = None
+    latency: float = 0.0
+
+
+class BatchSummary(BaseModel):
+    """Aggregate usage across a batch."""
+
+    succeeded: int = 0
+    failed: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    cost: float = 0.0
+    latencies: list[float] = Field(default_factory=list)
+    wall_time: float = 0.0
+
+    def add(self, result: BatchResult) -> None:
+        """Fold one result into the totals."""
+        if result.response is None:
+            self.failed += 1
+            return
+
+        self.succeeded += 1
+        self.latencies.append(result.latency)
+        usage = result.response.usage or {}
+        self.prompt_tokens += usage.get("prompt_tokens") or 0
+        self.completion_tokens += usage.get("completion_tokens") or 0
+        self.total_tokens += usage.get("total_tokens") or 0
+        self.cost += result.response.cost or 0.0
+
+    def percentile(self, pct: float) -> float:
+        """Latency percentile (nearest-rank) over successful requests."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+        return ordered[rank]
+
+    def format(self) -> str:
+        """One-line summary in the same style as `--cost` output."""
+        parts = [f"batch: {self.succeeded} ok, {self.failed} failed"]
+        parts.append(
+            f"tokens: {self.total_tokens} (in {self.prompt_tokens}, out {self.completion_tokens})"
+        )
+        if self.cost:
+            parts.append(f"cost: ${self.cost:.6f}")
+        if self.latencies:
+            mean = sum(self.latencies) / len(self.latencies)
+            parts.append(
+                f"latency: mean {mean:.2f}s p50 {self.percentile(50):.2f}s "
+                f"p95 {self.percentile(95):.2f}s max {max(self.latencies):.2f}s"
+            )
+        parts.append(f"wall: {self.wall_time:.2f}s")
+        return f"[{' | '.join(parts)}]"
+
+
+def read_requests(lines: Iterable[str]) -> Iterator[tuple[int, OrcxRequest | str]]:
+    """Parse JSONL lines into requests.
+
+    Yields (index, request) for valid lines and (index, error message) for
+    invalid ones so a single bad line doesn't abort the batch. Blank lines are
+    skipped and don't consume an index.
+    """
+    index = 0
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+            if isinstance(data, str):
+                data = {"prompt": data}
+            request = OrcxRequest.model_validate(data)
+            yield index, request.model_copy(update={"stream": False})
+        except json.JSONDecodeError as e:
+            yield index, f"Invalid JSON: {e}"
+        except ValidationError as e:
+            errors = "; ".join(
+                f"{'.'.join(str(x) for x in err['loc'])}: {err['msg']}" for err in e.errors()
+            )
+            yield index, f"Invalid request: {errors}"
+        index += 1
+
+
+def _execute(
+    index: int, item: OrcxRequest | str, run: Callable[[OrcxRequest], OrcxResponse]
+) -> BatchResult:
+    """Run one request, capturing errors into the result."""
+    if isinstance(item, str):
+        return BatchResult(index=index, error=item)
+
+    start = time.perf_counter()
+    try:
+        response = run(item)
+    except OrcxError as e:
+        return BatchResult(index=index, error=e.message, latency=time.perf_counter() - start)
+    except Exception as e:
+        return BatchResult(index=index, error=str(e), latency=time.perf_counter() - start)
+    return BatchResult(index=index, response=response, latency=time.perf_counter() - start)
+
+
+def run_batch(
+    items: Iterable[tuple[int, OrcxRequest | str]],
+    run: Callable[[OrcxRequest], OrcxResponse] | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    ordered: bool = True,
+) -> Iterator[BatchResult]:
+    """Run requests on a thread pool, yielding results as they become available.
+
+    Input is consumed lazily and at most `2 * concurrency` requests are in
+    flight or buffered at once, so arbitrarily large files run in bounded
+    memory. With `ordered`, results are yielded in input order; otherwise in
+    completion order.
+    """
+    if run is None:
+        from orcx.router import run
+
+    concurrency = max(1, concurrency)
+    window = concurrency * 2
+    source = iter(items)
+    exhausted = False
+    pending: set[Future[BatchResult]] = set()
+    buffered: dict[int, BatchResult] = {}
+    next_index = 0
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="orcx-batch") as pool:
+        while True:
+            while not exhausted and len(pending) + len(buffered) < window:
+                try:
+                    index, item = next(source)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending.add(pool.submit(_execute, index, item, run))
+
+            if not pending:
+                break
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if ordered:
+                    buffered[result.index] = result
+                else:
+                    yield result
+
+            while next_index in buffered:
+                yield buffered.pop(next_index)
+                next_index += 1
@@ -0,0 +1,298 @@
+"""On-disk caches via SQLite: responses, formatted -f files, and their token counts."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from orcx.schema import OrcxResponse
+
+CACHE_PATH = Path.home() / ".config" / "orcx" / "cache.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_accessed ON responses(accessed_at);
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS file_blocks (
+    path TEXT PRIMARY KEY,
+    label TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    block TEXT,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_file_blocks_accessed ON file_blocks(accessed_at);
+CREATE TABLE IF NOT EXISTS file_tokens (
+    path TEXT NOT NULL,
+    model TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    tokens INTEGER NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (path, model)
+);
+CREATE INDEX IF NOT EXISTS idx_file_tokens_accessed ON file_tokens(accessed_at);
+"""
+
+# Drops least recently used entries once the running total exceeds the cap
+EVICT_SQL = """
+DELETE FROM responses WHERE key IN (
+    SELECT key FROM (
+        SELECT key, SUM(size) OVER (ORDER BY accessed_at DESC, key) AS running
+        FROM responses
+    ) WHERE running > ?
+)
+"""
+
+# Formatted file blocks are capped separately from responses (LRU-evicted)
+MAX_BLOCKS_SIZE = 200 * 1024 * 1024
+
+# Token counts are tiny; keep the most recently stored ones
+MAX_TOKEN_COUNTS = 100_000
+
+# SQLite limits bound parameters per statement; look up keys in batches
+_BATCH = 500
+
+BUSY_TIMEOUT = 30.0
+
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+)
+
+_local = threading.local()
+
+
+class CacheStats(BaseModel):
+    """Size and hit/miss counters for the response cache."""
+
+    entries: int = 0
+    size: int = 0
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def make_key(params: dict) -> str:
+    """Canonical hash of litellm params.
+
+    `stream` is left out so blocking and streaming calls share entries.
+    """
+    canonical = {k: v for k, v in params.items() if k != "stream"}
+    payload = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _connect() -> sqlite3.Connection:
+    """Get this thread's cache connection, creating the schema if needed."""
+    key = (str(CACHE_PATH), os.getpid())
+    conn: sqlite3.Connection | None = getattr(_local, "conn", None)
+    if conn is not None and _local.key == key:
+        return conn
+    if conn is not None and _local.key[1] == key[1]:
+        conn.close()
+
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(CACHE_PATH, timeout=BUSY_TIMEOUT)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    with conn:
+        conn.executescript(SCHEMA)
+    _local.conn = conn
+    _local.key = key
+    return conn
+
+
+def close() -> None:
+    """Close this thread's cache connection, if open."""
+    conn: sqlite3.Connection | None = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+
+def _count(conn: sqlite3.Connection, name: str) -> None:
+    conn.execute(
+        "INSERT INTO stats (name, value) VALUES (?, 1) "
+        "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+        (name,),
+    )
+
+
+def get(key: str, ttl: float) -> OrcxResponse | None:
+    """Look up a cached response no older than `ttl` seconds, marking it recently used."""
+    now = time.time()
+    conn = _connect()
+    with conn:
+        row = conn.execute(
+            "SELECT response FROM responses WHERE key = ? AND created_at >= ?",
+            (key, now - ttl),
+        ).fetchone()
+        if row is None:
+            _count(conn, "misses")
+            return None
+        conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        _count(conn, "hits")
+
+    response = OrcxResponse.model_validate_json(row[0])
+    response.cached = True
+    response.cost = 0.0
+    return response
+
+
+def put(key: str, response: OrcxResponse, ttl: float, max_size: int) -> None:
+    """Store a response, then drop expired entries and evict LRU entries over `max_size` bytes."""
+    data = response.model_dump_json(exclude={"cached", "attempts", "retries", "timings"})
+    now = time.time()
+    conn = _connect()
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (key, response, size, created_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (key, data, len(data), now, now),
+        )
+        conn.execute("DELETE FROM responses WHERE created_at < ?", (now - ttl,))
+        conn.execute(EVICT_SQL, (max_size,))
+
+
+def stats() -> CacheStats:
+    """Current entry count, total size in bytes, and lifetime hits/misses."""
+    conn = _connect()
+    entries, size = conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+    ).fetchone()
+    counters = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+    return CacheStats(
+        entries=entries,
+        size=size,
+        hits=counters.get("hits", 0),
+        misses=counters.get("misses", 0),
+    )
+
+
+def clear() -> int:
+    """Delete all cached responses, file blocks and token counts, and reset stats.
+
+    Returns the number of responses deleted.
+    """
+    conn = _connect()
+    with conn:
+        cursor = conn.execute("DELETE FROM responses")
+        conn.execute("DELETE FROM stats")
+        conn.execute("DELETE FROM file_blocks")
+        conn.execute("DELETE FROM file_tokens")
+    return cursor.rowcount
+
+
+def get_blocks(files: list[tuple[str, str, int, int]]) -> dict[str, str | None]:
+    """Look up formatted blocks for (path, label, mtime_ns, size) files.
+
+    Returns {path: block} for files whose label, mtime and size all match;
+    the block is None for files previously found to be binary or not UTF-8.
+    Changed or never-cached files are absent.
+    """
+    conn = _connect()
+    wanted = {path: (label, mtime_ns, size) for path, label, mtime_ns, size in files}
+    paths = list(wanted)
+    found: dict[str, str | None] = {}
+    for i in range(0, len(paths), _BATCH):
+        batch = paths[i : i + _BATCH]
+        rows = conn.execute(
+            "SELECT path, label, mtime_ns, size, block FROM file_blocks "
+            f"WHERE path IN ({','.join('?' * len(batch))})",
+            batch,
+        )
+        for path, label, mtime_ns, size, block in rows:
+            if wanted[path] == (label, mtime_ns, size):
+                found[path] = block
+    if found:
+        now = time.time()
+        with conn:
+            conn.executemany(
+                "UPDATE file_blocks SET accessed_at = ? WHERE path = ?", [(now, p) for p in found]
+            )
+    return found
+
+
+def put_blocks(blocks: list[tuple[str, str, int, int, str | None]]) -> None:
+    """Store (path, label, mtime_ns, size, block) entries, evicting LRU blocks over the cap."""
+    now = time.time()
+    conn = _connect()
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO file_blocks (path, label, mtime_ns, size, block, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(*entry, now) for entry in blocks],
+        )
+        conn.execute(
+            """
+            DELETE FROM file_blocks WHERE path IN (
+                SELECT path FROM (
+                    SELECT path, SUM(COALESCE(LENGTH(block), 0))
+                        OVER (ORDER BY accessed_at DESC, path) AS running
+                    FROM file_blocks
+                ) WHERE running > ?
+            )
+            """,
+            (MAX_BLOCKS_SIZE,),
+        )
+
+
+def get_token_counts(model: str, files: list[tuple[str, int, int]]) -> dict[str, int]:
+    """Look up token counts for (path, mtime_ns, size) files under a model's tokenizer.
+
+    Returns {path: tokens} for files whose mtime and size still match;
+    changed or never-counted files are absent.
+    """
+    conn = _connect()
+    wanted = {path: (mtime_ns, size) for path, mtime_ns, size in files}
+    paths = list(wanted)
+    found: dict[str, int] = {}
+    for i in range(0, len(paths), _BATCH):
+        batch = paths[i : i + _BATCH]
+        rows = conn.execute(
+            "SELECT path, mtime_ns, size, tokens FROM file_tokens "
+            f"WHERE model = ? AND path IN ({','.join('?' * len(batch))})",
+            [model, *batch],
+        )
+        for path, mtime_ns, size, tokens in rows:
+            if wanted[path] == (mtime_ns, size):
+                found[path] = tokens
+    return found
+
+
+def put_token_counts(model: str, counts: list[tuple[str, int, int, int]]) -> None:
+    """Store (path, mtime_ns, size, tokens) counts, keeping the most recently stored entries."""
+    now = time.time()
+    conn = _connect()
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO file_tokens (path, model, mtime_ns, size, tokens, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(path, model, mtime_ns, size, tokens, now) for path, mtime_ns, size, tokens in counts],
+        )
+        conn.execute(
+            "DELETE FROM file_tokens WHERE rowid IN ("
+            "SELECT rowid FROM file_tokens ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (MAX_TOKEN_COUNTS,),
+        )
@@ -2,12 +2,15 @@
 
 from __future__ import annotations
 
+import contextlib
+import json
 import sys
+import time
 import traceback
 from dataclasses import dataclass
 from pathlib import Path
 from types import ModuleType
-from typing import Annotated
+from typing import TYPE_CHECKING, Annotated
 
 import click
 import typer
@@ -18,6 +21,7 @@ from orcx.errors import (
     AgentNotFoundError,
     AuthenticationError,
     ConfigFileError,
+    CostLimitExceededError,
     InvalidModelFormatError,
     MissingApiKeyError,
     NoModelSpecifiedError,
@@ -25,15 +29,21 @@ from orcx.errors import (
     ProviderConnectionError,
     RateLimitError,
 )
-from orcx.registry import load_registry
-from orcx.schema import Conversation, OrcxRequest, OrcxResponse
+
+if TYPE_CHECKING:
+    from orcx.daemon import DaemonClient
+    from orcx.schema import (
+        ContextFile,
+        Conversation,
+        Estimate,
+        OrcxRequest,
+        OrcxResponse,
+        Timings,
+    )
 
 # Global debug flag
 _debug = False
 
-# Maximum file size to read (10 MB)
-MAX_FILE_SIZE = 10 * 1024 * 1024
-
 # Exception type to exit code mapping
 _EXIT_CODES: dict[type[OrcxError], int] = {
     MissingApiKeyError: 2,
@@ -44,6 +54,7 @@ _EXIT_CODES: dict[type[OrcxError], int] = {
     InvalidModelFormatError: 5,
     NoModelSpecifiedError: 5,
     ConfigFileError: 6,
+    CostLimitExceededError: 7,
 }
 
 
@@ -64,6 +75,11 @@ class RunOptions:
     no_stream: bool = False
     show_cost: bool = False
     json_out: bool = False
+    cache: bool | None = None
+    cache_prefix: bool = False
+    estimate: bool = False
+    max_cost: float | None = None
+    timings: bool = False
 
 
 def version_callback(value: bool) -> None:
@@ -105,7 +121,9 @@ def main(
     ] = False,
     debug: Annotated[
         bool,
-        typer.Option("--debug", "-d", help="Show full tracebacks on error"),
+        typer.Option(
+            "--debug", "-d", help="Show full tracebacks on error and HTTP connection stats"
+        ),
     ] = False,
 ) -> None:
     """LLM orchestrator - route prompts to any model.
@@ -142,31 +160,29 @@ def _handle_error(e: Exception) -> None:
     raise typer.Exit(1) from None
 
 
-def _read_files(paths: list[str]) -> str:
-    """Read and format file contents for context."""
-    parts = []
-    for path_str in paths:
-        path = Path(path_str)
-        if not path.exists():
-            typer.echo(f"Error: File not found: {path_str}", err=True)
-            raise typer.Exit(1)
-        if not path.is_file():
-            typer.echo(f"Error: Not a file: {path_str}", err=True)
-            raise typer.Exit(1)
-        try:
-            file_size = path.stat().st_size
-            if file_size > MAX_FILE_SIZE:
-                typer.echo(
-                    f"Error: File too large: {path_str} ({file_size // 1024 // 1024}MB > 10MB)",
-                    err=True,
-                )
-                raise typer.Exit(1)
-            content = path.read_text()
-            parts.append(f"# {path.name}\n```\n{content}\n```")
-        except OSError as e:
-            typer.echo(f"Error reading {path_str}: {e}", err=True)
-            raise typer.Exit(1) from e
-    return "\n\n".join(parts)
+def _show_pool_stats() -> None:
+    """With --debug, report connection reuse for provider calls made in-process."""
+    if not _debug or "orcx.pool" not in sys.modules:
+        return
+    from orcx import pool
+
+    stats = pool.stats()
+    if stats.requests:
+        typer.echo(str(stats), err=True)
+
+
+def _read_files(paths: list[str], prefix: str | None = None) -> tuple[str, list[ContextFile]]:
+    """Read and format file contents for context, after an optional prefix."""
+    from orcx.config import CacheConfig, load_config
+    from orcx.context import load_context
+    from orcx.errors import ContextError
+
+    use_cache = (load_config().cache or CacheConfig()).files
+    try:
+        return load_context(paths, prefix=prefix, use_cache=use_cache)
+    except ContextError as e:
+        typer.echo(f"Error: {e.message}", err=True)
+        raise typer.Exit(1) from None
 
 
 def _validate_prompt(prompt: str | None) -> str:
@@ -217,18 +233,32 @@ def _execute_streaming(
     request: OrcxRequest,
     history: list[dict[str, str]],
     output: str | None,
+    show_cost: bool,
+    cache: bool | None,
     router: ModuleType,
-) -> str:
-    """Execute request with streaming output. Returns response content."""
-    chunks = []
-    for chunk in router.run_stream(request, history=history):
-        chunks.append(chunk)
-        typer.echo(chunk, nl=False)
+    client: DaemonClient | None = None,
+) -> tuple[str, OrcxResponse | None]:
+    """Execute request with streaming output. Returns (content, response).
+
+    Output is coalesced and written to the terminal and `output` as it arrives.
+    The response, with usage and cost, is only available once the stream ends.
+    With a daemon `client`, the request runs there instead of in-process.
+    """
+    from orcx.errors import OutputError
+    from orcx.stream import StreamSink
+
+    try:
+        with StreamSink(lambda text: typer.echo(text, nl=False), output) as sink:
+            stream = (client or router).run_stream(request, history=history, cache=cache)
+            for chunk in stream:
+                sink.write(chunk)
+    except OutputError as e:
+        typer.echo(e.message, err=True)
+        raise typer.Exit(1) from None
     typer.echo()
-    response_content = "".join(chunks)
-    if output:
-        _write_output(output, response_content)
-    return response_content
+    if show_cost and stream.response is not None:
+        _show_cost_info(request, stream.response, router)
+    return sink.content, stream.response
 
 
 def _execute_blocking(
@@ -237,31 +267,56 @@ def _execute_blocking(
     output: str | None,
     json_out: bool,
     show_cost: bool,
+    cache: bool | None,
     router: ModuleType,
+    client: DaemonClient | None = None,
 ) -> tuple[str, OrcxResponse]:
-    """Execute request without streaming. Returns (content, response)."""
-    response = router.run(request, history=history)
-    content = response.model_dump_json(indent=2) if json_out else response.content
-    typer.echo(content)
+    """Execute request without streaming. Returns (content, response).
+
+    With `json_out` nothing is printed yet: the caller prints the JSON once the
+    response's timings include saving it.
+    """
+    response = (client or router).run(request, history=history, cache=cache)
+    if not json_out:
+        _print_response(request, response, response.content, output, show_cost, router)
+    return response.content, response
+
+
+def _print_response(
+    request: OrcxRequest,
+    response: OrcxResponse,
+    text: str,
+    output: str | None,
+    show_cost: bool,
+    router: ModuleType,
+) -> None:
+    """Print a blocking response's text (or JSON), write it to `output`, and show cost."""
+    typer.echo(text)
     if output:
-        _write_output(output, content)
+        _write_output(output, text)
     if show_cost:
         _show_cost_info(request, response, router)
-    return response.content, response
 
 
 def _run_prompt(opts: RunOptions) -> None:
     """Core prompt execution logic shared by run command and direct invocation."""
-    from orcx import conversation, router
+    from orcx import conversation, daemon, router
+    from orcx.config import load_config
+    from orcx.schema import OrcxRequest
 
     prompt = _validate_prompt(opts.prompt)
+    started = time.perf_counter()
+    try:
+        load_config()
+    except Exception as e:
+        _handle_error(e)
+    config_time = time.perf_counter() - started
     conv = _load_conversation(opts.resume, opts.continue_last, conversation)
 
     # Build context from files
-    context = opts.context
-    if opts.files:
-        file_context = _read_files(opts.files)
-        context = f"{context}\n\n{file_context}" if context else file_context
+    context, context_files = (
+        _read_files(opts.files, prefix=opts.context) if opts.files else (opts.context, None)
+    )
 
     request = OrcxRequest(
         prompt=prompt,
@@ -269,6 +324,8 @@ def _run_prompt(opts: RunOptions) -> None:
         model=opts.model if not conv else (opts.model or conv.model),
         system_prompt=opts.system,
         context=context,
+        context_files=context_files,
+        cache_prefix=opts.cache_prefix,
         stream=not opts.no_stream and not opts.json_out,
     )
 
@@ -276,16 +333,46 @@ def _run_prompt(opts: RunOptions) -> None:
     history = [{"role": m.role, "content": m.content} for m in conv.messages] if conv else []
 
     try:
+        if opts.estimate or opts.max_cost is not None:
+            estimate = router.estimate(request, history=history)
+            if opts.estimate:
+                _show_estimate(estimate, opts.json_out)
+                return
+            _check_cost_limit(estimate, opts.max_cost)
+
+        client = daemon.connect()
         if request.stream:
-            response_content = _execute_streaming(request, history, opts.output, router)
-            response = None
+            response_content, response = _execute_streaming(
+                request, history, opts.output, opts.show_cost, opts.cache, router, client
+            )
         else:
             response_content, response = _execute_blocking(
-                request, history, opts.output, opts.json_out, opts.show_cost, router
+                request,
+                history,
+                opts.output,
+                opts.json_out,
+                opts.show_cost,
+                opts.cache,
+                router,
+                client,
             )
 
+        timings = response.timings if response else None
+        if timings is not None:
+            timings.config = config_time
+            timings.total = time.perf_counter() - started
         if not opts.no_save:
+            saving = time.perf_counter()
             _save_conversation(conv, request, prompt, response_content, response, conversation)
+            if timings is not None:
+                timings.save = time.perf_counter() - saving
+
+        if opts.json_out:
+            text = response.model_dump_json(indent=2)
+            _print_response(request, response, text, opts.output, opts.show_cost, router)
+        if opts.timings and timings is not None:
+            _show_timings(timings)
+        _show_pool_stats()
     except Exception as e:
         _handle_error(e)
 
@@ -299,7 +386,7 @@ def run(
     context: str = typer.Option(None, "--context", help="Context to prepend"),
     files: Annotated[
         list[str] | None,
-        typer.Option("--file", "-f", help="Files to include"),
+        typer.Option("--file", "-f", help="Files, directories or globs to include"),
     ] = None,
     output: str = typer.Option(None, "--output", "-o", help="Write response to file"),
     continue_last: bool = typer.Option(
@@ -310,6 +397,21 @@ def run(
     no_stream: bool = typer.Option(False, "--no-stream", help="Disable streaming"),
     show_cost: bool = typer.Option(False, "--cost", help="Show cost after response"),
     json_out: bool = typer.Option(False, "--json", "-j", help="Output as JSON"),
+    cache: bool = typer.Option(
+        None, "--cache/--no-cache", help="Reuse cached responses (default: config cache.enabled)"
+    ),
+    cache_prefix: bool = typer.Option(
+        False, "--cache-prefix", help="Ask the provider to cache the system prompt and context"
+    ),
+    estimate: bool = typer.Option(
+        False, "--estimate", help="Show input tokens and cost without sending"
+    ),
+    max_cost: float = typer.Option(
+        None, "--max-cost", min=0, help="Refuse if estimated input cost exceeds this (USD)"
+    ),
+    timings: bool = typer.Option(
+        False, "--timings", help="Show where the time went (phases, TTFT, tokens/sec)"
+    ),
 ) -> None:
     """Run a prompt against an agent or model."""
     _run_prompt(
@@ -327,10 +429,61 @@ def run(
             no_stream=no_stream,
             show_cost=show_cost,
             json_out=json_out,
+            cache=cache,
+            cache_prefix=cache_prefix,
+            estimate=estimate,
+            max_cost=max_cost,
+            timings=timings,
         )
     )
 
 
+def _show_estimate(estimate: Estimate, json_out: bool) -> None:
+    """Print a pre-flight estimate."""
+    if json_out:
+        typer.echo(estimate.model_dump_json(indent=2))
+        return
+
+    typer.echo(f"Model: {estimate.model}")
+    typer.echo(f"Input tokens: {estimate.input_tokens:,}")
+    if estimate.input_cost is not None:
+        typer.echo(f"Input cost: ${estimate.input_cost:.6f}")
+    else:
+        typer.echo("Input cost: unknown")
+    if estimate.context_window:
+        typer.echo(
+            f"Context: {estimate.input_tokens:,} / {estimate.context_window:,} "
+            f"({estimate.remaining_tokens:,} remaining)"
+        )
+
+
+def _check_cost_limit(estimate: Estimate, max_cost: float | None) -> None:
+    """Raise if the estimated input cost exceeds `max_cost`."""
+    if max_cost is None:
+        return
+    if estimate.input_cost is None:
+        typer.echo(f"Warning: no pricing for {estimate.model}; --max-cost not enforced", err=True)
+        return
+    if estimate.input_cost > max_cost:
+        raise CostLimitExceededError(estimate.input_cost, max_cost)
+
+
+def _format_seconds(seconds: float) -> str:
+    return f"{seconds * 1000:.0f}ms" if seconds < 1 else f"{seconds:.2f}s"
+
+
+def _show_timings(timings: Timings) -> None:
+    """Show per-phase timings and output tokens/sec on stderr."""
+    parts = [
+        f"{phase} {_format_seconds(seconds)}"
+        for phase, seconds in timings.model_dump(exclude={"tokens_per_second"}).items()
+        if seconds is not None
+    ]
+    if timings.tokens_per_second:
+        parts.append(f"{timings.tokens_per_second:.1f} tok/s")
+    typer.echo(f"[{' | '.join(parts)}]", err=True)
+
+
 def _show_cost_info(request: OrcxRequest, response: OrcxResponse, router: ModuleType) -> None:
     """Show cost and provider prefs info."""
     parts = []
@@ -339,11 +492,17 @@ def _show_cost_info(request: OrcxRequest, response: OrcxResponse, router: Module
     if response.usage:
         tokens = response.usage.get("total_tokens", 0)
         parts.append(f"model: {response.model} | tokens: {tokens}")
+        cache_read = response.usage.get("cache_read_tokens")
+        cache_write = response.usage.get("cache_write_tokens")
+        if cache_read or cache_write:
+            parts.append(f"prompt cache: {cache_read or 0} read, {cache_write or 0} written")
     else:
         parts.append(f"model: {response.model}")
 
     # Cost
-    if response.cost:
+    if response.cached:
+        parts.append("cached")
+    elif response.cost:
         parts.append(f"cost: ${response.cost:.6f}")
 
     # Provider prefs (only for openrouter)
@@ -379,8 +538,6 @@ def _save_conversation(
     conversation: ModuleType,
 ) -> None:
     """Save or update conversation after exchange."""
-    from orcx.schema import Message
-
     if conv is None:
         # Resolve model for new conversation
         from orcx.router import resolve_model
@@ -391,25 +548,80 @@ def _save_conversation(
             resolved_model = request.model or "unknown"
         conv = conversation.create(model=resolved_model, agent=request.agent)
 
-    conv.messages.append(Message(role="user", content=prompt))
-    conv.messages.append(Message(role="assistant", content=response_content))
-
-    if response and response.usage:
-        conv.total_tokens += response.usage.get("total_tokens", 0)
-    if response and response.cost:
-        conv.total_cost += response.cost
+    messages = conversation.exchange(prompt, response_content, response)
 
     # Set title from first prompt if not set
     if not conv.title:
         conv.title = prompt[:50] + "..." if len(prompt) > 50 else prompt
 
-    conversation.update(conv)
+    conversation.append(conv, messages)
     typer.echo(f"[{conv.id}]", err=True)
 
 
+@app.command()
+def batch(
+    input_file: str = typer.Argument(..., help="JSONL file of requests ('-' for stdin)"),
+    concurrency: int = typer.Option(
+        4, "--concurrency", "-n", min=1, help="Maximum requests in flight"
+    ),
+    unordered: bool = typer.Option(
+        False, "--unordered", help="Emit results as they complete instead of input order"
+    ),
+    output: str = typer.Option(None, "--output", "-o", help="Write results JSONL to file"),
+    cache: bool = typer.Option(
+        None, "--cache/--no-cache", help="Reuse cached responses (default: config cache.enabled)"
+    ),
+) -> None:
+    """Run a JSONL file of requests concurrently, emitting results as JSONL.
+
+    Each line is an OrcxRequest object (or a bare JSON string prompt).
+    """
+    from functools import partial
+
+    from orcx import daemon, router
+    from orcx.batch import BatchSummary, read_requests, run_batch
+
+    summary = BatchSummary()
+    start = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        try:
+            source = (
+                sys.stdin if input_file == "-" else stack.enter_context(Path(input_file).open())
+            )
+        except OSError as e:
+            typer.echo(f"Error reading {input_file}: {e}", err=True)
+            raise typer.Exit(1) from e
+        try:
+            sink = stack.enter_context(Path(output).open("w")) if output else sys.stdout
+        except OSError as e:
+            typer.echo(f"Error writing to {output}: {e}", err=True)
+            raise typer.Exit(1) from e
+
+        try:
+            for result in run_batch(
+                read_requests(source),
+                run=partial((daemon.connect() or router).run, cache=cache),
+                concurrency=concurrency,
+                ordered=not unordered,
+            ):
+                summary.add(result)
+                sink.write(result.model_dump_json(exclude_none=True) + "\n")
+                sink.flush()
+        except Exception as e:
+            _handle_error(e)
+
+    summary.wall_time = time.perf_counter() - start
+    typer.echo(summary.format(), err=True)
+    _show_pool_stats()
+    if summary.failed:
+        raise typer.Exit(1)
+
+
 @app.command()
 def agents() -> None:
     """List configured agents."""
+    from orcx.registry import load_registry
+
     try:
         registry = load_registry()
     except Exception as e:
@@ -447,20 +659,132 @@ def models() -> None:
     typer.echo("  https://docs.litellm.ai/docs/providers")
 
 
+@app.command("serve-local")
+def serve_local(
+    socket_path: str = typer.Option(
+        None, "--socket", help="Unix socket path (default: ~/.config/orcx/orcx.sock)"
+    ),
+) -> None:
+    """Keep a warm router running; other orcx commands forward requests to it.
+
+    Commands run in-process as usual whenever no daemon is listening.
+    Forwarded requests use the daemon's environment, not the caller's: API
+    keys and other provider variables (e.g. OPENAI_API_KEY, OPENAI_API_BASE)
+    must be set where the daemon is started, and changing them needs a
+    restart. Config and agent files are re-read when they change.
+    """
+    from orcx import daemon
+
+    path = Path(socket_path) if socket_path else daemon.SOCKET_PATH
+    try:
+        daemon.serve(path, on_ready=lambda p: typer.echo(f"orcx daemon listening on {p}", err=True))
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        _handle_error(e)
+
+
+@app.command()
+def gateway(
+    host: str = typer.Option("127.0.0.1", "--host", help="Interface to listen on"),
+    port: int = typer.Option(8642, "--port", "-p", help="Port to listen on"),
+    no_save: bool = typer.Option(False, "--no-save", help="Don't log exchanges as conversations"),
+) -> None:
+    """Serve an OpenAI-compatible API (/v1/chat/completions, /v1/models) over orcx.
+
+    The request's `model` may be an agent, an alias or a provider/model.
+    """
+    from orcx import gateway as http_gateway
+
+    def ready(bound_host: str, bound_port: int) -> None:
+        typer.echo(f"orcx gateway listening on http://{bound_host}:{bound_port}/v1", err=True)
+
+    try:
+        http_gateway.serve(host, port, save=not no_save, on_ready=ready)
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        _handle_error(e)
+
+
+@app.command()
+def stats(
+    by: str = typer.Option(
+        "model",
+        "--by",
+        "-b",
+        click_type=click.Choice(["model", "agent", "provider", "day"]),
+        help="Group replies by model, agent, provider or day (UTC)",
+    ),
+    days: int = typer.Option(7, "--days", min=1, help="Only the last N days"),
+    all_time: bool = typer.Option(False, "--all", help="Include all stored replies"),
+    json_out: bool = typer.Option(False, "--json", "-j", help="Output as JSON"),
+) -> None:
+    """Show spend, tokens and latency percentiles from saved conversations."""
+    from orcx import conversation
+
+    rows = conversation.usage_stats(by=by, days=None if all_time else days)
+    if json_out:
+        typer.echo(json.dumps([row.model_dump() for row in rows], indent=2))
+        return
+    if not rows:
+        typer.echo("No replies in this window.")
+        return
+
+    def seconds(value: float | None) -> str:
+        return _format_seconds(value) if value is not None else "-"
+
+    typer.echo(
+        f"{by:<30}  {'reqs':>5}  {'in tok':>9}  {'out tok':>9}  {'cost':>10}  "
+        f"{'p50':>6}  {'p95':>6}  {'p99':>6}  {'ttft50':>6}  {'ttft95':>6}  {'tok/s':>6}"
+    )
+    for row in rows:
+        rate = f"{row.tokens_per_second:.1f}" if row.tokens_per_second else "-"
+        typer.echo(
+            f"{row.key[:30]:<30}  {row.requests:>5}  {row.input_tokens:>9,}  "
+            f"{row.output_tokens:>9,}  {f'${row.cost:.4f}':>10}  "
+            f"{seconds(row.latency_p50):>6}  {seconds(row.latency_p95):>6}  "
+            f"{seconds(row.latency_p99):>6}  {seconds(row.ttft_p50):>6}  "
+            f"{seconds(row.ttft_p95):>6}  {rate:>6}"
+        )
+
+
 # Conversations subcommand group
 conversations_app = typer.Typer(help="Manage conversations")
 app.add_typer(conversations_app, name="conversations")
 
 
 @conversations_app.callback(invoke_without_command=True)
-def conversations_list(ctx: typer.Context) -> None:
+def conversations_list(
+    ctx: typer.Context,
+    limit: int = typer.Option(20, "--limit", "-n", min=1, help="Number to show"),
+    offset: int = typer.Option(0, "--offset", min=0, help="Skip the N most recent"),
+    before: str = typer.Option(
+        None,
+        "--before",
+        help="Continue from a 'More:' cursor, or list those updated before a timestamp",
+    ),
+    model: str = typer.Option(None, "--model", "-m", help="Filter by model (substring)"),
+    agent: str = typer.Option(None, "--agent", "-a", help="Filter by agent"),
+) -> None:
     """List recent conversations."""
     if ctx.invoked_subcommand is not None:
         return
 
     from orcx import conversation
 
-    convs = conversation.list_recent()
+    # A cursor is "updated_at,id"; a bare timestamp also works
+    before, _, before_id = (before or "").partition(",")
+    convs = conversation.list_summaries(
+        limit=limit + 1,
+        offset=offset,
+        before=before or None,
+        before_id=before_id or None,
+        model=model,
+        agent=agent,
+    )
+    more = len(convs) > limit
+    convs = convs[:limit]
     if not convs:
         typer.echo("No conversations.")
         return
@@ -474,6 +798,9 @@ def conversations_list(ctx: typer.Context) -> None:
         model_display = conv.model[:30] if len(conv.model) > 30 else conv.model
         typer.echo(f"{conv.id}  {model_display:<30}  {title}{info}")
 
+    if more:
+        typer.echo(f"More: --before {convs[-1].updated_at},{convs[-1].id}", err=True)
+
 
 @conversations_app.command("show")
 def conversations_show(conv_id: str = typer.Argument(..., help="Conversation ID")) -> None:
@@ -504,6 +831,34 @@ def conversations_show(conv_id: str = typer.Argument(..., help="Conversation ID"
         typer.echo()
 
 
+@conversations_app.command("search")
+def conversations_search(
+    query: str = typer.Argument(..., help="Words to search for"),
+    limit: int = typer.Option(20, "--limit", "-n", min=1, help="Maximum results"),
+    raw: bool = typer.Option(False, "--raw", help="Use FTS5 query syntax (OR, NEAR, prefix*)"),
+) -> None:
+    """Search conversation messages and titles."""
+    from orcx import conversation
+
+    try:
+        matches = conversation.search(query, limit=limit, raw=raw)
+    except (ValueError, RuntimeError) as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1) from None
+
+    if not matches:
+        typer.echo("No matches.")
+        return
+
+    for match in matches:
+        title = match.title or "(no title)"
+        title = title[:40] + "..." if len(title) > 40 else title
+        model_display = match.model[:30] if len(match.model) > 30 else match.model
+        typer.echo(f"{match.id}  {model_display:<30}  {title}")
+        snippet = " ".join(match.snippet.split())
+        typer.echo(f"      {match.role}: {snippet}")
+
+
 @conversations_app.command("delete")
 def conversations_delete(conv_id: str = typer.Argument(..., help="Conversation ID")) -> None:
     """Delete a conversation."""
@@ -527,5 +882,32 @@ def conversations_clean(
     typer.echo(f"Deleted {count} conversation(s) older than {days} days")
 
 
+# Response cache subcommand group
+cache_app = typer.Typer(help="Manage the response cache")
+app.add_typer(cache_app, name="cache")
+
+
+@cache_app.command("stats")
+def cache_stats() -> None:
+    """Show response cache size and hit rate."""
+    from orcx import cache
+
+    stats = cache.stats()
+    typer.echo(f"Entries: {stats.entries}")
+    typer.echo(f"Size: {stats.size / 1024:.1f} KB")
+    typer.echo(f"Hits: {stats.hits}")
+    typer.echo(f"Misses: {stats.misses}")
+    typer.echo(f"Hit rate: {stats.hit_rate:.1%}")
+
+
+@cache_app.command("clear")
+def cache_clear() -> None:
+    """Delete all cached responses and reset stats."""
+    from orcx import cache
+
+    count = cache.clear()
+    typer.echo(f"Deleted {count} cached response(s)")
+
+
 if __name__ == "__main__":
     app()
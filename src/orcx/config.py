@@ -2,19 +2,30 @@
 
 from __future__ import annotations
 
+import contextlib
+import json
 import os
+import sys
+import tempfile
+from collections.abc import Callable
 from pathlib import Path
+from typing import Any, TypeVar
 
-import yaml
 from pydantic import BaseModel, Field, ValidationError
 
+from orcx import __version__
 from orcx.errors import ConfigFileError
-from orcx.schema import ProviderPrefs
+from orcx.schema import HistoryPolicy, ProviderPrefs, RetryPolicy
 
 CONFIG_DIR = Path.home() / ".config" / "orcx"
 CONFIG_FILE = CONFIG_DIR / "config.yaml"
 AGENTS_FILE = CONFIG_DIR / "agents.yaml"
 
+M = TypeVar("M", bound=BaseModel)  # PEP 695 syntax needs 3.12; we support 3.11
+
+# Parsed config files keyed by path: (signature when parsed, parsed value)
+_file_cache: dict[Path, tuple[tuple[int, int] | None, Any]] = {}
+
 
 class ProviderKeys(BaseModel):
     """API keys for LLM providers."""
@@ -29,12 +40,36 @@ class ProviderKeys(BaseModel):
     openrouter: str | None = None
 
 
+class CacheConfig(BaseModel):
+    """On-disk response cache settings."""
+
+    enabled: bool = False  # opt-in; --cache/--no-cache override per run
+    ttl: float = Field(default=24 * 60 * 60, gt=0)  # seconds
+    max_size: int = Field(default=100 * 1024 * 1024, gt=0)  # bytes, LRU-evicted
+    files: bool = True  # reuse formatted blocks and token counts of unchanged -f files
+
+
+class HttpConfig(BaseModel):
+    """Shared HTTP connection pool settings for provider calls."""
+
+    max_connections: int = Field(default=100, gt=0)
+    max_keepalive_connections: int = Field(default=20, ge=0)
+    keepalive_expiry: float = Field(default=60.0, ge=0)  # seconds an idle connection is kept
+    http2: bool = False  # opt-in; also needs the `h2` package
+    connect_timeout: float = Field(default=10.0, gt=0)  # seconds
+    timeout: float = Field(default=600.0, gt=0)  # seconds; read/write/pool
+
+
 class OrcxConfig(BaseModel):
     """Root configuration for orcx."""
 
     default_agent: str | None = None
     default_model: str | None = None
     default_provider_prefs: ProviderPrefs | None = None
+    retry: RetryPolicy | None = None
+    history: HistoryPolicy | None = None
+    cache: CacheConfig | None = None
+    http: HttpConfig | None = None
     keys: ProviderKeys = Field(default_factory=ProviderKeys)
     aliases: dict[str, str] = Field(default_factory=dict)
 
@@ -51,8 +86,132 @@ ENV_KEY_MAP: dict[str, str] = {
 }
 
 
-def load_config() -> OrcxConfig:
-    """Load config from file, with env var overrides for API keys."""
+def _file_signature(path: Path) -> tuple[int, int] | None:
+    """Return (mtime_ns, size) for a file, or None if it doesn't exist."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def snapshot_path(path: Path) -> Path:
+    """Compiled JSON snapshot stored next to a YAML config file."""
+    return path.with_suffix(".snapshot.json")
+
+
+def _read_snapshot(  # noqa: UP047
+    path: Path, signature: tuple[int, int], model: type[M]
+) -> tuple[M, list[str]] | None:
+    """Load a snapshot and its warnings if it was compiled from the current file by this version."""
+    try:
+        raw = json.loads(snapshot_path(path).read_bytes())
+    except (OSError, ValueError):
+        return None
+    if (
+        not isinstance(raw, dict)
+        or raw.get("version") != __version__
+        or raw.get("source") != list(signature)
+    ):
+        return None
+    try:
+        return model.model_validate(raw.get("data")), [str(w) for w in raw.get("warnings") or []]
+    except ValidationError:
+        return None
+
+
+def write_snapshot(
+    path: Path,
+    value: BaseModel,
+    warnings: list[str] | None = None,
+    signature: tuple[int, int] | None = None,
+) -> None:
+    """Compile a parsed config file and its warnings to JSON, tagged with the file's signature.
+
+    Pass the `signature` taken before the file was read, so an edit made
+    while parsing leaves the snapshot stale rather than wrong; without it the
+    file's current signature is used. Written atomically with owner-only
+    permissions (config may hold API keys). Failures are ignored; the
+    snapshot is only an optimization.
+    """
+    signature = signature or _file_signature(path)
+    if signature is None:
+        return
+    payload = {
+        "version": __version__,
+        "source": list(signature),
+        "data": value.model_dump(mode="json"),
+        "warnings": warnings or [],
+    }
+    target = snapshot_path(path)
+    with contextlib.suppress(OSError):
+        fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(payload, f, separators=(",", ":"))
+            os.replace(tmp, target)
+        except OSError:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+
+def load_cached(  # noqa: UP047
+    path: Path,
+    model: type[M],
+    parse: Callable[[], tuple[M, list[str]]],
+    refresh: bool = False,
+) -> M:
+    """Load a config file once per process, re-loading when its mtime or size changes.
+
+    On a cache miss the compiled JSON snapshot is tried before falling back to
+    `parse` (YAML + validation, returning the value and its warnings), which
+    then refreshes the snapshot. Warnings are printed on every cache miss,
+    whether the value came from YAML or the snapshot. `refresh` bypasses both
+    caches. Callers must not mutate the returned value; copy it first.
+    """
+    signature = _file_signature(path)
+    cached = _file_cache.get(path)
+    if cached is not None and not refresh and cached[0] == signature:
+        return cached[1]
+
+    loaded = None
+    if signature is not None and not refresh:
+        loaded = _read_snapshot(path, signature, model)
+    if loaded is None:
+        loaded = parse()
+        if signature is not None:
+            write_snapshot(path, *loaded, signature=signature)
+
+    value, warnings = loaded
+    for warning in warnings:
+        print(f"Warning: {warning}", file=sys.stderr)
+    _file_cache[path] = (signature, value)
+    return value
+
+
+def clear_cache(path: Path | None = None) -> None:
+    """Drop a parsed config file (or all of them) so the next load re-reads it."""
+    if path is None:
+        _file_cache.clear()
+    else:
+        _file_cache.pop(path, None)
+
+
+def load_config(refresh: bool = False) -> OrcxConfig:
+    """Load config from file, with env var overrides for API keys.
+
+    The file is parsed once per process and re-read when it changes on disk.
+    Pass `refresh=True` to force a re-read.
+    """
+    config = load_cached(CONFIG_FILE, OrcxConfig, _parse_config_file, refresh).model_copy(deep=True)
+    config.keys = _resolve_keys(config.keys)
+    return config
+
+
+def _parse_config_file() -> tuple[OrcxConfig, list[str]]:
+    """Read and validate config.yaml. Returns the config and its provider pref warnings."""
+    import yaml
+
     config = OrcxConfig()
 
     if CONFIG_FILE.exists():
@@ -85,20 +244,16 @@ def load_config() -> OrcxConfig:
                 details=errors,
             ) from e
 
-    config.keys = _resolve_keys(config.keys)
-
-    # Validate provider prefs and print warnings
-    if config.default_provider_prefs:
-        import sys
+    return config, _config_warnings(config)
 
-        from orcx.schema import validate_provider_prefs
 
-        for warning in validate_provider_prefs(
-            config.default_provider_prefs, "default_provider_prefs"
-        ):
-            print(f"Warning: {warning}", file=sys.stderr)
+def _config_warnings(config: OrcxConfig) -> list[str]:
+    """Problems worth printing (but not failing on) in a parsed config."""
+    if not config.default_provider_prefs:
+        return []
+    from orcx.schema import validate_provider_prefs
 
-    return config
+    return validate_provider_prefs(config.default_provider_prefs, "default_provider_prefs")
 
 
 def _resolve_keys(file_keys: ProviderKeys) -> ProviderKeys:
@@ -125,6 +280,10 @@ def ensure_config_dir() -> Path:
 
 def save_config(config: OrcxConfig) -> None:
     """Save config to file."""
+    import yaml
+
     ensure_config_dir()
     with CONFIG_FILE.open("w") as f:
         yaml.safe_dump(config.model_dump(exclude_none=True), f, default_flow_style=False)
+    clear_cache(CONFIG_FILE)
+    write_snapshot(CONFIG_FILE, config, _config_warnings(config))
@@ -0,0 +1,268 @@
+"""Build prompt context from files, directories and globs."""
+
+from __future__ import annotations
+
+import codecs
+import glob
+import io
+import itertools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+from orcx.errors import ContextError
+from orcx.ignore import GitIgnore
+from orcx.schema import ContextFile
+
+# Maximum size of a single file (10 MB)
+MAX_FILE_SIZE = 10 * 1024 * 1024
+
+# Maximum combined size of all files in one request (20 MB)
+MAX_CONTEXT_SIZE = 20 * 1024 * 1024
+
+# Files are decoded in chunks of this size; the first chunk is sniffed for binary content
+CHUNK_SIZE = 64 * 1024
+
+# Threads used to read files when more than one is included
+READ_WORKERS = 8
+
+_GLOB_CHARS = frozenset("*?[")
+
+
+class _Source(NamedTuple):
+    path: Path
+    label: str  # shown in the block header
+    explicit: bool  # named directly: problems are errors rather than skips
+
+
+def _has_magic(text: str) -> bool:
+    return any(c in _GLOB_CHARS for c in text)
+
+
+def _is_glob(path_str: str) -> bool:
+    return _has_magic(path_str) and not Path(path_str).exists()
+
+
+def _sort_key(path: Path) -> tuple[str, ...]:
+    return path.parts
+
+
+def _expand_dir(path_str: str) -> list[_Source]:
+    """All files under a directory, minus ignored ones, in path order."""
+    top = Path(path_str)
+    ignore = GitIgnore(top)
+    files = []
+    for dirpath, dirnames, filenames in os.walk(top):
+        directory = Path(dirpath)
+        dirnames[:] = [n for n in dirnames if not ignore.ignored(directory / n, is_dir=True)]
+        files.extend(
+            directory / n for n in filenames if not ignore.ignored(directory / n, is_dir=False)
+        )
+    files.sort(key=_sort_key)
+    return [_Source(p, p.as_posix(), False) for p in files]
+
+
+def _expand_glob(pattern: str) -> list[_Source]:
+    """Files matching a glob (`**` recurses), minus ignored ones, in path order."""
+    literal = list(itertools.takewhile(lambda part: not _has_magic(part), Path(pattern).parts))
+    ignore = GitIgnore(Path(*literal) if literal else Path("."))
+    files = [
+        p
+        for p in map(Path, glob.glob(pattern, recursive=True))
+        if p.is_file() and not ignore.ignored(p, is_dir=False)
+    ]
+    files.sort(key=_sort_key)
+    return [_Source(p, p.as_posix(), False) for p in files]
+
+
+def expand_paths(paths: list[str]) -> list[_Source]:
+    """Expand files, directories and globs into sources, in argument order without duplicates.
+
+    Directories are walked recursively and globs support `**`; both honor
+    .gitignore files. Plain file paths are taken as-is.
+    """
+    sources = []
+    seen: set[Path] = set()
+    for path_str in paths:
+        if _is_glob(path_str):
+            found = _expand_glob(path_str)
+        elif Path(path_str).is_dir():
+            found = _expand_dir(path_str)
+        else:
+            found = [_Source(Path(path_str), Path(path_str).name, True)]
+        if not found:
+            raise ContextError(f"No files matched: {path_str}")
+
+        for source in found:
+            key = source.path.resolve()
+            if key not in seen:
+                seen.add(key)
+                sources.append(source)
+    return sources
+
+
+class _File(NamedTuple):
+    source: _Source
+    key: str  # resolved path
+    mtime_ns: int
+    size: int
+
+
+def _check_files(sources: list[_Source], max_file_size: int, max_total_size: int) -> list[_File]:
+    """Stat every file up front so missing, oversized or over-budget inputs fail before reading.
+
+    Oversized files found by expanding a directory or glob are skipped.
+    """
+    checked = []
+    total = 0
+    for source in sources:
+        path = source.path
+        if not path.exists():
+            raise ContextError(f"File not found: {path}")
+        if not path.is_file():
+            raise ContextError(f"Not a file: {path}")
+        try:
+            stat = path.stat()
+        except OSError as e:
+            raise ContextError(f"Error reading {path}: {e}") from e
+        size = stat.st_size
+        if size > max_file_size:
+            if not source.explicit:
+                continue
+            raise ContextError(
+                f"File too large: {path} ({size // 1024 // 1024}MB > "
+                f"{max_file_size // 1024 // 1024}MB)"
+            )
+        total += size
+        if total > max_total_size:
+            raise ContextError(
+                f"Files exceed context budget ({total // 1024 // 1024}MB > "
+                f"{max_total_size // 1024 // 1024}MB)"
+            )
+        checked.append(_File(source, str(path.resolve()), stat.st_mtime_ns, size))
+    return checked
+
+
+def _read_file(source: _Source) -> str | None:
+    """Decode a UTF-8 file chunk by chunk, sniffing the first chunk for binary content.
+
+    Returns None for binary or non-UTF-8 files found by expansion; named
+    files raise instead.
+    """
+    out = io.StringIO()
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        with source.path.open("rb") as f:
+            chunk = f.read(CHUNK_SIZE)
+            if b"\0" in chunk:
+                if not source.explicit:
+                    return None
+                raise ContextError(f"Binary file: {source.path}")
+            while chunk:
+                out.write(decoder.decode(chunk))
+                chunk = f.read(CHUNK_SIZE)
+            out.write(decoder.decode(b"", final=True))
+    except UnicodeDecodeError as e:
+        if not source.explicit:
+            return None
+        raise ContextError(f"Not UTF-8 text: {source.path}") from e
+    except OSError as e:
+        raise ContextError(f"Error reading {source.path}: {e}") from e
+    return out.getvalue()
+
+
+def _header(label: str) -> str:
+    return f"# {label}\n```\n"
+
+
+_FOOTER = "\n```"
+
+
+def _read_files(files: list[_File]) -> list[str | None]:
+    """Contents for each file, read concurrently when there is more than one."""
+    if len(files) > 1:
+        with ThreadPoolExecutor(max_workers=min(READ_WORKERS, len(files))) as pool:
+            return list(pool.map(_read_file, [f.source for f in files]))
+    return [_read_file(f.source) for f in files]
+
+
+def _read_blocks(files: list[_File], use_cache: bool) -> list[str | None]:
+    """Fenced block for each file, from the file cache when label, mtime and size still match."""
+    cached: dict[str, str | None] = {}
+    if use_cache:
+        from orcx import cache
+
+        explicit = {f.key for f in files if f.source.explicit}
+        # A named binary file must still raise, so re-read it for the error
+        cached = {
+            key: block
+            for key, block in cache.get_blocks(
+                [(f.key, f.source.label, f.mtime_ns, f.size) for f in files]
+            ).items()
+            if block is not None or key not in explicit
+        }
+
+    missing = [f for f in files if f.key not in cached]
+    read = [
+        None if content is None else _header(f.source.label) + content + _FOOTER
+        for f, content in zip(missing, _read_files(missing), strict=True)
+    ]
+    if use_cache and missing:
+        cache.put_blocks(
+            [
+                (f.key, f.source.label, f.mtime_ns, f.size, block)
+                for f, block in zip(missing, read, strict=True)
+            ]
+        )
+    cached.update((f.key, block) for f, block in zip(missing, read, strict=True))
+    return [cached[f.key] for f in files]
+
+
+def load_context(
+    paths: list[str],
+    prefix: str | None = None,
+    max_file_size: int = MAX_FILE_SIZE,
+    max_total_size: int = MAX_CONTEXT_SIZE,
+    use_cache: bool = False,
+) -> tuple[str, list[ContextFile]]:
+    """Format files as fenced blocks after an optional `prefix`.
+
+    Every file is checked before any is read. Files are read concurrently,
+    then joined in a deterministic order. With `use_cache`, files whose path,
+    mtime and size are unchanged since an earlier run come from the on-disk
+    cache as formatted blocks instead of being re-read. Returns the text
+    and, for each file included, where its content sits in the text along
+    with the path, mtime and size it was read at.
+    """
+    files = _check_files(expand_paths(paths), max_file_size, max_total_size)
+    blocks = _read_blocks(files, use_cache)
+
+    parts = [prefix] if prefix else []
+    length = len(prefix or "")
+    included = []
+    for file, block in zip(files, blocks, strict=True):
+        if block is None:
+            continue
+        if parts:
+            parts.append("\n\n")
+            length += len("\n\n")
+        start = length + len(_header(file.source.label))
+        end = length + len(block) - len(_FOOTER)
+        parts.append(block)
+        length += len(block)
+        included.append(
+            ContextFile(path=file.key, mtime_ns=file.mtime_ns, size=file.size, start=start, end=end)
+        )
+    return "".join(parts), included
+
+
+def build_context(
+    paths: list[str],
+    prefix: str | None = None,
+    max_file_size: int = MAX_FILE_SIZE,
+    max_total_size: int = MAX_CONTEXT_SIZE,
+    use_cache: bool = False,
+) -> str:
+    """Format files as fenced blocks after an optional `prefix` (see `load_context`)."""
+    return load_context(paths, prefix, max_file_size, max_total_size, use_cache)[0]
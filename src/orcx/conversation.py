@@ -2,49 +2,385 @@
 
 from __future__ import annotations
 
-import json
+import os
 import random
 import sqlite3
 import string
-from datetime import UTC, datetime
+import threading
+import warnings
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
 
-from orcx.schema import Conversation, Message
+from orcx.schema import (
+    Conversation,
+    ConversationMatch,
+    ConversationSummary,
+    Message,
+    OrcxResponse,
+    Timings,
+    UsageStats,
+)
 
 DB_PATH = Path.home() / ".config" / "orcx" / "conversations.db"
 
+# Bumped when the schema changes; stored in PRAGMA user_version
+SCHEMA_VERSION = 6
+
+# `rowid INTEGER PRIMARY KEY` declares the rowid explicitly: the full-text
+# indexes are keyed on it, and VACUUM may renumber implicit rowids.
 SCHEMA = """
 CREATE TABLE IF NOT EXISTS conversations (
-    id TEXT PRIMARY KEY,
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
     model TEXT NOT NULL,
     agent TEXT,
     title TEXT,
-    messages TEXT NOT NULL,
     total_tokens INTEGER DEFAULT 0,
     total_cost REAL DEFAULT 0.0,
     created_at TEXT NOT NULL,
     updated_at TEXT NOT NULL
 );
-CREATE INDEX IF NOT EXISTS idx_updated ON conversations(updated_at DESC);
+CREATE INDEX IF NOT EXISTS idx_updated ON conversations(updated_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_model_updated ON conversations(model, updated_at DESC);
+CREATE INDEX IF NOT EXISTS idx_agent_updated ON conversations(agent, updated_at DESC);
+CREATE TABLE IF NOT EXISTS messages (
+    rowid INTEGER PRIMARY KEY,
+    conversation_id TEXT NOT NULL REFERENCES conversations(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    tokens INTEGER,
+    cost REAL,
+    created_at TEXT NOT NULL,
+    model TEXT,
+    provider TEXT,
+    UNIQUE (conversation_id, seq)
+);
+CREATE INDEX IF NOT EXISTS idx_replies ON messages(
+    created_at, conversation_id, seq, model, provider, tokens, cost
+) WHERE role = 'assistant';
+CREATE TABLE IF NOT EXISTS timings (
+    conversation_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    config REAL,
+    imports REAL,
+    resolve REAL,
+    messages REAL,
+    send REAL,
+    ttft REAL,
+    generation REAL,
+    total REAL,
+    tokens_per_second REAL,
+    PRIMARY KEY (conversation_id, seq),
+    FOREIGN KEY (conversation_id, seq) REFERENCES messages(conversation_id, seq)
+        ON DELETE CASCADE
+);
 """
 
-_schema_initialized_for: str | None = None
+# Timings fields stored per assistant message. `save` isn't: it times this write.
+TIMING_COLUMNS = (
+    "config",
+    "imports",
+    "resolve",
+    "messages",
+    "send",
+    "ttft",
+    "generation",
+    "total",
+    "tokens_per_second",
+)
+
+# Full-text index over message content and titles, kept in sync by triggers.
+# External-content tables: the text lives only in messages/conversations.
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    content, content='messages', content_rowid='rowid'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS conversations_fts USING fts5(
+    title, content='conversations', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts(rowid, content) VALUES (new.rowid, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts(messages_fts, rowid, content)
+    VALUES ('delete', old.rowid, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE OF content ON messages BEGIN
+    INSERT INTO messages_fts(messages_fts, rowid, content)
+    VALUES ('delete', old.rowid, old.content);
+    INSERT INTO messages_fts(rowid, content) VALUES (new.rowid, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS conversations_fts_insert AFTER INSERT ON conversations BEGIN
+    INSERT INTO conversations_fts(rowid, title) VALUES (new.rowid, new.title);
+END;
+CREATE TRIGGER IF NOT EXISTS conversations_fts_delete AFTER DELETE ON conversations BEGIN
+    INSERT INTO conversations_fts(conversations_fts, rowid, title)
+    VALUES ('delete', old.rowid, old.title);
+END;
+CREATE TRIGGER IF NOT EXISTS conversations_fts_update AFTER UPDATE OF title ON conversations
+WHEN old.title IS NOT new.title BEGIN
+    INSERT INTO conversations_fts(conversations_fts, rowid, title)
+    VALUES ('delete', old.rowid, old.title);
+    INSERT INTO conversations_fts(rowid, title) VALUES (new.rowid, new.title);
+END;
+"""
+
+# Repopulate the indexes from their content tables (after creating or migrating)
+FTS_REBUILD = """
+INSERT INTO messages_fts(messages_fts) VALUES ('rebuild');
+INSERT INTO conversations_fts(conversations_fts) VALUES ('rebuild');
+"""
+
+# Best hit per conversation across message bodies and titles, ranked by bm25
+SEARCH_SQL = """
+WITH hits AS (
+    SELECT m.conversation_id AS id, m.role AS role, m.seq AS seq,
+           snippet(messages_fts, 0, '[', ']', '...', 12) AS snippet,
+           bm25(messages_fts) AS rank
+    FROM messages_fts JOIN messages m ON m.rowid = messages_fts.rowid
+    WHERE messages_fts MATCH ?
+    UNION ALL
+    SELECT c.id, 'title', NULL,
+           snippet(conversations_fts, 0, '[', ']', '...', 12),
+           bm25(conversations_fts)
+    FROM conversations_fts JOIN conversations c ON c.rowid = conversations_fts.rowid
+    WHERE conversations_fts MATCH ?
+),
+best AS (
+    SELECT *, ROW_NUMBER() OVER (PARTITION BY id ORDER BY rank) AS n FROM hits
+)
+SELECT c.id, c.model, c.agent, c.title, c.updated_at,
+       best.role, best.seq, best.snippet, best.rank
+FROM best JOIN conversations c ON c.id = best.id
+WHERE best.n = 1
+ORDER BY best.rank
+LIMIT ?
+"""
+
+
+# v0 stored all messages as one JSON array in conversations.messages.
+# Rows whose JSON can't be parsed are kept in conversations_v0 rather than lost.
+MIGRATE_V0 = """
+DROP INDEX IF EXISTS idx_updated;
+DROP INDEX IF EXISTS idx_model_updated;
+DROP INDEX IF EXISTS idx_agent_updated;
+ALTER TABLE conversations RENAME TO conversations_v0;
+{schema}
+INSERT INTO conversations
+    (id, model, agent, title, total_tokens, total_cost, created_at, updated_at)
+SELECT id, model, agent, title, total_tokens, total_cost, created_at, updated_at
+FROM conversations_v0;
+INSERT INTO messages (conversation_id, seq, role, content, created_at)
+SELECT c.id, j.key, COALESCE(json_extract(j.value, '$.role'), 'user'),
+       COALESCE(json_extract(j.value, '$.content'), ''), c.updated_at
+FROM conversations_v0 c, json_each(c.messages) j
+WHERE json_valid(c.messages) AND json_type(c.messages) = 'array';
+DELETE FROM conversations_v0 WHERE json_valid(messages) AND json_type(messages) = 'array';
+"""
+
+# v1-v4 messages don't record which model answered
+MIGRATE_V4 = """
+ALTER TABLE messages ADD COLUMN model TEXT;
+ALTER TABLE messages ADD COLUMN provider TEXT;
+"""
+
+# v1-v5 tables have implicit rowids; rebuild them with the rowid declared,
+# keeping its values so the full-text indexes stay valid
+MIGRATE_V5 = """
+DROP INDEX IF EXISTS idx_updated;
+DROP INDEX IF EXISTS idx_model_updated;
+DROP INDEX IF EXISTS idx_agent_updated;
+DROP INDEX IF EXISTS idx_replies;
+ALTER TABLE conversations RENAME TO conversations_v5;
+ALTER TABLE messages RENAME TO messages_v5;
+{schema}
+INSERT INTO conversations
+    (rowid, id, model, agent, title, total_tokens, total_cost, created_at, updated_at)
+SELECT rowid, id, model, agent, title, total_tokens, total_cost, created_at, updated_at
+FROM conversations_v5;
+INSERT INTO messages
+    (rowid, conversation_id, seq, role, content, tokens, cost, created_at, model, provider)
+SELECT rowid, conversation_id, seq, role, content, tokens, cost, created_at, model, provider
+FROM messages_v5;
+DROP TABLE messages_v5;
+DROP TABLE conversations_v5;
+"""
+
+# Older replies are attributed to their conversation's model
+BACKFILL_MODELS = """
+UPDATE messages
+SET model = (SELECT c.model FROM conversations c WHERE c.id = messages.conversation_id)
+WHERE role = 'assistant' AND model IS NULL;
+UPDATE messages
+SET provider = CASE WHEN instr(model, '/') > 1
+                    THEN substr(model, 1, instr(model, '/') - 1) ELSE 'unknown' END
+WHERE role = 'assistant' AND provider IS NULL AND model IS NOT NULL;
+"""
+
+# Nearest-rank p50/p95/p99 of one `exchanges` column per group
+PERCENTILES_SQL = """
+SELECT key,
+       MIN(CASE WHEN n * 100 >= 50 * count THEN value END) AS p50,
+       MIN(CASE WHEN n * 100 >= 95 * count THEN value END) AS p95,
+       MIN(CASE WHEN n * 100 >= 99 * count THEN value END) AS p99
+FROM (
+    SELECT key, {column} AS value,
+           ROW_NUMBER() OVER (PARTITION BY key ORDER BY {column}) AS n,
+           COUNT(*) OVER (PARTITION BY key) AS count
+    FROM exchanges WHERE {column} IS NOT NULL
+)
+GROUP BY key
+"""
+
+# Replies in a time window, grouped. The reply scan is served by idx_replies
+# alone; prompt tokens and timings are primary-key lookups.
+STATS_SQL = """
+WITH exchanges AS (
+    SELECT {key} AS key, u.tokens AS input_tokens, m.tokens AS output_tokens, m.cost AS cost,
+           t.generation AS latency, t.ttft AS ttft, t.tokens_per_second AS tokens_per_second
+    FROM messages m
+    JOIN conversations c ON c.id = m.conversation_id
+    LEFT JOIN messages u
+        ON u.conversation_id = m.conversation_id AND u.seq = m.seq - 1 AND u.role = 'user'
+    LEFT JOIN timings t ON t.conversation_id = m.conversation_id AND t.seq = m.seq
+    WHERE m.role = 'assistant' AND m.created_at >= ?
+),
+latency AS ({latency}),
+ttft AS ({ttft})
+SELECT e.key, COUNT(*) AS requests,
+       COALESCE(SUM(e.input_tokens), 0) AS input_tokens,
+       COALESCE(SUM(e.output_tokens), 0) AS output_tokens,
+       COALESCE(SUM(e.cost), 0.0) AS cost,
+       l.p50 AS latency_p50, l.p95 AS latency_p95, l.p99 AS latency_p99,
+       f.p50 AS ttft_p50, f.p95 AS ttft_p95, f.p99 AS ttft_p99,
+       AVG(e.tokens_per_second) AS tokens_per_second
+FROM exchanges e
+LEFT JOIN latency l ON l.key = e.key
+LEFT JOIN ttft f ON f.key = e.key
+GROUP BY e.key
+ORDER BY {order}
+"""
+
+# `usage_stats` groupings: the key expression and the row order
+STATS_GROUPS = {
+    "model": ("COALESCE(m.model, c.model)", "cost DESC, requests DESC"),
+    "agent": ("COALESCE(c.agent, '-')", "cost DESC, requests DESC"),
+    "provider": ("COALESCE(m.provider, 'unknown')", "cost DESC, requests DESC"),
+    "day": ("substr(m.created_at, 1, 10)", "e.key"),
+}
+
+# Seconds a writer waits for another process's lock before "database is locked"
+BUSY_TIMEOUT = 30.0
+
+# Applied to every connection. WAL lets readers run alongside one writer and
+# with synchronous=NORMAL only checkpoints fsync; cache_size is in KiB when negative.
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -8000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA foreign_keys = ON",
+)
+
+# One connection per thread, reused across operations
+_local = threading.local()
+
+
+def _execute_script(conn: sqlite3.Connection, script: str) -> None:
+    """Run statements one by one so they stay inside the caller's transaction.
+
+    (`executescript` would commit first.) Trigger bodies span several lines
+    ending in `;`, so statements are accumulated until SQLite considers them complete.
+    """
+    statement = ""
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            conn.execute(statement)
+            statement = ""
+    if statement.strip():
+        conn.execute(statement)
+
+
+def _fts_available(conn: sqlite3.Connection) -> bool:
+    """Whether this SQLite build has FTS5 (search is disabled without it)."""
+    options = {row[0] for row in conn.execute("PRAGMA compile_options")}
+    return "ENABLE_FTS5" in options
+
+
+def _init_schema(conn: sqlite3.Connection) -> None:
+    """Create or migrate the schema up to SCHEMA_VERSION."""
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        return
+
+    # Rebuilding a table must neither cascade deletes nor repoint other tables'
+    # foreign keys at the renamed copy; foreign_keys can't change mid-transaction
+    conn.execute("PRAGMA foreign_keys = OFF")
+    conn.execute("PRAGMA legacy_alter_table = ON")
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Another process may have migrated while we waited for the lock
+        if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(conversations)")}
+            if "messages" in columns:
+                _execute_script(conn, MIGRATE_V0.format(schema=SCHEMA))
+                (corrupted,) = conn.execute("SELECT COUNT(*) FROM conversations_v0").fetchone()
+                if not corrupted:
+                    conn.execute("DROP TABLE conversations_v0")
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(messages)")}
+            if columns and "model" not in columns:
+                _execute_script(conn, MIGRATE_V4)
+            if columns and "rowid" not in columns:
+                _execute_script(conn, MIGRATE_V5.format(schema=SCHEMA))
+            _execute_script(conn, SCHEMA)
+            _execute_script(conn, BACKFILL_MODELS)
+            if _fts_available(conn):
+                _execute_script(conn, FTS_SCHEMA)
+                _execute_script(conn, FTS_REBUILD)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute("PRAGMA legacy_alter_table = OFF")
+        conn.execute("PRAGMA foreign_keys = ON")
 
 
 def _connect() -> sqlite3.Connection:
-    """Get database connection, creating schema if needed."""
-    global _schema_initialized_for
+    """Get this thread's database connection, opening it and creating schema if needed.
+
+    The connection is reused until DB_PATH changes (e.g., in tests), the
+    process forks, or `close()` is called. Use it as a context manager to
+    commit or roll back a transaction.
+    """
+    key = (str(DB_PATH), os.getpid())
+    conn: sqlite3.Connection | None = getattr(_local, "conn", None)
+    if conn is not None and _local.key == key:
+        return conn
+    if conn is not None and _local.key[1] == key[1]:
+        conn.close()
+
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT)
     conn.row_factory = sqlite3.Row
-    # Re-init schema if DB path changed (e.g., in tests)
-    db_path_str = str(DB_PATH)
-    if _schema_initialized_for != db_path_str:
-        conn.executescript(SCHEMA)
-        _schema_initialized_for = db_path_str
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    _init_schema(conn)
+    _local.conn = conn
+    _local.key = key
     return conn
 
 
+def close() -> None:
+    """Close this thread's database connection, if open."""
+    conn: sqlite3.Connection | None = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+
 def _generate_id() -> str:
     """Generate 4-char base36 ID."""
     chars = string.ascii_lowercase + string.digits
@@ -56,24 +392,62 @@ def _now() -> str:
     return datetime.now(UTC).isoformat()
 
 
-class ConversationCorruptedError(Exception):
-    """Raised when conversation data cannot be parsed."""
+class _ConversationCorruptedError(Exception):
+    """Raised when conversation data cannot be parsed. No longer raised."""
 
     def __init__(self, conv_id: str, details: str):
         self.conv_id = conv_id
         super().__init__(f"Corrupted conversation {conv_id}: {details}")
 
 
-def _row_to_conversation(row: sqlite3.Row) -> Conversation:
-    """Convert database row to Conversation object."""
-    conv_id = row["id"]
-    try:
-        messages = [Message(**m) for m in json.loads(row["messages"])]
-    except (json.JSONDecodeError, TypeError, KeyError) as e:
-        raise ConversationCorruptedError(conv_id, str(e)) from e
+def __getattr__(name: str) -> type[Exception]:
+    # ConversationCorruptedError is kept importable for existing callers.
+    # Messages are read from per-message rows, so nothing raises it anymore.
+    if name == "ConversationCorruptedError":
+        warnings.warn(
+            "orcx.conversation.ConversationCorruptedError is deprecated and never raised",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        return _ConversationCorruptedError
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _load_messages(conn: sqlite3.Connection, conv_id: str) -> list[Message]:
+    """Load a conversation's messages in order."""
+    timing_columns = ", ".join(f"t.{c} AS t_{c}" for c in TIMING_COLUMNS)
+    rows = conn.execute(
+        f"""
+        SELECT m.role, m.content, m.tokens, m.cost, m.created_at, m.model, m.provider,
+               t.seq IS NOT NULL AS timed, {timing_columns}
+        FROM messages m
+        LEFT JOIN timings t ON t.conversation_id = m.conversation_id AND t.seq = m.seq
+        WHERE m.conversation_id = ? ORDER BY m.seq
+        """,
+        (conv_id,),
+    ).fetchall()
+    # Rows come from our own schema, so skip re-validation
+    return [
+        Message.model_construct(
+            role=row["role"],
+            content=row["content"],
+            tokens=row["tokens"],
+            cost=row["cost"],
+            created_at=row["created_at"],
+            model=row["model"],
+            provider=row["provider"],
+            timings=Timings.model_construct(**{c: row[f"t_{c}"] for c in TIMING_COLUMNS})
+            if row["timed"]
+            else None,
+        )
+        for row in rows
+    ]
+
 
+def _row_to_conversation(row: sqlite3.Row, messages: list[Message]) -> Conversation:
+    """Convert database row and its messages to a Conversation object."""
     return Conversation(
-        id=conv_id,
+        id=row["id"],
         model=row["model"],
         agent=row["agent"],
         title=row["title"],
@@ -85,6 +459,45 @@ def _row_to_conversation(row: sqlite3.Row) -> Conversation:
     )
 
 
+def _insert_messages(
+    conn: sqlite3.Connection, conv_id: str, messages: list[Message], start_seq: int
+) -> None:
+    """Insert messages with consecutive sequence numbers starting at start_seq."""
+    now = _now()
+    conn.executemany(
+        """
+        INSERT INTO messages
+            (conversation_id, seq, role, content, tokens, cost, created_at, model, provider)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (
+                conv_id,
+                start_seq + i,
+                m.role,
+                m.content,
+                m.tokens,
+                m.cost,
+                m.created_at or now,
+                m.model,
+                m.provider,
+            )
+            for i, m in enumerate(messages)
+        ],
+    )
+    conn.executemany(
+        f"""
+        INSERT INTO timings (conversation_id, seq, {", ".join(TIMING_COLUMNS)})
+        VALUES (?, ?, {", ".join("?" for _ in TIMING_COLUMNS)})
+        """,
+        [
+            (conv_id, start_seq + i, *(getattr(m.timings, c) for c in TIMING_COLUMNS))
+            for i, m in enumerate(messages)
+            if m.timings is not None
+        ],
+    )
+
+
 def create(model: str, agent: str | None = None) -> Conversation:
     """Create a new conversation."""
     now = _now()
@@ -95,11 +508,10 @@ def create(model: str, agent: str | None = None) -> Conversation:
                 conn.execute(
                     """
                     INSERT INTO conversations
-                        (id, model, agent, title, messages, total_tokens, total_cost,
-                         created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        (id, model, agent, title, total_tokens, total_cost, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                     """,
-                    (conv_id, model, agent, None, "[]", 0, 0.0, now, now),
+                    (conv_id, model, agent, None, 0, 0.0, now, now),
                 )
                 return Conversation(
                     id=conv_id,
@@ -118,9 +530,9 @@ def get(conv_id: str) -> Conversation | None:
     """Get conversation by ID."""
     with _connect() as conn:
         row = conn.execute("SELECT * FROM conversations WHERE id = ?", (conv_id,)).fetchone()
-    if not row:
-        return None
-    return _row_to_conversation(row)
+        if not row:
+            return None
+        return _row_to_conversation(row, _load_messages(conn, conv_id))
 
 
 def get_last() -> Conversation | None:
@@ -129,19 +541,89 @@ def get_last() -> Conversation | None:
         row = conn.execute(
             "SELECT * FROM conversations ORDER BY updated_at DESC LIMIT 1"
         ).fetchone()
-    if not row:
-        return None
-    return _row_to_conversation(row)
+        if not row:
+            return None
+        return _row_to_conversation(row, _load_messages(conn, row["id"]))
+
+
+def exchange(prompt: str, content: str, response: OrcxResponse | None) -> list[Message]:
+    """User and assistant messages for one exchange.
+
+    Prompt tokens are attributed to the user turn and the rest (plus cost
+    and timings) to the reply. The reply records the model orcx asked for
+    (after any fallback) rather than the provider's echo of it.
+    """
+    usage = (response.usage if response else None) or {}
+    model = None
+    if response is not None:
+        model = response.attempts[-1].model if response.attempts else response.model
+    prompt_tokens = usage.get("prompt_tokens")
+    total_tokens = usage.get("total_tokens")
+    reply_tokens = total_tokens - (prompt_tokens or 0) if total_tokens is not None else None
+    return [
+        Message(role="user", content=prompt, tokens=prompt_tokens),
+        Message(
+            role="assistant",
+            content=content,
+            tokens=reply_tokens,
+            cost=response.cost if response else None,
+            model=model,
+            provider=response.provider if response else None,
+            timings=response.timings if response else None,
+        ),
+    ]
+
+
+def append(conv: Conversation, messages: list[Message]) -> None:
+    """Append messages to a stored conversation. Raises ValueError if not found.
+
+    Only the new messages are written; totals are incremented by the messages'
+    tokens and cost. `conv` is updated in place to match. The conversation's
+    title is set from `conv.title` if it has none yet.
+    """
+    now = _now()
+    for m in messages:
+        m.created_at = m.created_at or now
+    tokens = sum(m.tokens or 0 for m in messages)
+    cost = sum(m.cost or 0.0 for m in messages)
+
+    with _connect() as conn:
+        # Take the write lock up front so concurrent appends get distinct seqs
+        conn.execute("BEGIN IMMEDIATE")
+        cursor = conn.execute(
+            """
+            UPDATE conversations
+            SET title = COALESCE(title, ?), total_tokens = total_tokens + ?,
+                total_cost = total_cost + ?, updated_at = ?
+            WHERE id = ?
+            """,
+            (conv.title, tokens, cost, now, conv.id),
+        )
+        if cursor.rowcount == 0:
+            raise ValueError(f"Conversation {conv.id} not found")
+        (next_seq,) = conn.execute(
+            "SELECT COALESCE(MAX(seq) + 1, 0) FROM messages WHERE conversation_id = ?",
+            (conv.id,),
+        ).fetchone()
+        _insert_messages(conn, conv.id, messages, next_seq)
+
+    conv.messages.extend(messages)
+    conv.total_tokens += tokens
+    conv.total_cost += cost
+    conv.updated_at = now
 
 
 def update(conv: Conversation) -> None:
-    """Update conversation in database. Raises ValueError if not found."""
+    """Update conversation in database. Raises ValueError if not found.
+
+    Rewrites all messages; use `append` to add a turn.
+    """
     conv.updated_at = _now()
     with _connect() as conn:
         cursor = conn.execute(
             """
             UPDATE conversations
-            SET model = ?, agent = ?, title = ?, messages = ?,
+            SET model = ?, agent = ?, title = ?,
                 total_tokens = ?, total_cost = ?, updated_at = ?
             WHERE id = ?
             """,
@@ -149,15 +631,16 @@ def update(conv: Conversation) -> None:
                 conv.model,
                 conv.agent,
                 conv.title,
-                json.dumps([m.model_dump() for m in conv.messages]),
                 conv.total_tokens,
                 conv.total_cost,
                 conv.updated_at,
                 conv.id,
             ),
         )
-    if cursor.rowcount == 0:
-        raise ValueError(f"Conversation {conv.id} not found")
+        if cursor.rowcount == 0:
+            raise ValueError(f"Conversation {conv.id} not found")
+        conn.execute("DELETE FROM messages WHERE conversation_id = ?", (conv.id,))
+        _insert_messages(conn, conv.id, conv.messages, 0)
 
 
 def list_recent(limit: int = 20) -> list[Conversation]:
@@ -166,7 +649,106 @@ def list_recent(limit: int = 20) -> list[Conversation]:
         rows = conn.execute(
             "SELECT * FROM conversations ORDER BY updated_at DESC LIMIT ?", (limit,)
         ).fetchall()
-    return [_row_to_conversation(row) for row in rows]
+        return [_row_to_conversation(row, _load_messages(conn, row["id"])) for row in rows]
+
+
+def list_summaries(
+    limit: int = 20,
+    offset: int = 0,
+    before: str | None = None,
+    model: str | None = None,
+    agent: str | None = None,
+    before_id: str | None = None,
+) -> list[ConversationSummary]:
+    """List conversations newest first (ties by id) without loading message bodies.
+
+    Page with `offset`, or with `before` and `before_id` (the last row's
+    `updated_at` and `id` from the previous page) to seek via the updated_at
+    index instead of scanning skipped rows. Without `before_id`, rows
+    updated at exactly `before` are skipped. `model` matches as a
+    substring, `agent` exactly.
+    """
+    where = []
+    params: list[str | int] = []
+    if before and before_id:
+        where.append("(c.updated_at, c.id) < (?, ?)")
+        params += [before, before_id]
+    elif before:
+        where.append("c.updated_at < ?")
+        params.append(before)
+    if model:
+        where.append("c.model LIKE ? ESCAPE '\\'")
+        escaped = model.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        params.append(f"%{escaped}%")
+    if agent:
+        where.append("c.agent = ?")
+        params.append(agent)
+    clause = f"WHERE {' AND '.join(where)}" if where else ""
+
+    with _connect() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT c.id, c.model, c.agent, c.title, c.total_tokens, c.total_cost,
+                   c.created_at, c.updated_at,
+                   (SELECT COUNT(*) FROM messages m WHERE m.conversation_id = c.id)
+                       AS message_count
+            FROM conversations c
+            {clause}
+            ORDER BY c.updated_at DESC, c.id DESC
+            LIMIT ? OFFSET ?
+            """,
+            (*params, limit, offset),
+        ).fetchall()
+    return [ConversationSummary(**dict(row)) for row in rows]
+
+
+def _fts_query(query: str) -> str:
+    """Quote each whitespace-separated term so user input can't break FTS5 syntax."""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+
+def search(query: str, limit: int = 20, raw: bool = False) -> list[ConversationMatch]:
+    """Full-text search over message content and titles, best match per conversation.
+
+    Terms are ANDed and matched as literals; pass `raw=True` to use FTS5
+    query syntax (OR, NEAR, prefix*, column filters) directly.
+    """
+    match = query if raw else _fts_query(query)
+    if not match:
+        return []
+
+    with _connect() as conn:
+        if not _fts_available(conn):
+            raise RuntimeError("Conversation search requires SQLite built with FTS5")
+        try:
+            rows = conn.execute(SEARCH_SQL, (match, match, limit)).fetchall()
+        except sqlite3.OperationalError as e:
+            # Quoted queries are always valid; only raw FTS5 syntax can fail to parse
+            if not raw:
+                raise
+            raise ValueError(f"Invalid search query: {e}") from e
+    return [ConversationMatch(**dict(row)) for row in rows]
+
+
+def usage_stats(by: str = "model", days: int | None = 7) -> list[UsageStats]:
+    """Spend, token volume and latency percentiles of replies, grouped `by`.
+
+    `by` is one of STATS_GROUPS; days are UTC. Covers the last `days` days,
+    or all time when None. Raises ValueError for an unknown grouping.
+    """
+    if by not in STATS_GROUPS:
+        raise ValueError(f"Unknown grouping '{by}'. Use one of: {', '.join(STATS_GROUPS)}")
+    key, order = STATS_GROUPS[by]
+    since = (datetime.now(UTC) - timedelta(days=days)).isoformat() if days is not None else ""
+    sql = STATS_SQL.format(
+        key=key,
+        latency=PERCENTILES_SQL.format(column="latency"),
+        ttft=PERCENTILES_SQL.format(column="ttft"),
+        order=order,
+    )
+    with _connect() as conn:
+        rows = conn.execute(sql, (since,)).fetchall()
+    return [UsageStats(**dict(row)) for row in rows]
 
 
 def delete(conv_id: str) -> bool:
@@ -0,0 +1,210 @@
+"""Local daemon: a long-lived router on a Unix socket that CLI calls forward to.
+
+`orcx serve-local` pays litellm's import, config parsing and provider TLS
+handshakes once; later `orcx` invocations send their request over the socket
+and skip all of it. When no daemon is listening, the CLI runs in-process.
+Requests run with the daemon's environment: the caller's API key and other
+provider variables are not sent along.
+
+Protocol: one request per connection, as newline-delimited JSON. The client
+sends `{"request": ..., "history": [...], "cache": ...}`; the daemon replies
+with `{"chunk": "..."}` lines when streaming, then one `{"response": ...}`
+line, or an `{"error": {"type", "message", "details"}}` line.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import os
+import socket
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+from orcx import errors, router
+from orcx.config import CONFIG_DIR, load_config
+from orcx.errors import OrcxError
+from orcx.router import ResponseStream
+from orcx.schema import OrcxRequest, OrcxResponse
+
+SOCKET_PATH = CONFIG_DIR / "orcx.sock"
+
+# How long the CLI waits for a daemon before running in-process (seconds)
+CONNECT_TIMEOUT = 0.5
+
+# Requests carry -f context (up to 20 MB of files), so allow large lines
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+
+
+def _encode(message: dict[str, Any]) -> bytes:
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+def _error_message(e: Exception) -> dict[str, Any]:
+    if isinstance(e, OrcxError):
+        return {"type": type(e).__name__, "message": e.message, "details": e.details}
+    return {"type": type(e).__name__, "message": str(e), "details": None}
+
+
+def _remote_error(data: dict[str, Any]) -> OrcxError:
+    """Rebuild a daemon-side error as the same OrcxError subclass, so exit codes match."""
+    cls = getattr(errors, data.get("type") or "", None)
+    if not (isinstance(cls, type) and issubclass(cls, OrcxError)):
+        cls = OrcxError
+    error = cls.__new__(cls)
+    OrcxError.__init__(error, data.get("message") or "orcx daemon error", data.get("details"))
+    return error
+
+
+# Server
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Serve one request on a connection."""
+    try:
+        line = await reader.readline()
+        if not line:
+            return  # a liveness probe from `is_running`
+        message = json.loads(line)
+        request = OrcxRequest.model_validate(message["request"])
+        history = message.get("history")
+        cache = message.get("cache")
+
+        if request.stream:
+            stream = router.arun_stream(request, history=history, cache=cache)
+            try:
+                async for chunk in stream:
+                    writer.write(_encode({"chunk": chunk}))
+                    await writer.drain()
+            finally:
+                # A client that hung up mid-stream releases the provider stream too
+                await stream.aclose()
+            response = stream.response
+        else:
+            response = await router.arun(request, history=history, cache=cache)
+
+        if response is not None:
+            writer.write(_encode({"response": response.model_dump(mode="json")}))
+    except (ConnectionError, asyncio.IncompleteReadError):
+        return
+    except Exception as e:
+        writer.write(_encode({"error": _error_message(e)}))
+    finally:
+        with contextlib.suppress(Exception):
+            await writer.drain()
+            writer.close()
+            await writer.wait_closed()
+
+
+def is_running(path: Path | None = None) -> bool:
+    """Whether a daemon is accepting connections on `path`."""
+    path = path or SOCKET_PATH
+    if not hasattr(socket, "AF_UNIX") or not path.exists():
+        return False
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(str(path))
+        except OSError:
+            return False
+    return True
+
+
+async def start(path: Path | None = None) -> asyncio.Server:
+    """Warm up the router and start listening on `path`.
+
+    A stale socket left by a daemon that didn't shut down cleanly is
+    replaced; a live one is an error.
+    """
+    path = path or SOCKET_PATH
+    if is_running(path):
+        raise OrcxError(f"orcx daemon already running on {path}")
+    with contextlib.suppress(FileNotFoundError):
+        path.unlink()
+
+    router._load_litellm()
+    load_config()
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    server = await asyncio.start_unix_server(_handle, path=str(path), limit=MAX_MESSAGE_SIZE)
+    os.chmod(path, 0o600)  # requests may carry private context
+    return server
+
+
+def serve(path: Path | None = None, on_ready: Callable[[Path], object] | None = None) -> None:
+    """Run the daemon until interrupted, removing the socket on exit."""
+    path = path or SOCKET_PATH
+
+    async def main() -> None:
+        server = await start(path)
+        if on_ready is not None:
+            on_ready(path)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    finally:
+        if not is_running(path):
+            with contextlib.suppress(FileNotFoundError):
+                path.unlink()
+
+
+# Client
+
+
+class DaemonClient:
+    """Forwards requests to a running daemon; mirrors `router.run`/`router.run_stream`.
+
+    Each call uses its own connection, so a client can be shared across threads.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def _items(
+        self, request: OrcxRequest, history: list[dict] | None, cache: bool | None
+    ) -> Iterator[str | OrcxResponse]:
+        message = {"request": request.model_dump(mode="json"), "history": history, "cache": cache}
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            try:
+                sock.connect(str(self.path))
+                sock.sendall(_encode(message))
+            except OSError as e:
+                raise OrcxError(f"Cannot reach orcx daemon on {self.path}: {e}") from e
+            with sock.makefile("rb") as lines:
+                for line in lines:
+                    reply = json.loads(line)
+                    if "chunk" in reply:
+                        yield reply["chunk"]
+                    elif "response" in reply:
+                        yield OrcxResponse.model_validate(reply["response"])
+                        return
+                    else:
+                        raise _remote_error(reply.get("error") or {})
+        raise OrcxError("orcx daemon closed the connection before responding")
+
+    def run(
+        self, request: OrcxRequest, history: list[dict] | None = None, cache: bool | None = None
+    ) -> OrcxResponse:
+        """Execute a request on the daemon."""
+        for item in self._items(request.model_copy(update={"stream": False}), history, cache):
+            if isinstance(item, OrcxResponse):
+                return item
+        raise AssertionError("unreachable")
+
+    def run_stream(
+        self, request: OrcxRequest, history: list[dict] | None = None, cache: bool | None = None
+    ) -> ResponseStream:
+        """Execute a streaming request on the daemon; see `router.run_stream`."""
+        return ResponseStream(
+            self._items(request.model_copy(update={"stream": True}), history, cache)
+        )
+
+
+def connect(path: Path | None = None) -> DaemonClient | None:
+    """A client for the running daemon, or None to run in-process."""
+    path = path or SOCKET_PATH
+    return DaemonClient(path) if is_running(path) else None
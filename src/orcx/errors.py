@@ -131,3 +131,23 @@ class ProviderUnavailableError(ProviderError):
         if status_code:
             msg += f" (HTTP {status_code})"
         super().__init__(msg)
+
+
+class CostLimitExceededError(OrcxError):
+    """Estimated request cost is over the --max-cost limit."""
+
+    def __init__(self, estimate: float, limit: float):
+        self.estimate = estimate
+        self.limit = limit
+        super().__init__(
+            f"Estimated input cost ${estimate:.6f} exceeds --max-cost ${limit:.6f}. "
+            "Use --estimate to inspect the request."
+        )
+
+
+class ContextError(OrcxError):
+    """File context could not be built (missing, binary, or too large)."""
+
+
+class OutputError(OrcxError):
+    """Streamed output could not be written to the -o file."""
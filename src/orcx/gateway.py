@@ -0,0 +1,503 @@
+"""OpenAI-compatible HTTP gateway over the router.
+
+`orcx gateway` serves `POST /v1/chat/completions` (with SSE streaming) and
+`GET /v1/models` on localhost, so tools that speak the OpenAI API can use
+orcx aliases, agents, provider preferences, failover and the response
+cache. The `model` field names an agent or a model (aliases are expanded);
+exchanges are logged to the conversation store.
+
+The server is a small HTTP/1.1 implementation on asyncio streams: one
+event loop serves every client, each request awaits the provider through
+`router.arun`/`router.arun_stream`, and connections are kept alive.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import functools
+import json
+import sys
+import time
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+from pydantic import ValidationError
+
+from orcx import conversation, router
+from orcx.config import load_config
+from orcx.errors import (
+    AgentNotFoundError,
+    AuthenticationError,
+    InvalidModelFormatError,
+    MissingApiKeyError,
+    NoModelSpecifiedError,
+    OrcxError,
+    ProviderConnectionError,
+    ProviderUnavailableError,
+    RateLimitError,
+)
+from orcx.registry import load_registry
+from orcx.schema import OrcxRequest, OrcxResponse
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8642
+
+# Requests carry whole conversations; refuse anything larger
+MAX_BODY_SIZE = 64 * 1024 * 1024
+
+# Longest request line or header accepted
+MAX_LINE_SIZE = 64 * 1024
+
+_REASONS = {
+    100: "Continue",
+    200: "OK",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+    502: "Bad Gateway",
+}
+
+# Chat completions fields the gateway translates; anything else is rejected
+_SUPPORTED_FIELDS = frozenset(
+    {
+        "messages",
+        "model",
+        "max_tokens",
+        "max_completion_tokens",
+        "temperature",
+        "stream",
+        "stream_options",
+        "user",
+    }
+)
+
+# Unsupported fields are still accepted at their OpenAI default values
+_DEFAULT_VALUES: dict[str, Any] = {
+    "n": 1,
+    "top_p": 1,
+    "presence_penalty": 0,
+    "frequency_penalty": 0,
+}
+
+# orcx error type to (HTTP status, OpenAI error type), checked in order
+_ERROR_STATUS: dict[type[OrcxError], tuple[int, str]] = {
+    MissingApiKeyError: (401, "authentication_error"),
+    AuthenticationError: (401, "authentication_error"),
+    RateLimitError: (429, "rate_limit_error"),
+    ProviderConnectionError: (502, "api_error"),
+    ProviderUnavailableError: (502, "api_error"),
+    AgentNotFoundError: (404, "invalid_request_error"),
+    InvalidModelFormatError: (400, "invalid_request_error"),
+    NoModelSpecifiedError: (400, "invalid_request_error"),
+}
+
+
+class HTTPError(Exception):
+    """A request the gateway answers with an error status."""
+
+    def __init__(self, status: int, message: str, kind: str = "invalid_request_error"):
+        self.status = status
+        self.message = message
+        self.kind = kind
+        super().__init__(message)
+
+
+def _error_body(message: str, kind: str) -> dict[str, Any]:
+    return {"error": {"message": message, "type": kind, "param": None, "code": None}}
+
+
+def _http_error(e: Exception) -> HTTPError:
+    """Map an exception from the router to the status OpenAI clients expect."""
+    if isinstance(e, HTTPError):
+        return e
+    if isinstance(e, OrcxError):
+        for exc_type, (status, kind) in _ERROR_STATUS.items():
+            if isinstance(e, exc_type):
+                return HTTPError(status, e.message, kind)
+        return HTTPError(500, e.message, "api_error")
+    return HTTPError(500, str(e) or type(e).__name__, "api_error")
+
+
+# Translation between the OpenAI API and orcx
+
+
+def _text(content: Any) -> str:
+    """Text of a message's content, which may be a string or a list of parts."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            part.get("text", "")
+            for part in content
+            if isinstance(part, dict) and part.get("type") == "text"
+        )
+    return ""
+
+
+def to_request(body: dict[str, Any]) -> tuple[OrcxRequest, list[dict]]:
+    """Translate a chat completions body to an orcx request and its history.
+
+    A leading system (or developer) message becomes the system prompt, the
+    final user message the prompt, and everything between the history.
+    `model` names an agent if one exists by that name, otherwise a model or
+    alias; an empty model uses the configured default.
+
+    Fields orcx can't honor (tools, response_format, stop, seed, ...) are
+    rejected rather than dropped, so clients never get a reply that silently
+    ignored them. Nulls and OpenAI's default values are accepted.
+    """
+    unsupported = sorted(
+        key
+        for key, value in body.items()
+        if key not in _SUPPORTED_FIELDS
+        and value is not None
+        and not (key in _DEFAULT_VALUES and value == _DEFAULT_VALUES[key])
+    )
+    if unsupported:
+        raise HTTPError(400, f"Unsupported parameters: {', '.join(unsupported)}")
+
+    messages = body.get("messages")
+    if not isinstance(messages, list) or not messages:
+        raise HTTPError(400, "'messages' must be a non-empty array")
+    if not all(isinstance(m, dict) and "role" in m for m in messages):
+        raise HTTPError(400, "Each message must be an object with a 'role'")
+
+    system = None
+    if messages[0]["role"] in ("system", "developer"):
+        system = _text(messages[0].get("content"))
+        messages = messages[1:]
+    if not messages or messages[-1]["role"] != "user":
+        raise HTTPError(400, "The last message must have role 'user'")
+
+    model = body.get("model") or None
+    if not (model is None or isinstance(model, str)):
+        raise HTTPError(400, "'model' must be a string")
+    target = {"agent": model} if model and load_registry().get(model) else {"model": model}
+
+    try:
+        request = OrcxRequest(
+            prompt=_text(messages[-1].get("content")),
+            system_prompt=system,
+            max_tokens=body.get("max_completion_tokens") or body.get("max_tokens"),
+            temperature=body.get("temperature"),
+            stream=bool(body.get("stream")),
+            **target,
+        )
+    except ValidationError as e:
+        errors = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+        raise HTTPError(400, f"Invalid request: {errors}") from None
+    return request, messages[:-1]
+
+
+def _usage(response: OrcxResponse) -> dict[str, int] | None:
+    if not response.usage:
+        return None
+    return {
+        key: response.usage.get(key) or 0
+        for key in ("prompt_tokens", "completion_tokens", "total_tokens")
+    }
+
+
+def to_completion(response: OrcxResponse, completion_id: str, created: int) -> dict[str, Any]:
+    """An OpenAI `chat.completion` object for a response."""
+    completion: dict[str, Any] = {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": created,
+        "model": response.model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": response.content},
+                "finish_reason": response.finish_reason or "stop",
+            }
+        ],
+    }
+    usage = _usage(response)
+    if usage:
+        completion["usage"] = usage
+    return completion
+
+
+def _chunk(
+    completion_id: str,
+    created: int,
+    model: str,
+    delta: dict[str, Any] | None,
+    finish_reason: str | None = None,
+) -> dict[str, Any]:
+    """An OpenAI `chat.completion.chunk` object; a None `delta` means no choices."""
+    choices = (
+        [] if delta is None else [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+    )
+    return {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": created,
+        "model": model,
+        "choices": choices,
+    }
+
+
+def list_models() -> dict[str, Any]:
+    """Agents and aliases, as an OpenAI model list."""
+    names = [*load_registry().list_names(), *load_config().aliases]
+    return {
+        "object": "list",
+        "data": [
+            {"id": name, "object": "model", "created": 0, "owned_by": "orcx"}
+            for name in dict.fromkeys(names)
+        ],
+    }
+
+
+def _log_exchange(request: OrcxRequest, response: OrcxResponse) -> None:
+    """Save one exchange as a conversation."""
+    try:
+        model, _ = router.resolve_model(request)
+    except OrcxError:
+        model = response.model
+    conv = conversation.create(model=model, agent=request.agent)
+    prompt = request.prompt
+    conv.title = prompt[:50] + "..." if len(prompt) > 50 else prompt
+    conversation.append(conv, conversation.exchange(prompt, response.content, response))
+
+
+async def _save(request: OrcxRequest, response: OrcxResponse | None) -> None:
+    """Log an exchange off the event loop; failures are reported, not raised."""
+    if response is None:
+        return
+    try:
+        await asyncio.to_thread(_log_exchange, request, response)
+    except Exception as e:
+        print(f"orcx gateway: failed to save conversation: {e}", file=sys.stderr)
+
+
+# HTTP
+
+
+class _Connection:
+    """One client connection: reads requests and writes responses."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.keep_alive = True
+
+    async def _readline(self) -> bytes:
+        try:
+            return await self.reader.readline()
+        except ValueError:  # longer than MAX_LINE_SIZE
+            self.keep_alive = False
+            raise HTTPError(400, "Request line or header too long") from None
+
+    async def read_request(self) -> tuple[str, str, dict[str, str], bytes] | None:
+        """Parse the next request, or return None when the client is done."""
+        line = await self._readline()
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            self.keep_alive = False
+            raise HTTPError(400, "Malformed request line") from None
+
+        headers: dict[str, str] = {}
+        while True:
+            line = await self._readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        connection = headers.get("connection", "").lower()
+        self.keep_alive = connection != "close" and (
+            version == "HTTP/1.1" or connection == "keep-alive"
+        )
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            self.keep_alive = False
+            raise HTTPError(411, "Chunked request bodies are not supported")
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            self.keep_alive = False
+            raise HTTPError(400, "Invalid Content-Length") from None
+        if length > MAX_BODY_SIZE:
+            self.keep_alive = False
+            raise HTTPError(413, f"Request body exceeds {MAX_BODY_SIZE} bytes")
+        if length and headers.get("expect", "").lower() == "100-continue":
+            self.writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+        body = await self.reader.readexactly(length) if length else b""
+        return method.upper(), target.split("?", 1)[0], headers, body
+
+    def _head(self, status: int, headers: dict[str, str]) -> bytes:
+        lines = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}"]
+        headers = {**headers, "Connection": "keep-alive" if self.keep_alive else "close"}
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def send_json(self, status: int, payload: dict[str, Any]) -> None:
+        body = json.dumps(payload).encode()
+        headers = {"Content-Type": "application/json", "Content-Length": str(len(body))}
+        self.writer.write(self._head(status, headers) + body)
+        await self.writer.drain()
+
+    async def send_error(self, error: HTTPError) -> None:
+        await self.send_json(error.status, _error_body(error.message, error.kind))
+
+    async def start_events(self) -> None:
+        headers = {
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "Transfer-Encoding": "chunked",
+        }
+        self.writer.write(self._head(200, headers))
+
+    async def send_event(self, data: dict[str, Any] | str) -> None:
+        """Write one server-sent event as one chunk of the chunked body."""
+        text = data if isinstance(data, str) else json.dumps(data, separators=(",", ":"))
+        event = f"data: {text}\n\n".encode()
+        self.writer.write(f"{len(event):x}\r\n".encode() + event + b"\r\n")
+        await self.writer.drain()
+
+    async def end_events(self) -> None:
+        self.writer.write(b"0\r\n\r\n")
+        await self.writer.drain()
+
+
+async def _chat_completions(conn: _Connection, body: bytes, save: bool) -> None:
+    try:
+        payload = json.loads(body)
+    except ValueError as e:
+        raise HTTPError(400, f"Invalid JSON body: {e}") from None
+    if not isinstance(payload, dict):
+        raise HTTPError(400, "Request body must be a JSON object")
+
+    request, history = to_request(payload)
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+
+    if not request.stream:
+        response = await router.arun(request, history=history)
+        if save:
+            await _save(request, response)
+        await conn.send_json(200, to_completion(response, completion_id, created))
+        return
+
+    model, _ = router.resolve_model(request)
+    stream = router.arun_stream(request, history=history)
+    try:
+        # Errors before the first chunk still get a proper status code
+        first: str | None = await anext(stream, None)
+        await conn.start_events()
+        await conn.send_event(
+            _chunk(completion_id, created, model, {"role": "assistant", "content": ""})
+        )
+        try:
+            if first is not None:
+                await conn.send_event(_chunk(completion_id, created, model, {"content": first}))
+            async for text in stream:
+                await conn.send_event(_chunk(completion_id, created, model, {"content": text}))
+        except ConnectionError:
+            raise
+        except Exception as e:
+            # Headers are out; report the failure in-stream instead
+            error = _http_error(e)
+            await conn.send_event(_error_body(error.message, error.kind))
+            await conn.send_event("[DONE]")
+            await conn.end_events()
+            conn.keep_alive = False
+            return
+
+        response = stream.response
+        finish_reason = (response.finish_reason if response else None) or "stop"
+        await conn.send_event(_chunk(completion_id, created, model, {}, finish_reason))
+        stream_options = payload.get("stream_options") or {}
+        if response is not None and stream_options.get("include_usage"):
+            usage_chunk = _chunk(completion_id, created, model, None)
+            usage_chunk["usage"] = _usage(response)
+            await conn.send_event(usage_chunk)
+        if save:
+            await _save(request, response)
+        await conn.send_event("[DONE]")
+        await conn.end_events()
+    finally:
+        # Also reached when the client hangs up: release the provider stream
+        await stream.aclose()
+
+
+async def _dispatch(conn: _Connection, method: str, path: str, body: bytes, save: bool) -> None:
+    path = path.rstrip("/")
+    if path == "/v1/chat/completions":
+        if method != "POST":
+            raise HTTPError(405, f"Method {method} not allowed")
+        await _chat_completions(conn, body, save)
+    elif path == "/v1/models":
+        if method != "GET":
+            raise HTTPError(405, f"Method {method} not allowed")
+        await conn.send_json(200, list_models())
+    else:
+        raise HTTPError(404, f"Unknown path: {path}")
+
+
+async def _handle(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, save: bool = True
+) -> None:
+    """Serve requests on a connection until the client closes it."""
+    conn = _Connection(reader, writer)
+    try:
+        while conn.keep_alive:
+            try:
+                parsed = await conn.read_request()
+                if parsed is None:
+                    break
+                method, path, _, body = parsed
+                await _dispatch(conn, method, path, body, save)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                break
+            except Exception as e:
+                await conn.send_error(_http_error(e))
+    except ConnectionError:
+        pass
+    finally:
+        with contextlib.suppress(Exception):
+            writer.close()
+            await writer.wait_closed()
+
+
+async def start(
+    host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, save: bool = True
+) -> asyncio.Server:
+    """Warm up the router and start listening. Port 0 picks a free port."""
+    router._load_litellm()
+    load_config()
+    return await asyncio.start_server(
+        functools.partial(_handle, save=save), host, port, limit=MAX_LINE_SIZE
+    )
+
+
+def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    save: bool = True,
+    on_ready: Callable[[str, int], object] | None = None,
+) -> None:
+    """Run the gateway until interrupted."""
+
+    async def main() -> None:
+        server = await start(host, port, save)
+        bound_host, bound_port = server.sockets[0].getsockname()[:2]
+        if on_ready is not None:
+            on_ready(bound_host, bound_port)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
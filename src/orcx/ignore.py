@@ -0,0 +1,133 @@
+""".gitignore matching for directory and glob file inputs."""
+
+from __future__ import annotations
+
+import contextlib
+import re
+from pathlib import Path
+from typing import NamedTuple
+
+# Never descended into, regardless of ignore files
+ALWAYS_IGNORED = {".git", ".hg", ".svn"}
+
+
+class _Rule(NamedTuple):
+    base: Path
+    regex: re.Pattern[str]
+    negate: bool
+    dir_only: bool
+
+
+def _translate(pattern: str) -> str:
+    """Translate a gitignore glob to a regex over '/'-separated relative paths."""
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 1 :]:
+            end = pattern.index("]", i + 1)
+            body = pattern[i + 1 : end].replace("\\", "\\\\")
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append(f"[{body}]")
+            i = end + 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(out)
+
+
+def parse_rules(text: str, base: Path) -> list[_Rule]:
+    """Parse the contents of a .gitignore located in `base`."""
+    rules = []
+    for line in text.splitlines():
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate or line.startswith("\\"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        # A slash anywhere but the end anchors the pattern to the .gitignore's directory
+        anchored = "/" in line
+        line = line.lstrip("/")
+        prefix = "" if anchored else "(?:.*/)?"
+        regex = re.compile(f"^{prefix}{_translate(line)}$")
+        rules.append(_Rule(base, regex, negate, dir_only))
+    return rules
+
+
+def _repo_root(path: Path) -> Path | None:
+    """Nearest ancestor (or self) containing a .git entry."""
+    for candidate in (path, *path.parents):
+        if (candidate / ".git").exists():
+            return candidate
+    return None
+
+
+class GitIgnore:
+    """Answers whether paths are ignored, reading .gitignore files from the repository root down.
+
+    Outside a git repository only .gitignore files at or below `top` apply.
+    Rules are cached per directory, so checking many files is cheap.
+    """
+
+    def __init__(self, top: Path):
+        top = top.resolve()
+        self.root = _repo_root(top) or top
+        self._rules: dict[Path, list[_Rule]] = {}
+        self._ignored: dict[Path, bool] = {}
+
+    def _rules_for(self, directory: Path) -> list[_Rule]:
+        """Cumulative rules that apply to entries of `directory`."""
+        if directory in self._rules:
+            return self._rules[directory]
+        if directory == self.root or self.root not in directory.parents:
+            inherited: list[_Rule] = []
+        else:
+            inherited = self._rules_for(directory.parent)
+
+        rules = inherited
+        ignore_file = directory / ".gitignore"
+        if ignore_file.is_file():
+            with contextlib.suppress(OSError):
+                rules = inherited + parse_rules(ignore_file.read_text(errors="replace"), directory)
+        self._rules[directory] = rules
+        return rules
+
+    def ignored(self, path: Path, is_dir: bool | None = None) -> bool:
+        """Whether `path` or any directory above it (up to the root) is ignored."""
+        path = path.resolve()
+        if path in self._ignored:
+            return self._ignored[path]
+        if is_dir is None:
+            is_dir = path.is_dir()
+
+        result = False
+        if path.name in ALWAYS_IGNORED:
+            result = True
+        elif path != self.root and self.root in path.parents:
+            if self.ignored(path.parent, is_dir=True):
+                result = True
+            else:
+                for rule in self._rules_for(path.parent):
+                    if rule.dir_only and not is_dir:
+                        continue
+                    if rule.regex.match(path.relative_to(rule.base).as_posix()):
+                        result = not rule.negate
+        self._ignored[path] = result
+        return result
@@ -0,0 +1,156 @@
+"""Shared, pooled HTTP clients for provider calls.
+
+litellm builds OpenAI-compatible SDK clients around `litellm.client_session`
+and `litellm.aclient_session` when they are set. Handing it one long-lived
+httpx client per process (and one async client per event loop, since async
+connections can't move between loops) keeps TCP/TLS connections alive across
+requests, which matters for batch runs, the daemon and the gateway.
+
+Every request is traced, so `stats()` can report how many connections were
+opened versus reused.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import os
+import sys
+import threading
+import weakref
+from dataclasses import dataclass, replace
+from typing import Any
+
+import httpx
+
+from orcx.config import HttpConfig, load_config
+
+
+@dataclass
+class PoolStats:
+    """Connection reuse counters for the shared clients."""
+
+    requests: int = 0
+    connections: int = 0  # new TCP connections opened
+    tls_handshakes: int = 0
+
+    @property
+    def reused(self) -> int:
+        """Requests served on an already-open connection."""
+        return max(0, self.requests - self.connections)
+
+    def __str__(self) -> str:
+        return (
+            f"[http: {self.requests} requests, {self.connections} connections "
+            f"({self.reused} reused), {self.tls_handshakes} TLS handshakes]"
+        )
+
+
+_lock = threading.Lock()
+_stats = PoolStats()
+_client: tuple[int, httpx.Client] | None = None  # (pid, client): don't share across fork
+_async_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _count(event: str) -> None:
+    with _lock:
+        if event == "request":
+            _stats.requests += 1
+        elif event == "connection.connect_tcp.complete":
+            _stats.connections += 1
+        elif event == "connection.start_tls.complete":
+            _stats.tls_handshakes += 1
+
+
+def _trace(event: str, info: dict[str, Any]) -> None:
+    _count(event)
+
+
+async def _atrace(event: str, info: dict[str, Any]) -> None:
+    _count(event)
+
+
+def _on_request(request: httpx.Request) -> None:
+    _count("request")
+    request.extensions.setdefault("trace", _trace)
+
+
+async def _on_arequest(request: httpx.Request) -> None:
+    _count("request")
+    request.extensions.setdefault("trace", _atrace)
+
+
+def http2_enabled(settings: HttpConfig) -> bool:
+    """HTTP/2 needs the optional `h2` package; fall back to HTTP/1.1 without it."""
+    return settings.http2 and importlib.util.find_spec("h2") is not None
+
+
+def _options() -> dict[str, Any]:
+    settings = load_config().http or HttpConfig()
+    return {
+        "limits": httpx.Limits(
+            max_connections=settings.max_connections,
+            max_keepalive_connections=settings.max_keepalive_connections,
+            keepalive_expiry=settings.keepalive_expiry,
+        ),
+        "timeout": httpx.Timeout(settings.timeout, connect=settings.connect_timeout),
+        "http2": http2_enabled(settings),
+        "follow_redirects": True,
+    }
+
+
+def get_client() -> httpx.Client:
+    """The process-wide pooled client, created on first use."""
+    global _client
+    pid = os.getpid()
+    if _client is not None and _client[0] == pid:
+        return _client[1]
+    options = _options()
+    with _lock:
+        if _client is None or _client[0] != pid:
+            _client = (pid, httpx.Client(event_hooks={"request": [_on_request]}, **options))
+        return _client[1]
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """The pooled async client for the running event loop, created on first use."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is not None:
+        return client
+    options = _options()
+    with _lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(event_hooks={"request": [_on_arequest]}, **options)
+            _async_clients[loop] = client
+        return client
+
+
+def stats() -> PoolStats:
+    """A snapshot of the connection reuse counters."""
+    with _lock:
+        return replace(_stats)
+
+
+def close() -> None:
+    """Close the sync client and forget every client, e.g. after a config change.
+
+    Async clients are dropped rather than closed: closing needs their own
+    event loop, and their connections go when the loop does. litellm's cached
+    SDK clients wrap the old sessions, so they are dropped too.
+    """
+    global _client, _stats
+    with _lock:
+        client, _client = _client, None
+        _async_clients.clear()
+        _stats = PoolStats()
+    litellm = sys.modules.get("litellm")
+    if litellm is not None:
+        litellm.client_session = None
+        litellm.aclient_session = None
+        litellm.in_memory_llm_clients_cache.flush_cache()
+    if client is not None and client[0] == os.getpid():
+        client[1].close()
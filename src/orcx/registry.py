@@ -2,10 +2,9 @@
 
 from __future__ import annotations
 
-import yaml
 from pydantic import BaseModel, ValidationError
 
-from orcx.config import AGENTS_FILE, ensure_config_dir
+from orcx.config import AGENTS_FILE, clear_cache, ensure_config_dir, load_cached, write_snapshot
 from orcx.errors import AgentValidationError, ConfigFileError
 from orcx.schema import AgentConfig
 
@@ -44,10 +43,21 @@ def _validate_agent_config(name: str, config: dict) -> None:
         raise AgentValidationError(name, missing)
 
 
-def load_registry() -> AgentRegistry:
-    """Load agent registry from YAML file."""
+def load_registry(refresh: bool = False) -> AgentRegistry:
+    """Load agent registry from YAML file.
+
+    Cached per process like `load_config`; pass `refresh=True` to force a re-read.
+    """
+    registry = load_cached(AGENTS_FILE, AgentRegistry, _parse_registry_file, refresh)
+    return registry.model_copy(deep=True)
+
+
+def _parse_registry_file() -> tuple[AgentRegistry, list[str]]:
+    """Read and validate agents.yaml. Returns the registry and its provider pref warnings."""
+    import yaml
+
     if not AGENTS_FILE.exists():
-        return AgentRegistry()
+        return AgentRegistry(), []
 
     try:
         with AGENTS_FILE.open() as f:
@@ -59,7 +69,7 @@ def load_registry() -> AgentRegistry:
         ) from e
 
     if data is None:
-        return AgentRegistry()
+        return AgentRegistry(), []
 
     if not isinstance(data, dict):
         raise ConfigFileError(
@@ -86,17 +96,7 @@ def load_registry() -> AgentRegistry:
         config["name"] = name
 
         try:
-            agent = AgentConfig.model_validate(config)
-            agents[name] = agent
-
-            # Validate provider prefs and print warnings
-            if agent.provider_prefs:
-                import sys
-
-                from orcx.schema import validate_provider_prefs
-
-                for warning in validate_provider_prefs(agent.provider_prefs, f"agent '{name}'"):
-                    print(f"Warning: {warning}", file=sys.stderr)
+            agents[name] = AgentConfig.model_validate(config)
         except ValidationError as e:
             errors = "; ".join(
                 f"{'.'.join(str(x) for x in err['loc'])}: {err['msg']}" for err in e.errors()
@@ -106,11 +106,26 @@ def load_registry() -> AgentRegistry:
                 details=errors,
             ) from e
 
-    return AgentRegistry(agents=agents)
+    registry = AgentRegistry(agents=agents)
+    return registry, _registry_warnings(registry)
+
+
+def _registry_warnings(registry: AgentRegistry) -> list[str]:
+    """Problems worth printing (but not failing on) in the agents' provider prefs."""
+    from orcx.schema import validate_provider_prefs
+
+    return [
+        warning
+        for name, agent in registry.agents.items()
+        if agent.provider_prefs
+        for warning in validate_provider_prefs(agent.provider_prefs, f"agent '{name}'")
+    ]
 
 
 def save_registry(registry: AgentRegistry) -> None:
     """Save agent registry to YAML file."""
+    import yaml
+
     ensure_config_dir()
 
     data = {
@@ -122,3 +137,5 @@ def save_registry(registry: AgentRegistry) -> None:
 
     with AGENTS_FILE.open("w") as f:
         yaml.safe_dump(data, f, default_flow_style=False, sort_keys=False)
+    clear_cache(AGENTS_FILE)
+    write_snapshot(AGENTS_FILE, registry, _registry_warnings(registry))
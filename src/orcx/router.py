@@ -3,29 +3,94 @@
 from __future__ import annotations
 
 import contextlib
+import os
+import threading
+import time
 import warnings
-from collections.abc import Iterator
+from collections.abc import AsyncIterator, Iterator
+from types import ModuleType
+from typing import Any
 
-import litellm
-
-from orcx.config import ENV_KEY_MAP, load_config
+from orcx.config import ENV_KEY_MAP, CacheConfig, load_config
 from orcx.errors import (
     AgentNotFoundError,
     AuthenticationError,
     InvalidModelFormatError,
     NoModelSpecifiedError,
+    ProviderConnectionError,
+    ProviderUnavailableError,
     RateLimitError,
 )
 from orcx.registry import load_registry
-from orcx.schema import AgentConfig, OrcxRequest, OrcxResponse, ProviderPrefs
+from orcx.schema import (
+    AgentConfig,
+    Attempt,
+    ContextFile,
+    Estimate,
+    HistoryPolicy,
+    OrcxRequest,
+    OrcxResponse,
+    ProviderPrefs,
+    RetryPolicy,
+    Timings,
+)
 
-litellm.suppress_debug_info = True  # type: ignore[assignment]
+# Errors worth retrying, or failing over to the next fallback model
+TRANSIENT_ERRORS = (RateLimitError, ProviderUnavailableError, ProviderConnectionError)
+
+# Serializes the first litellm import when requests run on worker threads
+_litellm_lock = threading.Lock()
+
+
+def _load_litellm() -> ModuleType:
+    """Import and configure litellm on first use.
+
+    litellm takes seconds to import, so it is deferred until a completion is
+    actually made. Commands like `orcx agents` never pay for it.
+    """
+    module = globals().get("litellm")
+    if module is not None:
+        return module
+
+    with _litellm_lock:
+        module = globals().get("litellm")
+        if module is not None:
+            return module
+
+        import litellm as module
+
+        module.suppress_debug_info = True  # type: ignore[assignment]
+
+        # Suppress litellm's internal Pydantic serialization warnings
+        # These occur when OpenRouter returns fewer fields than litellm expects
+        warnings.filterwarnings(
+            "ignore", message=".*PydanticSerializationUnexpectedValue.*", module="litellm"
+        )
+
+        globals()["litellm"] = module
+        return module
 
-# Suppress litellm's internal Pydantic serialization warnings
-# These occur when OpenRouter returns fewer fields than litellm expects
-warnings.filterwarnings(
-    "ignore", message=".*PydanticSerializationUnexpectedValue.*", module="litellm"
-)
+
+def _pooled(litellm: ModuleType, asynchronous: bool = False) -> ModuleType:
+    """Point litellm at the shared connection pool before a provider call.
+
+    OpenAI-compatible providers send through these sessions; litellm's other
+    handlers keep their own per-process clients.
+    """
+    from orcx import pool
+
+    if asynchronous:
+        litellm.aclient_session = pool.get_async_client()
+    else:
+        litellm.client_session = pool.get_client()
+    return litellm
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve `orcx.router.litellm` lazily."""
+    if name == "litellm":
+        return _load_litellm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def extract_provider(model: str) -> str:
@@ -80,28 +145,222 @@ def resolve_model(request: OrcxRequest) -> tuple[str, AgentConfig | None]:
     raise NoModelSpecifiedError()
 
 
+def _cacheable(text: str) -> list[dict]:
+    """Wrap text in a content block carrying a prompt-cache breakpoint."""
+    return [{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}]
+
+
+def get_history_policy(agent: AgentConfig | None) -> HistoryPolicy:
+    """Get the effective history policy: agent fields override the global policy."""
+    policy = load_config().history or HistoryPolicy()
+    if agent and agent.history:
+        return agent.history.merge_with(policy)
+    return policy
+
+
+def history_budget(
+    model: str, request: OrcxRequest, agent: AgentConfig | None, policy: HistoryPolicy
+) -> int | None:
+    """Input token budget for a model, or None when its context window is unknown."""
+    if policy.max_tokens:
+        return policy.max_tokens
+
+    try:
+        window = _load_litellm().get_model_info(model).get("max_input_tokens")
+    except Exception:
+        return None
+    if not window:
+        return None
+    reserve = request.max_tokens or (agent.max_tokens if agent else None) or policy.reserve_tokens
+    return max(0, window - reserve)
+
+
+def _without_files(context: str, files: list[ContextFile]) -> str:
+    """`context` with each file's content cut out, leaving the prefix and block headers."""
+    kept = []
+    offset = 0
+    for file in files:
+        kept.append(context[offset : file.start])
+        offset = file.end
+    kept.append(context[offset:])
+    return "".join(kept)
+
+
+def _split_context(
+    message: dict, context: str, files: list[ContextFile]
+) -> tuple[dict, list[ContextFile]]:
+    """Copy of `message` with -f file contents cut out of its context text, plus those files."""
+    content = message.get("content")
+    if content == context:
+        return {**message, "content": _without_files(context, files)}, files
+    if not isinstance(content, list):
+        return message, []
+
+    blocks = []
+    found = []
+    for block in content:
+        if isinstance(block, dict) and block.get("text") == context:
+            block = {**block, "text": _without_files(context, files)}
+            found = files
+        blocks.append(block)
+    return ({**message, "content": blocks}, found) if found else (message, [])
+
+
+def _file_tokens(model: str, context: str, files: list[ContextFile]) -> dict[str, int]:
+    """Token count of each file's content by path, reusing counts for unchanged files."""
+    from orcx import cache as disk_cache
+
+    found = disk_cache.get_token_counts(model, [(f.path, f.mtime_ns, f.size) for f in files])
+    missing = [f for f in files if f.path not in found]
+    litellm = _load_litellm()
+    counted = [
+        (
+            f.path,
+            f.mtime_ns,
+            f.size,
+            litellm.token_counter(model=model, text=context[f.start : f.end]),
+        )
+        for f in missing
+    ]
+    if counted:
+        disk_cache.put_token_counts(model, counted)
+    return found | {path: tokens for path, _, _, tokens in counted}
+
+
+def _token_cache_enabled() -> bool:
+    return (load_config().cache or CacheConfig()).files
+
+
+def _strip_files(
+    model: str, messages: list[dict], context: str | None, files: list[ContextFile] | None
+) -> tuple[list[dict], list[int]]:
+    """Messages with -f file contents cut out, and the token count cut from each.
+
+    File counts are kept in the cache database by path, mtime and size, so
+    only files that changed since the last count are re-tokenized.
+    """
+    none = [0] * len(messages)
+    if not context or not files or not _token_cache_enabled():
+        return messages, none
+    split = [_split_context(m, context, files) for m in messages]
+    if not any(found for _, found in split):
+        return messages, none
+    counts = _file_tokens(model, context, files)
+    return [m for m, _ in split], [sum(counts[f.path] for f in found) for _, found in split]
+
+
+def count_tokens(
+    model: str,
+    messages: list[dict],
+    context: str | None = None,
+    files: list[ContextFile] | None = None,
+) -> int:
+    """Input token count for `messages`.
+
+    With `cache.files`, the content of each -f file in `context` (see
+    `ContextFile`) is counted on its own and the count reused until the file
+    changes. Tokens can merge across the boundary between a file and the
+    text around it, so the summed count is approximate: it may differ from
+    counting the whole message by a few tokens per file.
+    """
+    stripped, extra = _strip_files(model, messages, context, files)
+    return _load_litellm().token_counter(model=model, messages=stripped) + sum(extra)
+
+
+def message_tokens(
+    model: str,
+    messages: list[dict],
+    context: str | None = None,
+    files: list[ContextFile] | None = None,
+) -> list[int]:
+    """Token count of each message on its own, with file counts reused like `count_tokens`."""
+    litellm = _load_litellm()
+    stripped, extra = _strip_files(model, messages, context, files)
+    return [
+        litellm.token_counter(model=model, messages=[m]) + n
+        for m, n in zip(stripped, extra, strict=True)
+    ]
+
+
+def fit_messages(
+    messages: list[dict],
+    model: str,
+    budget: int,
+    pinned: int = 0,
+    context: str | None = None,
+    files: list[ContextFile] | None = None,
+) -> list[dict]:
+    """Drop the oldest messages after the first `pinned` until the rest fit `budget` tokens.
+
+    The last message (the prompt) is always kept, and the window never starts
+    on an assistant reply, so user/assistant turns stay aligned. `context`
+    and `files` let -f file counts be reused (see `count_tokens`).
+
+    The whole list is counted first; messages are only counted one by one
+    when it doesn't fit.
+    """
+    if count_tokens(model, messages, context, files) <= budget:
+        return messages
+    counts = message_tokens(model, messages, context, files)
+    total = sum(counts)
+    last = len(messages) - 1
+    start = pinned
+    while total > budget and start < last:
+        total -= counts[start]
+        start += 1
+        while start < last and messages[start]["role"] == "assistant":
+            total -= counts[start]
+            start += 1
+    return messages[:pinned] + messages[start:]
+
+
 def build_messages(
     request: OrcxRequest,
     agent: AgentConfig | None,
     history: list[dict] | None = None,
-) -> list[dict[str, str]]:
-    """Build message list for LLM call."""
-    messages = []
+    model: str | None = None,
+) -> list[dict]:
+    """Build message list for LLM call.
+
+    With `cache_prefix` (request or agent), the system prompt and context are
+    marked as prompt-cache breakpoints. Providers that cache explicitly
+    (Anthropic, Gemini, OpenRouter) reuse that prefix across calls; litellm
+    drops the markers for providers that don't.
+
+    Given a `model`, history is trimmed to the model's token budget per the
+    history policy (see `HistoryPolicy`).
+    """
+    messages: list[dict] = []
+    cache_prefix = request.cache_prefix or (agent.cache_prefix if agent else False)
 
     system = request.system_prompt or (agent.system_prompt if agent else None)
     if system:
-        messages.append({"role": "system", "content": system})
+        content = _cacheable(system) if cache_prefix else system
+        messages.append({"role": "system", "content": content})
 
     if request.context:
-        messages.append({"role": "user", "content": request.context})
+        content = _cacheable(request.context) if cache_prefix else request.context
+        messages.append({"role": "user", "content": content})
         messages.append({"role": "assistant", "content": "Understood."})
 
+    prefix = len(messages)
+
     # Add conversation history
     if history:
         messages.extend(history)
 
     messages.append({"role": "user", "content": request.prompt})
-    return messages
+
+    if model is None:
+        return messages
+    policy = get_history_policy(agent)
+    pinned = prefix if policy.pin_prefix else 0
+    if len(messages) - pinned <= 1:
+        return messages  # nothing that could be dropped
+    budget = history_budget(model, request, agent, policy)
+    if budget is None:
+        return messages
+    return fit_messages(messages, model, budget, pinned, request.context, request.context_files)
 
 
 def get_effective_prefs(model: str, agent: AgentConfig | None) -> ProviderPrefs | None:
@@ -129,7 +388,7 @@ def build_params(
     request: OrcxRequest,
     agent: AgentConfig | None,
     model: str,
-    messages: list[dict[str, str]],
+    messages: list[dict],
     stream: bool,
 ) -> dict:
     """Build litellm completion params."""
@@ -138,6 +397,9 @@ def build_params(
         "messages": messages,
         "stream": stream,
     }
+    if stream:
+        # Usage arrives in the final chunk; litellm drops this for providers without it
+        params["stream_options"] = {"include_usage": True}
 
     max_tokens = request.max_tokens or (agent.max_tokens if agent else None)
     if max_tokens:
@@ -181,10 +443,9 @@ def build_params(
 
 def _wrap_litellm_error(e: Exception, model: str) -> Exception:
     """Convert litellm exceptions to orcx errors."""
-    import os
-
-    from orcx.errors import MissingApiKeyError, ProviderConnectionError, ProviderUnavailableError
+    from orcx.errors import MissingApiKeyError
 
+    litellm = _load_litellm()
     provider = extract_provider(model)
     env_var = ENV_KEY_MAP.get(provider)
 
@@ -214,18 +475,505 @@ def _wrap_litellm_error(e: Exception, model: str) -> Exception:
     return e
 
 
-def run(request: OrcxRequest, history: list[dict] | None = None) -> OrcxResponse:
-    """Execute a single LLM request."""
+def candidate_models(model: str, agent: AgentConfig | None) -> list[str]:
+    """Models to try in order: the resolved model, then the agent's fallbacks."""
+    models = [model]
+    if agent:
+        for fallback in agent.fallback_models:
+            fallback = expand_alias(fallback)
+            validate_model_format(fallback)
+            if fallback not in models:
+                models.append(fallback)
+    return models
+
+
+def get_retry_policy(agent: AgentConfig | None) -> RetryPolicy:
+    """Get the effective retry policy: agent fields override the global policy."""
+    policy = load_config().retry or RetryPolicy()
+    if agent and agent.retry:
+        return agent.retry.merge_with(policy)
+    return policy
+
+
+def _next_step(
+    e: Exception,
+    model: str,
+    attempts: list[Attempt],
+    policy: RetryPolicy,
+    attempt: int,
+    last_model: bool,
+) -> float | Exception | None:
+    """Record a failed attempt and decide what happens next.
+
+    Returns a delay in seconds to retry the same model, None to fail over to
+    the next model, or the error to raise.
+    """
+    error = _wrap_litellm_error(e, model)
+    record = Attempt(model=model, error=str(error))
+    attempts.append(record)
+    if not isinstance(error, TRANSIENT_ERRORS):
+        return error
+
+    record.delay = policy.delay(attempt, getattr(error, "retry_after", None))
+    if record.delay is not None:
+        return record.delay
+    return error if last_model else None
+
+
+def _cache_lookup(params: dict, cache: bool | None) -> tuple[str | None, OrcxResponse | None]:
+    """Return (key, cached response) when response caching is on for this call.
+
+    `cache` overrides the config's `cache.enabled`. Returns (None, None) when off.
+    """
+    settings = load_config().cache or CacheConfig()
+    if not (settings.enabled if cache is None else cache):
+        return None, None
+
+    from orcx import cache as response_cache
+
+    key = response_cache.make_key(params)
+    return key, response_cache.get(key, settings.ttl)
+
+
+def _cache_store(key: str | None, response: OrcxResponse) -> None:
+    """Store a response under a key from `_cache_lookup`, if caching was on."""
+    if key is None:
+        return
+
+    from orcx import cache as response_cache
+
+    settings = load_config().cache or CacheConfig()
+    response_cache.put(key, response, settings.ttl, settings.max_size)
+
+
+class _Spans:
+    """Phase timings for one request, as consecutive laps from a start time."""
+
+    def __init__(self) -> None:
+        self.timings = Timings()
+        self._start = self._mark = time.perf_counter()
+
+    def lap(self, phase: str | None = None) -> None:
+        """Record the time since the last lap as `phase` (or leave it out) and start a new lap."""
+        now = time.perf_counter()
+        if phase is not None:
+            setattr(self.timings, phase, now - self._mark)
+        self._mark = now
+
+    def split(self, phase: str) -> None:
+        """Record the time since the last lap as `phase`, keeping the lap running."""
+        setattr(self.timings, phase, time.perf_counter() - self._mark)
+
+    def finish(self, result: OrcxResponse) -> OrcxResponse:
+        """Attach the timings, with the total and output tokens/sec, to the response."""
+        timings = self.timings
+        timings.total = time.perf_counter() - self._start
+        tokens = (result.usage or {}).get("completion_tokens")
+        decode = (timings.generation or 0.0) - (timings.ttft or 0.0)
+        if tokens and decode > 0:
+            timings.tokens_per_second = tokens / decode
+        result.timings = timings
+        return result
+
+
+def _finish(response: Any, model: str, attempts: list[Attempt]) -> OrcxResponse:
+    """Build the response for a successful attempt."""
+    result = response if isinstance(response, OrcxResponse) else _to_orcx_response(response, model)
+    attempts.append(Attempt(model=model))
+    result.attempts = attempts
+    result.retries = sum(1 for a in attempts if a.delay is not None)
+    return result
+
+
+class _Call:
+    """One request from setup to result, shared by `run`, `arun` and their streaming forms.
+
+    Setup resolves the model, builds messages, checks the response cache and
+    loads the pooled litellm. `tries` then walks the candidate models and
+    retries; the caller makes each call and reports a failure to `failed`
+    (which raises or returns the delay before the next try) or passes the
+    result to `succeeded`. Only the call itself and the sleep differ between
+    the sync and async paths.
+    """
+
+    def __init__(
+        self,
+        request: OrcxRequest,
+        history: list[dict] | None,
+        cache: bool | None,
+        asynchronous: bool = False,
+    ):
+        self.spans = _Spans()
+        model, self.agent = resolve_model(request)
+        self.spans.lap("resolve")
+        self.messages = build_messages(request, self.agent, history, model)
+        self.spans.lap("messages")
+        self.key, self.hit = _cache_lookup(
+            build_params(request, self.agent, model, self.messages, stream=False), cache
+        )
+        self.request = request
+        self.model = model
+        self.attempts: list[Attempt] = []
+        # Per-try state, reset by `tries`
+        self.raw: list[Any] = []
+        self.chunks: list[str] = []
+        self._attempt = 0
+        self._last = False
+        self._failover = False
+        if self.hit:
+            return
+        self.models = candidate_models(model, self.agent)
+        self.policy = get_retry_policy(self.agent)
+        self.spans.lap()
+        self.litellm = _pooled(_load_litellm(), asynchronous=asynchronous)
+        self.spans.lap("imports")
+
+    def replay(self) -> list[str | OrcxResponse]:
+        """A cache hit as stream items: its content as one chunk, then the response."""
+        assert self.hit is not None
+        items: list[str | OrcxResponse] = [self.hit.content] if self.hit.content else []
+        return [*items, self.spans.finish(self.hit)]
+
+    def tries(self, stream: bool) -> Iterator[tuple[str, dict]]:
+        """(model, params) for each try: retries of a model, then its fallbacks."""
+        for i, candidate in enumerate(self.models):
+            self.model = candidate
+            self._last = i == len(self.models) - 1
+            params = build_params(self.request, self.agent, candidate, self.messages, stream)
+            for attempt in range(self.policy.max_attempts):
+                self._attempt = attempt
+                self.raw, self.chunks = [], []
+                yield candidate, params
+                if self._failover:
+                    self._failover = False
+                    break
+
+    def text(self, chunk: Any) -> str | None:
+        """Record a streamed chunk and return its content, if any."""
+        self.raw.append(chunk)
+        if not (chunk.choices and chunk.choices[0].delta.content):
+            return None
+        if not self.chunks:
+            self.spans.split("ttft")
+        self.chunks.append(chunk.choices[0].delta.content)
+        return self.chunks[-1]
+
+    def failed(self, e: Exception) -> float:
+        """Record a failed try and return the delay before the next one.
+
+        Raises when the error is final, or when a stream fails after output
+        started. Failing over to the next model returns 0.
+        """
+        if self.chunks:
+            raise _wrap_litellm_error(e, self.model) from e
+        step = _next_step(e, self.model, self.attempts, self.policy, self._attempt, self._last)
+        if isinstance(step, Exception):
+            raise step from e
+        if step is None:
+            self._failover = True
+            return 0.0
+        return step
+
+    def succeeded(self, response: Any = None) -> OrcxResponse:
+        """Finish a successful try: build, cache and time the response.
+
+        Without a `response`, it is rebuilt from the streamed chunks.
+        """
+        self.spans.split("generation")
+        if response is None:
+            response = _stream_response(self.raw, self.chunks, self.messages, self.model)
+        result = _finish(response, self.model, self.attempts)
+        _cache_store(self.key, result)
+        return self.spans.finish(result)
+
+
+def run(
+    request: OrcxRequest, history: list[dict] | None = None, cache: bool | None = None
+) -> OrcxResponse:
+    """Execute a single LLM request.
+
+    Transient errors are retried per the retry policy, then fail over to the
+    agent's fallback models. With response caching on (`cache`, or the config
+    default), identical requests are answered from disk.
+    """
+    call = _Call(request, history, cache)
+    if call.hit:
+        return call.spans.finish(call.hit)
+
+    for _, params in call.tries(stream=False):
+        try:
+            response = call.litellm.completion(**params)
+        except Exception as e:
+            delay = call.failed(e)
+            if delay:
+                time.sleep(delay)
+            continue
+        return call.succeeded(response)
+
+    raise AssertionError("unreachable")
+
+
+class ResponseStream:
+    """Content chunks of a streamed response.
+
+    Iterate for the text as it arrives; once exhausted, `response` holds the
+    complete response with usage and cost.
+    """
+
+    def __init__(self, items: Iterator[str | OrcxResponse]):
+        self._items = items
+        self.response: OrcxResponse | None = None
+
+    def __iter__(self) -> ResponseStream:
+        return self
+
+    def __next__(self) -> str:
+        item = next(self._items)
+        if isinstance(item, str):
+            return item
+        self.response = item
+        self.close()
+        raise StopIteration
+
+    def close(self) -> None:
+        """Stop the stream early, closing the provider connection."""
+        close = getattr(self._items, "close", None)
+        if close is not None:
+            close()
+
+
+class AsyncResponseStream:
+    """Async counterpart of `ResponseStream`."""
+
+    def __init__(self, items: AsyncIterator[str | OrcxResponse]):
+        self._items = items
+        self.response: OrcxResponse | None = None
+
+    def __aiter__(self) -> AsyncResponseStream:
+        return self
+
+    async def __anext__(self) -> str:
+        item = await anext(self._items)
+        if isinstance(item, str):
+            return item
+        self.response = item
+        await self.aclose()
+        raise StopAsyncIteration
+
+    async def aclose(self) -> None:
+        """Stop the stream early, closing the provider connection."""
+        aclose = getattr(self._items, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+def run_stream(
+    request: OrcxRequest, history: list[dict] | None = None, cache: bool | None = None
+) -> ResponseStream:
+    """Execute a streaming LLM request, yielding chunks.
+
+    Retries and failover only happen before the first chunk is yielded; once
+    output has started, errors are raised as-is. A cached response is replayed
+    as a single chunk. After the last chunk, the stream's `response` carries
+    usage and cost.
+    """
+    return ResponseStream(_run_stream(request, history, cache))
+
+
+def _close_stream(stream: Any) -> None:
+    """Release a provider stream's connection, even when it wasn't read to the end.
+
+    litellm's sync stream wrapper has no `close`; the provider stream it wraps
+    usually does.
+    """
+    for target in (stream, getattr(stream, "completion_stream", None)):
+        close = getattr(target, "close", None)
+        if close is not None:
+            with contextlib.suppress(Exception):
+                close()
+            return
+
+
+def _run_stream(
+    request: OrcxRequest, history: list[dict] | None, cache: bool | None
+) -> Iterator[str | OrcxResponse]:
+    call = _Call(request, history, cache)
+    if call.hit:
+        yield from call.replay()
+        return
+
+    for _, params in call.tries(stream=True):
+        stream = None
+        try:
+            stream = call.litellm.completion(**params)
+            call.spans.split("send")
+            for chunk in stream:
+                text = call.text(chunk)
+                if text:
+                    yield text
+        except Exception as e:
+            delay = call.failed(e)
+            if delay:
+                time.sleep(delay)
+            continue
+        finally:
+            _close_stream(stream)
+        yield call.succeeded()
+        return
+
+
+async def arun(
+    request: OrcxRequest, history: list[dict] | None = None, cache: bool | None = None
+) -> OrcxResponse:
+    """Execute a single LLM request without blocking the event loop."""
+    import asyncio
+
+    call = _Call(request, history, cache, asynchronous=True)
+    if call.hit:
+        return call.spans.finish(call.hit)
+
+    for _, params in call.tries(stream=False):
+        try:
+            response = await call.litellm.acompletion(**params)
+        except Exception as e:
+            delay = call.failed(e)
+            if delay:
+                await asyncio.sleep(delay)
+            continue
+        return call.succeeded(response)
+
+    raise AssertionError("unreachable")
+
+
+def arun_stream(
+    request: OrcxRequest, history: list[dict] | None = None, cache: bool | None = None
+) -> AsyncResponseStream:
+    """Execute a streaming LLM request, yielding chunks asynchronously.
+
+    Retries, fails over, replays cached responses and reports usage like
+    `run_stream`. Cancelling the consuming task, or closing the stream early,
+    closes the underlying provider stream so the connection is released.
+    """
+    return AsyncResponseStream(_arun_stream(request, history, cache))
+
+
+async def _arun_stream(
+    request: OrcxRequest, history: list[dict] | None, cache: bool | None
+) -> AsyncIterator[str | OrcxResponse]:
+    import asyncio
+
+    call = _Call(request, history, cache, asynchronous=True)
+    if call.hit:
+        for item in call.replay():
+            yield item
+        return
+
+    for _, params in call.tries(stream=True):
+        stream = None
+        try:
+            stream = await call.litellm.acompletion(**params)
+            call.spans.split("send")
+            async for chunk in stream:
+                text = call.text(chunk)
+                if text:
+                    yield text
+        except Exception as e:
+            delay = call.failed(e)
+            if delay:
+                await asyncio.sleep(delay)
+            continue
+        finally:
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                with contextlib.suppress(Exception):
+                    await aclose()
+        yield call.succeeded()
+        return
+
+
+def _prompt_cache_usage(usage: Any) -> dict[str, int]:
+    """Prompt-cache read/write token counts, when the provider reports them.
+
+    Anthropic reports `cache_read_input_tokens`/`cache_creation_input_tokens`;
+    OpenAI-style providers report `prompt_tokens_details.cached_tokens`.
+    """
+    details = getattr(usage, "prompt_tokens_details", None)
+    read = getattr(usage, "cache_read_input_tokens", None)
+    if not isinstance(read, int):
+        read = getattr(details, "cached_tokens", None)
+    write = getattr(usage, "cache_creation_input_tokens", None)
+    if not isinstance(write, int):
+        write = getattr(details, "cache_creation_tokens", None)
+
+    counts = {}
+    if isinstance(read, int) and read:
+        counts["cache_read_tokens"] = read
+    if isinstance(write, int) and write:
+        counts["cache_write_tokens"] = write
+    return counts
+
+
+def estimate(request: OrcxRequest, history: list[dict] | None = None) -> Estimate:
+    """Count input tokens and estimate input cost locally, without calling the provider.
+
+    Messages are built exactly as `run` would send them, including history
+    truncation. Pricing and context windows come from litellm's model map.
+    """
+    # Use the bundled model map rather than fetching the latest one at import.
+    # litellm reads the variable once, so it's only set while importing.
+    if "litellm" not in globals() and "LITELLM_LOCAL_MODEL_COST_MAP" not in os.environ:
+        os.environ["LITELLM_LOCAL_MODEL_COST_MAP"] = "True"
+        try:
+            _load_litellm()
+        finally:
+            del os.environ["LITELLM_LOCAL_MODEL_COST_MAP"]
+
     model, agent = resolve_model(request)
-    messages = build_messages(request, agent, history)
-    params = build_params(request, agent, model, messages, stream=False)
+    messages = build_messages(request, agent, history, model)
+    litellm = _load_litellm()
+    tokens = count_tokens(model, messages, request.context, request.context_files)
+
+    input_cost = None
+    with contextlib.suppress(Exception):
+        input_cost, _ = litellm.cost_per_token(model=model, prompt_tokens=tokens)
+
+    window = None
+    with contextlib.suppress(Exception):
+        window = litellm.get_model_info(model).get("max_input_tokens")
+
+    return Estimate(
+        model=model,
+        input_tokens=tokens,
+        input_cost=input_cost,
+        context_window=window,
+        remaining_tokens=window - tokens if window else None,
+    )
 
-    try:
-        response = litellm.completion(**params)
-    except Exception as e:
-        raise _wrap_litellm_error(e, model) from e
 
-    content = response.choices[0].message.content or ""
+def _stream_response(
+    raw: list[Any], chunks: list[str], messages: list[dict], model: str
+) -> OrcxResponse:
+    """Rebuild a streamed response, with usage and cost, from its raw chunks.
+
+    Done once at the end of the stream with litellm's chunk builder, which
+    uses the provider's final usage chunk (or counts tokens when there is
+    none). If the chunks can't be rebuilt, the content is kept without usage.
+    """
+    content = "".join(chunks)
+    try:
+        built = _load_litellm().stream_chunk_builder(raw, messages=messages)
+        result = _to_orcx_response(built, model)
+    except Exception:
+        return OrcxResponse(content=content, model=model, provider=extract_provider(model))
+    result.content = content
+    return result
+
+
+def _to_orcx_response(response: Any, model: str) -> OrcxResponse:
+    """Convert a litellm completion response to an OrcxResponse."""
+    choice = response.choices[0]
+    content = choice.message.content or ""
+    finish_reason = getattr(choice, "finish_reason", None)
     usage = None
     cost = None
 
@@ -234,8 +982,9 @@ def run(request: OrcxRequest, history: list[dict] | None = None) -> OrcxResponse
             "prompt_tokens": response.usage.prompt_tokens,
             "completion_tokens": response.usage.completion_tokens,
             "total_tokens": response.usage.total_tokens,
+            **_prompt_cache_usage(response.usage),
         }
-        cost = litellm.completion_cost(completion_response=response)
+        cost = _load_litellm().completion_cost(completion_response=response)
 
     return OrcxResponse(
         content=content,
@@ -243,18 +992,5 @@ def run(request: OrcxRequest, history: list[dict] | None = None) -> OrcxResponse
         provider=extract_provider(model),
         usage=usage,
         cost=cost,
+        finish_reason=finish_reason if isinstance(finish_reason, str) else None,
     )
-
-
-def run_stream(request: OrcxRequest, history: list[dict] | None = None) -> Iterator[str]:
-    """Execute a streaming LLM request, yielding chunks."""
-    model, agent = resolve_model(request)
-    messages = build_messages(request, agent, history)
-    params = build_params(request, agent, model, messages, stream=True)
-
-    try:
-        for chunk in litellm.completion(**params):
-            if chunk.choices and chunk.choices[0].delta.content:
-                yield chunk.choices[0].delta.content
-    except Exception as e:
-        raise _wrap_litellm_error(e, model) from e
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import random
+
 from pydantic import BaseModel, Field
 
 QUANT_BY_BITS: dict[int, list[str]] = {
@@ -151,6 +153,53 @@ class ProviderPrefs(BaseModel):
         )
 
 
+class RetryPolicy(BaseModel):
+    """Retry policy for transient provider errors (rate limits, 5xx, connection errors).
+
+    Delays grow exponentially from `backoff` up to `max_backoff`, with jitter.
+    A provider's retry-after hint replaces the computed delay; hints longer
+    than `max_backoff` are not waited out.
+    """
+
+    max_attempts: int = Field(default=1, ge=1)  # per model; 1 disables retries
+    backoff: float = Field(default=1.0, ge=0)  # first delay in seconds
+    max_backoff: float = Field(default=30.0, ge=0)
+    jitter: bool = True
+
+    def merge_with(self, other: RetryPolicy) -> RetryPolicy:
+        """Fields set explicitly on self override other."""
+        return other.model_copy(update=self.model_dump(exclude_unset=True))
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float | None:
+        """Seconds to wait after failed attempt number `attempt` (0-based), or None to stop."""
+        if attempt + 1 >= self.max_attempts:
+            return None
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_backoff else None
+        delay = min(self.max_backoff, self.backoff * 2**attempt)
+        if self.jitter:
+            delay *= random.uniform(0.5, 1.0)
+        return delay
+
+
+class HistoryPolicy(BaseModel):
+    """Token budget for conversation history.
+
+    The budget defaults to the model's context window (from litellm's model
+    metadata) minus room for the reply. When history doesn't fit, the oldest
+    messages are dropped first. Pinned system prompt and context are never
+    dropped; unpinned, they are the oldest messages and go first.
+    """
+
+    max_tokens: int | None = Field(default=None, gt=0)  # fixed input budget for any model
+    reserve_tokens: int = Field(default=4096, ge=0)  # reply room when max_tokens isn't set
+    pin_prefix: bool = True  # always keep the system prompt and context
+
+    def merge_with(self, other: HistoryPolicy) -> HistoryPolicy:
+        """Fields set explicitly on self override other."""
+        return other.model_copy(update=self.model_dump(exclude_unset=True))
+
+
 class AgentConfig(BaseModel):
     """Configuration for an agent."""
 
@@ -163,6 +212,19 @@ class AgentConfig(BaseModel):
     max_tokens: int | None = None
     temperature: float | None = None
     provider_prefs: ProviderPrefs | None = None
+    retry: RetryPolicy | None = None
+    history: HistoryPolicy | None = None
+    cache_prefix: bool = False  # mark system prompt and context for provider prompt caching
+
+
+class ContextFile(BaseModel):
+    """Where one -f file's content sits in `OrcxRequest.context`, and its stat when read."""
+
+    path: str  # resolved
+    mtime_ns: int
+    size: int
+    start: int
+    end: int
 
 
 class OrcxRequest(BaseModel):
@@ -172,6 +234,7 @@ class OrcxRequest(BaseModel):
     agent: str | None = None
     model: str | None = None
     context: str | None = None
+    context_files: list[ContextFile] | None = None  # -f files inside `context`
     system_prompt: str | None = None
     max_tokens: int | None = None
     temperature: float | None = None
@@ -179,6 +242,35 @@ class OrcxRequest(BaseModel):
     stream: bool = False
 
 
+class Attempt(BaseModel):
+    """One model tried while serving a request."""
+
+    model: str
+    error: str | None = None
+    delay: float | None = None  # seconds waited before retrying the same model
+
+
+class Timings(BaseModel):
+    """Where one request's time went, in seconds.
+
+    Provider phases are measured from the first attempt, so retries and
+    backoff count. `total` is the whole request; the CLI extends it to cover
+    config load. Phases that didn't happen (e.g. `send` and `ttft` without
+    streaming, anything after a cache hit) are None.
+    """
+
+    config: float | None = None  # loading config.yaml and agents.yaml
+    imports: float | None = None  # importing litellm and setting up the connection pool
+    resolve: float | None = None  # resolve_model
+    messages: float | None = None  # build_messages, including history trimming
+    send: float | None = None  # streaming: until the provider returned the stream
+    ttft: float | None = None  # until the first content chunk
+    generation: float | None = None  # until the last chunk, or the full response
+    save: float | None = None  # writing the exchange to the conversation DB
+    total: float | None = None
+    tokens_per_second: float | None = None  # completion tokens over generation after ttft
+
+
 class OrcxResponse(BaseModel):
     """Response from orcx to a harness."""
 
@@ -187,7 +279,21 @@ class OrcxResponse(BaseModel):
     provider: str
     usage: dict | None = None
     cost: float | None = None
+    finish_reason: str | None = None  # as reported by the provider, e.g. "stop" or "length"
     cached: bool = False
+    attempts: list[Attempt] = Field(default_factory=list)
+    retries: int = 0
+    timings: Timings | None = None
+
+
+class Estimate(BaseModel):
+    """Pre-flight token and cost estimate for a request (no network call)."""
+
+    model: str
+    input_tokens: int
+    input_cost: float | None = None  # USD; None when the model's pricing is unknown
+    context_window: int | None = None
+    remaining_tokens: int | None = None
 
 
 class Message(BaseModel):
@@ -195,6 +301,12 @@ class Message(BaseModel):
 
     role: str  # "user", "assistant", "system"
     content: str
+    tokens: int | None = None  # prompt tokens for user turns, completion tokens for assistant
+    cost: float | None = None
+    created_at: str | None = None
+    model: str | None = None  # for assistant turns: the model that answered
+    provider: str | None = None
+    timings: Timings | None = None  # for assistant turns
 
 
 class Conversation(BaseModel):
@@ -211,6 +323,55 @@ class Conversation(BaseModel):
     updated_at: str
 
 
+class ConversationSummary(BaseModel):
+    """Conversation metadata without message bodies, for listings."""
+
+    id: str
+    model: str
+    agent: str | None = None
+    title: str | None = None
+    message_count: int = 0
+    total_tokens: int = 0
+    total_cost: float = 0.0
+    created_at: str
+    updated_at: str
+
+
+class ConversationMatch(BaseModel):
+    """Full-text search hit: a conversation and its best-matching message or title."""
+
+    id: str
+    model: str
+    agent: str | None = None
+    title: str | None = None
+    role: str  # message role, or "title" when the title matched best
+    seq: int | None = None  # message position; None for title matches
+    snippet: str
+    rank: float  # bm25; lower is better
+    updated_at: str
+
+
+class UsageStats(BaseModel):
+    """Aggregated usage for one group (model, agent, provider or day) of replies.
+
+    Latency is generation time (the full provider round trip); percentiles
+    are nearest-rank over replies that were timed.
+    """
+
+    key: str
+    requests: int
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost: float = 0.0
+    latency_p50: float | None = None
+    latency_p95: float | None = None
+    latency_p99: float | None = None
+    ttft_p50: float | None = None
+    ttft_p95: float | None = None
+    ttft_p99: float | None = None
+    tokens_per_second: float | None = None  # mean over timed replies
+
+
 def _find_similar(name: str, known: set[str]) -> str | None:
     """Find similar name using case-insensitive prefix/substring matching."""
     name_lower = name.lower()
@@ -0,0 +1,163 @@
+"""Streaming output: coalesce small chunks before writing them to the terminal and -o file."""
+
+from __future__ import annotations
+
+import io
+import threading
+import time
+from collections.abc import Callable
+from types import TracebackType
+from typing import TextIO
+
+from orcx.errors import OutputError
+
+# Pending text is written once it reaches this many characters...
+FLUSH_SIZE = 4096
+
+# ...or once this many seconds have passed since the last write
+FLUSH_INTERVAL = 0.05
+
+
+class StreamSink:
+    """Writes streamed chunks to `write` and, optionally, a file as they arrive.
+
+    Chunks are buffered and written together when the buffer reaches
+    `flush_size` characters or `flush_interval` seconds have passed since the
+    last write, so token-sized chunks don't cost a terminal write (and
+    syscall) each. A background thread also flushes pending text once it is
+    `flush_interval` old, so output doesn't stall while the provider pauses.
+    The -o file is written at the same points rather than at the end, so an
+    interrupted stream leaves everything received so far on disk. The full
+    text is still assembled for saving (`content`).
+
+    Use as a context manager; leaving it flushes what's pending and closes
+    the file, including when the stream fails. An error from a background
+    flush is raised by the next `write`, `flush` or `close`.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[str], object],
+        path: str | None = None,
+        flush_size: int = FLUSH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._write = write
+        self._path = path
+        self._flush_size = flush_size
+        self._flush_interval = flush_interval
+        self._clock = clock
+        self._pending: list[str] = []
+        self._pending_size = 0
+        self._pending_since = 0.0
+        self._content = io.StringIO()
+        self._last_flush = clock()
+        self._cond = threading.Condition(threading.Lock())
+        self._flusher: threading.Thread | None = None
+        self._closed = False
+        self._error: Exception | None = None
+        self._file: TextIO | None = None
+        if path is not None:
+            try:
+                self._file = open(path, "w")  # noqa: SIM115
+            except OSError as e:
+                raise OutputError(f"Error writing to {path}: {e}") from e
+
+    def write(self, chunk: str) -> None:
+        """Buffer a chunk, flushing if the size or time threshold is reached."""
+        if not chunk:
+            return
+        with self._cond:
+            self._raise_error()
+            now = self._clock()
+            if not self._pending:
+                self._pending_since = now
+            self._pending.append(chunk)
+            self._pending_size += len(chunk)
+            if (
+                self._pending_size >= self._flush_size
+                or now - self._last_flush >= self._flush_interval
+            ):
+                self._flush()
+            elif self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_stale, daemon=True)
+                self._flusher.start()
+            else:
+                self._cond.notify()
+
+    def flush(self) -> None:
+        """Write pending text to the terminal and file."""
+        with self._cond:
+            self._raise_error()
+            self._flush()
+
+    def _flush(self) -> None:
+        self._last_flush = self._clock()
+        if not self._pending:
+            return
+        text = "".join(self._pending)
+        self._pending.clear()
+        self._pending_size = 0
+        self._content.write(text)
+        self._write(text)
+        if self._file is not None:
+            try:
+                self._file.write(text)
+                self._file.flush()
+            except OSError as e:
+                raise OutputError(f"Error writing to {self._path}: {e}") from e
+
+    def _flush_stale(self) -> None:
+        """Background loop: flush pending text once it is `flush_interval` old."""
+        with self._cond:
+            while not self._closed:
+                if not self._pending:
+                    self._cond.wait()
+                    continue
+                delay = self._pending_since + self._flush_interval - self._clock()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                try:
+                    self._flush()
+                except Exception as e:
+                    self._error = e
+                    return
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def close(self) -> None:
+        """Flush pending text and close the file."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        try:
+            self.flush()
+        finally:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    @property
+    def content(self) -> str:
+        """Everything written so far, including text not yet flushed."""
+        with self._cond:
+            return self._content.getvalue() + "".join(self._pending)
+
+    def __enter__(self) -> StreamSink:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
@@ -1,12 +1,21 @@
 """Pytest configuration and fixtures."""
 
-from collections.abc import Iterator
+import asyncio
+import threading
+from collections.abc import AsyncIterator, Callable, Coroutine, Iterator
 from pathlib import Path
+from typing import Any
 from unittest.mock import MagicMock
 
 import pytest
 
 
+@pytest.fixture(autouse=True)
+def no_daemon(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Keep CLI tests from forwarding to a daemon running on this machine."""
+    monkeypatch.setattr("orcx.daemon.SOCKET_PATH", tmp_path / "no-daemon.sock")
+
+
 @pytest.fixture
 def temp_config_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
     """Create a temporary config directory for tests."""
@@ -19,6 +28,10 @@ def temp_config_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
     monkeypatch.setattr("orcx.config.AGENTS_FILE", config_dir / "agents.yaml")
     monkeypatch.setattr("orcx.registry.AGENTS_FILE", config_dir / "agents.yaml")
 
+    # Parsed files are cached per process; start each test from disk
+    from orcx.config import clear_cache
+
+    clear_cache()
     return config_dir
 
 
@@ -52,3 +65,69 @@ def mock_litellm_response() -> MagicMock:
     response.usage.completion_tokens = 20
     response.usage.total_tokens = 30
     return response
+
+
+@pytest.fixture
+def temp_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """Point the response cache at a temporary database."""
+    from orcx import cache
+
+    cache_path = tmp_path / "cache.db"
+    monkeypatch.setattr("orcx.cache.CACHE_PATH", cache_path)
+    yield cache_path
+    cache.close()
+
+
+@pytest.fixture
+def make_chunk() -> Callable[[str], MagicMock]:
+    """Factory for litellm stream chunks whose delta carries `text`."""
+
+    def make(text: str) -> MagicMock:
+        chunk = MagicMock()
+        chunk.choices = [MagicMock()]
+        chunk.choices[0].delta.content = text
+        return chunk
+
+    return make
+
+
+@pytest.fixture
+def chunk_stream(
+    make_chunk: Callable[[str], MagicMock],
+) -> Callable[..., AsyncIterator[MagicMock]]:
+    """Factory for an async provider stream of chunks carrying `texts`."""
+
+    async def stream(*texts: str) -> AsyncIterator[MagicMock]:
+        for text in texts:
+            yield make_chunk(text)
+
+    return stream
+
+
+@pytest.fixture
+def start_server() -> Iterator[Callable[[Coroutine[Any, Any, asyncio.Server]], asyncio.Server]]:
+    """Start asyncio servers on an event loop running in a background thread.
+
+    Servers are closed, and the loop stopped, when the test ends.
+    """
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    servers: list[asyncio.Server] = []
+
+    def start(starting: Coroutine[Any, Any, asyncio.Server]) -> asyncio.Server:
+        server = asyncio.run_coroutine_threadsafe(starting, loop).result()
+        servers.append(server)
+        return server
+
+    yield start
+
+    async def close() -> None:
+        for server in servers:
+            server.close()
+            await server.wait_closed()
+
+    asyncio.run_coroutine_threadsafe(close(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
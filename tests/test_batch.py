@@ -0,0 +1,148 @@
+"""Tests for batch execution."""
+
+import json
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from typer.testing import CliRunner
+
+from orcx.batch import BatchResult, BatchSummary, read_requests, run_batch
+from orcx.cli import app
+from orcx.errors import RateLimitError
+from orcx.schema import OrcxRequest, OrcxResponse
+
+runner = CliRunner()
+
+
+def _echo(request: OrcxRequest) -> OrcxResponse:
+    return OrcxResponse(
+        content=request.prompt,
+        model="test/model",
+        provider="test",
+        usage={"prompt_tokens": 1, "completion_tokens": 2, "total_tokens": 3},
+        cost=0.5,
+    )
+
+
+class TestReadRequests:
+    def test_parses_objects_and_bare_strings(self) -> None:
+        lines = ['{"prompt": "a", "model": "test/model"}', '"b"']
+        items = list(read_requests(lines))
+        assert [i for i, _ in items] == [0, 1]
+        assert isinstance(items[0][1], OrcxRequest)
+        assert items[0][1].model == "test/model"
+        assert items[1][1].prompt == "b"
+
+    def test_forces_blocking(self) -> None:
+        [(_, request)] = read_requests(['{"prompt": "a", "stream": true}'])
+        assert request.stream is False
+
+    def test_skips_blank_lines(self) -> None:
+        items = list(read_requests(['"a"', "", "  ", '"b"']))
+        assert [i for i, _ in items] == [0, 1]
+
+    def test_invalid_lines_become_errors(self) -> None:
+        items = list(read_requests(["not json", '{"model": "x/y"}']))
+        assert "Invalid JSON" in items[0][1]
+        assert "prompt" in items[1][1]
+
+
+class TestRunBatch:
+    def test_ordered_results(self) -> None:
+        def slow_first(request: OrcxRequest) -> OrcxResponse:
+            if request.prompt == "0":
+                time.sleep(0.05)
+            return _echo(request)
+
+        items = [(i, OrcxRequest(prompt=str(i))) for i in range(6)]
+        results = list(run_batch(items, run=slow_first, concurrency=3))
+        assert [r.index for r in results] == list(range(6))
+        assert [r.response.content for r in results] == [str(i) for i in range(6)]
+
+    def test_unordered_yields_completions_first(self) -> None:
+        def slow_first(request: OrcxRequest) -> OrcxResponse:
+            if request.prompt == "0":
+                time.sleep(0.1)
+            return _echo(request)
+
+        items = [(i, OrcxRequest(prompt=str(i))) for i in range(3)]
+        results = list(run_batch(items, run=slow_first, concurrency=3, ordered=False))
+        assert results[-1].index == 0
+        assert sorted(r.index for r in results) == [0, 1, 2]
+
+    def test_concurrency_is_bounded(self) -> None:
+        lock = threading.Lock()
+        active = 0
+        peak = 0
+
+        def tracked(request: OrcxRequest) -> OrcxResponse:
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.01)
+            with lock:
+                active -= 1
+            return _echo(request)
+
+        items = [(i, OrcxRequest(prompt=str(i))) for i in range(20)]
+        results = list(run_batch(items, run=tracked, concurrency=4))
+        assert len(results) == 20
+        assert peak <= 4
+
+    def test_errors_are_captured(self) -> None:
+        def fail(request: OrcxRequest) -> OrcxResponse:
+            raise RateLimitError("openrouter")
+
+        items = [(0, OrcxRequest(prompt="a")), (1, "Invalid JSON: bad")]
+        results = list(run_batch(items, run=fail))
+        assert results[0].error == "Rate limited by openrouter"
+        assert results[1].error == "Invalid JSON: bad"
+        assert all(r.response is None for r in results)
+
+
+class TestBatchSummary:
+    def test_aggregates_usage(self) -> None:
+        summary = BatchSummary()
+        summary.add(BatchResult(index=0, response=_echo(OrcxRequest(prompt="a")), latency=1.0))
+        summary.add(BatchResult(index=1, response=_echo(OrcxRequest(prompt="b")), latency=3.0))
+        summary.add(BatchResult(index=2, error="boom"))
+        assert summary.succeeded == 2
+        assert summary.failed == 1
+        assert summary.total_tokens == 6
+        assert summary.cost == 1.0
+        assert summary.percentile(50) == 1.0
+        assert summary.percentile(95) == 3.0
+        assert "2 ok, 1 failed" in summary.format()
+
+
+class TestBatchCommand:
+    @patch("orcx.router.litellm")
+    def test_batch_outputs_jsonl(
+        self, mock_litellm: MagicMock, mock_litellm_response: MagicMock, tmp_path, temp_config_dir
+    ) -> None:
+        """orcx batch should emit one JSON result per input line, in order."""
+        mock_litellm.completion.return_value = mock_litellm_response
+        mock_litellm.completion_cost.return_value = 0.001
+
+        input_file = tmp_path / "prompts.jsonl"
+        input_file.write_text(
+            "\n".join(json.dumps({"prompt": f"p{i}", "model": "openai/gpt-4o"}) for i in range(5))
+        )
+        result = runner.invoke(app, ["batch", str(input_file), "-n", "2"])
+        assert result.exit_code == 0
+        lines = [json.loads(line) for line in result.stdout.splitlines()]
+        assert [line["index"] for line in lines] == list(range(5))
+        assert lines[0]["response"]["content"] == "Test response"
+        assert mock_litellm.completion.call_count == 5
+        assert "5 ok, 0 failed" in result.stderr
+
+    def test_batch_failure_exit_code(self, temp_config_dir, clean_env, tmp_path) -> None:
+        """Failed requests are reported and make the command exit non-zero."""
+        input_file = tmp_path / "prompts.jsonl"
+        input_file.write_text('{"prompt": "no model"}\n')
+        result = runner.invoke(app, ["batch", str(input_file)])
+        assert result.exit_code == 1
+        line = json.loads(result.stdout.splitlines()[0])
+        assert "No model specified" in line["error"]
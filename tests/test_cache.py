@@ -0,0 +1,210 @@
+"""Tests for the on-disk caches."""
+
+import itertools
+from unittest.mock import MagicMock, patch
+
+from typer.testing import CliRunner
+
+from orcx import cache, router
+from orcx.cli import app
+from orcx.context import load_context
+from orcx.schema import OrcxRequest, OrcxResponse
+
+runner = CliRunner()
+
+
+def _response(content: str = "cached answer") -> OrcxResponse:
+    return OrcxResponse(
+        content=content,
+        model="openai/gpt-4o",
+        provider="openai",
+        usage={"prompt_tokens": 1, "completion_tokens": 2, "total_tokens": 3},
+        cost=0.01,
+    )
+
+
+class TestMakeKey:
+    def test_ignores_key_order_and_stream(self) -> None:
+        a = {"model": "m", "messages": [{"role": "user", "content": "hi"}], "stream": True}
+        b = {"stream": False, "messages": [{"content": "hi", "role": "user"}], "model": "m"}
+        assert cache.make_key(a) == cache.make_key(b)
+
+    def test_differs_on_params(self) -> None:
+        base = {"model": "m", "messages": []}
+        assert cache.make_key(base) != cache.make_key({**base, "temperature": 0.5})
+
+
+class TestStore:
+    def test_round_trip_marks_cached(self, temp_cache) -> None:
+        cache.put("k", _response(), ttl=60, max_size=10_000)
+        hit = cache.get("k", ttl=60)
+        assert hit is not None
+        assert hit.content == "cached answer"
+        assert hit.cached is True
+        assert hit.cost == 0.0
+        assert hit.usage == {"prompt_tokens": 1, "completion_tokens": 2, "total_tokens": 3}
+
+    def test_expired_entries_miss(self, temp_cache) -> None:
+        cache.put("k", _response(), ttl=60, max_size=10_000)
+        with patch("orcx.cache.time.time", return_value=cache.time.time() + 120):
+            assert cache.get("k", ttl=60) is None
+
+    def test_evicts_least_recently_used(self, temp_cache) -> None:
+        size = len(_response("a").model_dump_json(exclude={"cached", "attempts", "retries"}))
+        with patch("orcx.cache.time.time", side_effect=itertools.count(1)):
+            cache.put("a", _response("a"), ttl=1e9, max_size=size * 2)
+            cache.put("b", _response("b"), ttl=1e9, max_size=size * 2)
+            cache.get("a", ttl=1e9)  # a is now more recent than b
+            cache.put("c", _response("c"), ttl=1e9, max_size=size * 2)
+            remaining = {k for k in "abc" if cache.get(k, ttl=1e9)}
+        assert remaining == {"a", "c"}
+
+    def test_stats_and_clear(self, temp_cache) -> None:
+        cache.put("k", _response(), ttl=60, max_size=10_000)
+        cache.get("k", ttl=60)
+        cache.get("missing", ttl=60)
+        stats = cache.stats()
+        assert (stats.entries, stats.hits, stats.misses) == (1, 1, 1)
+        assert stats.hit_rate == 0.5
+
+        assert cache.clear() == 1
+        assert cache.stats() == cache.CacheStats()
+
+
+class TestTokenCounts:
+    def _messages(self, tmp_path) -> tuple[list[dict], str, list]:
+        (tmp_path / "a.py").write_text("a = 1\n" * 500)
+        (tmp_path / "b.py").write_text("b = 2\n" * 500)
+        text, files = load_context([str(tmp_path / "a.py"), str(tmp_path / "b.py")])
+        messages = [{"role": "user", "content": text}, {"role": "user", "content": "prompt"}]
+        return messages, text, files
+
+    def test_unchanged_files_counted_once(self, tmp_path, temp_cache, temp_config_dir) -> None:
+        """Each file's content is tokenized once; later counts come from the cache."""
+        messages, text, files = self._messages(tmp_path)
+        counter = router.litellm.token_counter
+
+        with patch("orcx.router.litellm.token_counter", wraps=counter) as token_counter:
+            first = router.count_tokens("openai/gpt-4o", messages, text, files)
+            assert [c.kwargs.get("text") for c in token_counter.call_args_list].count(None) == 1
+            assert token_counter.call_count == 3  # both files, then the rest
+            token_counter.reset_mock()
+
+            assert router.count_tokens("openai/gpt-4o", messages, text, files) == first
+            assert all("text" not in c.kwargs for c in token_counter.call_args_list)
+
+        # Per-file counts add up to roughly the count of the whole text
+        assert abs(first - counter(model="openai/gpt-4o", messages=messages)) <= 4
+
+    def test_changed_file_recounted_alone(self, tmp_path, temp_cache, temp_config_dir) -> None:
+        """Editing one file re-tokenizes only that file."""
+        messages, text, files = self._messages(tmp_path)
+        router.count_tokens("openai/gpt-4o", messages, text, files)
+
+        (tmp_path / "b.py").write_text("b = 3\n" * 600)
+        text, files = load_context([str(tmp_path / "a.py"), str(tmp_path / "b.py")])
+        messages[0]["content"] = text
+        with patch(
+            "orcx.router.litellm.token_counter", wraps=router.litellm.token_counter
+        ) as token_counter:
+            router.count_tokens("openai/gpt-4o", messages, text, files)
+        counted = [c.kwargs["text"] for c in token_counter.call_args_list if "text" in c.kwargs]
+        assert counted == ["b = 3\n" * 600]
+
+    def test_disabled_by_config(self, tmp_path, temp_cache, temp_config_dir) -> None:
+        """cache.files: false counts tokens directly without touching the cache."""
+        messages, text, files = self._messages(tmp_path)
+        (temp_config_dir / "config.yaml").write_text("cache:\n  files: false\n")
+
+        router.count_tokens("openai/gpt-4o", messages, text, files)
+        assert not temp_cache.exists()
+
+
+class TestRouterCache:
+    @patch("orcx.router.litellm")
+    def test_run_answers_repeats_from_cache(
+        self, mock_litellm: MagicMock, mock_litellm_response, temp_config_dir, temp_cache
+    ) -> None:
+        """The second identical request is served without calling the provider."""
+        from orcx.router import run
+
+        mock_litellm.completion.return_value = mock_litellm_response
+        mock_litellm.completion_cost.return_value = 0.001
+        request = OrcxRequest(prompt="hi", model="openai/gpt-4o")
+
+        first = run(request, cache=True)
+        second = run(request, cache=True)
+
+        assert mock_litellm.completion.call_count == 1
+        assert first.cached is False
+        assert second.cached is True
+        assert second.content == first.content
+
+    @patch("orcx.router.litellm")
+    def test_cache_is_opt_in(
+        self, mock_litellm: MagicMock, mock_litellm_response, temp_config_dir, temp_cache
+    ) -> None:
+        """Without the flag or config, every request reaches the provider."""
+        from orcx.router import run
+
+        mock_litellm.completion.return_value = mock_litellm_response
+        mock_litellm.completion_cost.return_value = 0.001
+        request = OrcxRequest(prompt="hi", model="openai/gpt-4o")
+
+        run(request)
+        run(request)
+        assert mock_litellm.completion.call_count == 2
+        assert not temp_cache.exists()
+
+    @patch("orcx.router.litellm")
+    def test_config_enables_cache(
+        self, mock_litellm: MagicMock, mock_litellm_response, temp_config_dir, temp_cache
+    ) -> None:
+        """cache.enabled in config turns caching on; --no-cache (False) overrides it."""
+        from orcx.router import run
+
+        (temp_config_dir / "config.yaml").write_text("cache:\n  enabled: true\n")
+        mock_litellm.completion.return_value = mock_litellm_response
+        mock_litellm.completion_cost.return_value = 0.001
+        request = OrcxRequest(prompt="hi", model="openai/gpt-4o")
+
+        run(request)
+        assert run(request).cached is True
+        assert run(request, cache=False).cached is False
+        assert mock_litellm.completion.call_count == 2
+
+    @patch("orcx.router.litellm")
+    def test_stream_fills_and_replays_cache(
+        self, mock_litellm: MagicMock, temp_config_dir, temp_cache
+    ) -> None:
+        """A completed stream is cached, and replayed for both streaming and blocking calls."""
+        from orcx.router import run, run_stream
+
+        chunks = []
+        for text in ["Hel", "lo"]:
+            chunk = MagicMock()
+            chunk.choices = [MagicMock()]
+            chunk.choices[0].delta.content = text
+            chunks.append(chunk)
+        mock_litellm.completion.return_value = iter(chunks)
+        request = OrcxRequest(prompt="hi", model="openai/gpt-4o")
+
+        assert list(run_stream(request, cache=True)) == ["Hel", "lo"]
+        assert list(run_stream(request, cache=True)) == ["Hello"]
+        assert run(request, cache=True).content == "Hello"
+        assert mock_litellm.completion.call_count == 1
+
+
+class TestCacheCommand:
+    def test_stats_and_clear(self, temp_cache) -> None:
+        cache.put("k", _response(), ttl=60, max_size=10_000)
+        cache.get("k", ttl=60)
+
+        result = runner.invoke(app, ["cache", "stats"])
+        assert result.exit_code == 0
+        assert "Entries: 1" in result.stdout
+        assert "Hit rate: 100.0%" in result.stdout
+
+        result = runner.invoke(app, ["cache", "clear"])
+        assert result.exit_code == 0
+        assert "Deleted 1" in result.stdout
@@ -1,7 +1,9 @@
 """CLI smoke tests."""
 
+import json
 from unittest.mock import MagicMock, patch
 
+import pytest
 from typer.testing import CliRunner
 
 from orcx import __version__
@@ -121,6 +123,110 @@ class TestRunCommand:
         assert messages[0]["role"] == "system"
         assert messages[0]["content"] == "You are helpful"
 
+    @patch("orcx.router.litellm")
+    def test_run_with_files_and_context(
+        self, mock_litellm: MagicMock, mock_litellm_response: MagicMock, tmp_path, temp_cache
+    ) -> None:
+        """orcx run -f should send --context followed by the file blocks as one message."""
+        mock_litellm.completion.return_value = mock_litellm_response
+        mock_litellm.completion_cost.return_value = 0.001
+        (tmp_path / "main.py").write_text("x = 1")
+
+        result = runner.invoke(
+            app,
+            ["run", "-m", "openai/gpt-4o", "--no-stream", "--no-save", "--context", "ctx"]
+            + ["-f", str(tmp_path / "main.py"), "prompt"],
+        )
+        assert result.exit_code == 0
+
+        context = mock_litellm.completion.call_args.kwargs["messages"][0]["content"]
+        assert context == "ctx\n\n# main.py\n```\nx = 1\n```"
+
+    def test_run_rejects_binary_file(self, tmp_path, temp_cache) -> None:
+        """Binary files are rejected before anything is sent."""
+        (tmp_path / "blob.bin").write_bytes(b"\0\1\2")
+        result = runner.invoke(
+            app, ["run", "-m", "openai/gpt-4o", "-f", str(tmp_path / "blob.bin"), "x"]
+        )
+        assert result.exit_code == 1
+        assert "Binary file" in result.stderr
+
+    def test_stream_shows_cost_and_saves_usage(self, temp_config_dir, tmp_path) -> None:
+        """Streamed exchanges report --cost and store tokens and cost with the reply."""
+        from orcx import conversation
+        from orcx.router import ResponseStream
+        from orcx.schema import OrcxResponse
+
+        response = OrcxResponse(
+            content="Hi",
+            model="openai/gpt-4o",
+            provider="openai",
+            usage={"prompt_tokens": 5, "completion_tokens": 1, "total_tokens": 6},
+            cost=0.0005,
+        )
+        stream = ResponseStream(iter(["Hi", response]))
+        with (
+            patch("orcx.router.run_stream", return_value=stream),
+            patch("orcx.conversation.DB_PATH", tmp_path / "conversations.db"),
+        ):
+            result = runner.invoke(app, ["run", "-m", "openai/gpt-4o", "--cost", "hello"])
+            assert result.exit_code == 0
+            assert "cost: $0.000500" in result.stderr
+
+            saved = conversation.get_last()
+            conversation.close()
+        assert saved is not None
+        reply = saved.messages[-1]
+        assert reply.content == "Hi"
+        assert reply.tokens == 1
+        assert reply.cost == 0.0005
+        assert (reply.model, reply.provider) == ("openai/gpt-4o", "openai")
+
+    def test_stream_writes_output_file(self, tmp_path) -> None:
+        """Streamed output reaches -o and stdout, and partial output survives a failure."""
+        from orcx.errors import ProviderConnectionError
+
+        def chunks(*args, **kwargs):
+            yield "Hello"
+            yield ", world"
+            raise ProviderConnectionError("openai", "reset")
+
+        out = tmp_path / "out.txt"
+        with patch("orcx.router.run_stream", side_effect=chunks):
+            result = runner.invoke(
+                app, ["run", "-m", "openai/gpt-4o", "--no-save", "-o", str(out), "hi"]
+            )
+        assert result.exit_code != 0
+        assert "Hello, world" in result.stdout
+        assert out.read_text() == "Hello, world"
+
+    @patch("orcx.router.litellm")
+    def test_run_with_cache_prefix(
+        self, mock_litellm: MagicMock, mock_litellm_response: MagicMock
+    ) -> None:
+        """orcx run --cache-prefix should mark the system prompt for prompt caching."""
+        mock_litellm.completion.return_value = mock_litellm_response
+        mock_litellm.completion_cost.return_value = 0.001
+
+        result = runner.invoke(
+            app,
+            [
+                "run",
+                "-m",
+                "anthropic/x",
+                "--no-stream",
+                "--no-save",
+                "--cache-prefix",
+                "-s",
+                "sys",
+                "prompt",
+            ],
+        )
+        assert result.exit_code == 0
+
+        system = mock_litellm.completion.call_args.kwargs["messages"][0]
+        assert system["content"][0]["cache_control"] == {"type": "ephemeral"}
+
     @patch("orcx.router.litellm")
     def test_run_json_output(
         self, mock_litellm: MagicMock, mock_litellm_response: MagicMock
@@ -133,3 +239,157 @@ class TestRunCommand:
         assert result.exit_code == 0
         assert '"content"' in result.stdout
         assert '"model"' in result.stdout
+        data = json.loads(result.stdout)
+        assert [a["model"] for a in data["attempts"]] == ["openai/gpt-4o"]
+        assert data["retries"] == 0
+
+    def test_run_timings(self, temp_config_dir, tmp_path, mock_litellm_response) -> None:
+        """--timings shows phases on stderr; --json and the saved reply carry them too."""
+        from orcx import conversation
+
+        with (
+            patch("orcx.router.litellm.completion", return_value=mock_litellm_response),
+            patch("orcx.router.litellm.completion_cost", return_value=0.0),
+            patch("orcx.conversation.DB_PATH", tmp_path / "conversations.db"),
+        ):
+            result = runner.invoke(
+                app, ["run", "-m", "openai/gpt-4o", "--json", "--timings", "hello"]
+            )
+            assert result.exit_code == 0, result.output
+            saved = conversation.get_last()
+            conversation.close()
+
+        timings = json.loads(result.stdout)["timings"]
+        for phase in ("config", "resolve", "messages", "generation", "save", "total"):
+            assert timings[phase] >= 0
+        assert timings["send"] is None  # --json doesn't stream
+        assert timings["total"] >= timings["generation"]
+        assert "generation " in result.stderr
+        assert "tok/s]" in result.stderr
+        assert saved.messages[-1].timings.generation == timings["generation"]
+
+
+class TestStats:
+    """Tests for orcx stats."""
+
+    @pytest.fixture
+    def saved_replies(self, tmp_path):
+        from orcx import conversation
+        from orcx.schema import Message, Timings
+
+        with patch("orcx.conversation.DB_PATH", tmp_path / "conversations.db"):
+            conv = conversation.create(model="openai/gpt-4o", agent="reviewer")
+            for seconds in (0.5, 1.5):
+                conversation.append(
+                    conv,
+                    [
+                        Message(role="user", content="q", tokens=1200),
+                        Message(
+                            role="assistant",
+                            content="a",
+                            tokens=300,
+                            cost=0.02,
+                            model="openai/gpt-4o",
+                            provider="openai",
+                            timings=Timings(generation=seconds, ttft=0.25),
+                        ),
+                    ],
+                )
+            yield
+            conversation.close()
+
+    def test_table(self, saved_replies) -> None:
+        result = runner.invoke(app, ["stats", "--by", "agent"])
+        assert result.exit_code == 0, result.output
+        header, row = result.stdout.splitlines()
+        assert header.startswith("agent")
+        assert row.split() == [
+            "reviewer", "2", "2,400", "600", "$0.0400", "500ms", "1.50s", "1.50s", "250ms",
+            "250ms", "-",
+        ]  # fmt: skip
+
+    def test_json(self, saved_replies) -> None:
+        result = runner.invoke(app, ["stats", "--json", "--all"])
+        assert result.exit_code == 0, result.output
+        (row,) = json.loads(result.stdout)
+        assert row["key"] == "openai/gpt-4o"
+        assert row["latency_p99"] == 1.5
+
+    def test_empty(self, tmp_path) -> None:
+        with patch("orcx.conversation.DB_PATH", tmp_path / "conversations.db"):
+            result = runner.invoke(app, ["stats"])
+        assert result.exit_code == 0
+        assert "No replies" in result.stdout
+
+
+class TestEstimate:
+    """Tests for --estimate and --max-cost."""
+
+    def test_estimate_does_not_send(self, temp_config_dir) -> None:
+        """--estimate prints tokens, cost and context without calling the model."""
+        with patch("orcx.router.litellm.completion") as completion:
+            result = runner.invoke(
+                app, ["run", "-m", "openai/gpt-4o", "--estimate", "hello " * 100]
+            )
+        assert result.exit_code == 0
+        completion.assert_not_called()
+        assert "Input tokens:" in result.stdout
+        assert "Input cost: $" in result.stdout
+        assert "remaining" in result.stdout
+
+    def test_estimate_json(self, temp_config_dir) -> None:
+        """--estimate --json emits the estimate as JSON."""
+        result = runner.invoke(app, ["run", "-m", "openai/gpt-4o", "--estimate", "--json", "hi"])
+        assert result.exit_code == 0
+        data = json.loads(result.stdout)
+        assert data["model"] == "openai/gpt-4o"
+        assert data["input_tokens"] > 0
+        assert data["context_window"] - data["input_tokens"] == data["remaining_tokens"]
+
+    def test_estimate_leaves_env_alone(
+        self, temp_config_dir, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """The local model map is requested only while litellm is imported."""
+        import os
+
+        from orcx import router
+
+        monkeypatch.delenv("LITELLM_LOCAL_MODEL_COST_MAP", raising=False)
+        monkeypatch.delitem(router.__dict__, "litellm", raising=False)
+        load = router._load_litellm
+        seen = []
+
+        def load_litellm():
+            seen.append(os.environ.get("LITELLM_LOCAL_MODEL_COST_MAP"))
+            return load()
+
+        monkeypatch.setattr(router, "_load_litellm", load_litellm)
+        result = runner.invoke(app, ["run", "-m", "openai/gpt-4o", "--estimate", "hi"])
+        assert result.exit_code == 0, result.output
+        assert seen[0] == "True"
+        assert "LITELLM_LOCAL_MODEL_COST_MAP" not in os.environ
+
+    def test_max_cost_refuses_expensive_requests(self, temp_config_dir) -> None:
+        """Requests estimated above --max-cost exit 7 without being sent."""
+        with patch("orcx.router.litellm.completion") as completion:
+            result = runner.invoke(
+                app, ["run", "-m", "openai/gpt-4o", "--max-cost", "0.000001", "hello " * 100]
+            )
+        assert result.exit_code == 7
+        assert "exceeds --max-cost" in result.stderr
+        completion.assert_not_called()
+
+    def test_max_cost_allows_cheap_requests(
+        self, temp_config_dir, mock_litellm_response: MagicMock
+    ) -> None:
+        """Requests under the limit go through."""
+        with (
+            patch("orcx.router.litellm.completion", return_value=mock_litellm_response),
+            patch("orcx.router.litellm.completion_cost", return_value=0.001),
+        ):
+            result = runner.invoke(
+                app,
+                ["run", "-m", "openai/gpt-4o", "--no-stream", "--no-save", "--max-cost", "1", "hi"],
+            )
+        assert result.exit_code == 0
+        assert "Test response" in result.stdout
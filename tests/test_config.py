@@ -146,3 +146,228 @@ aliases:
         """Aliases should default to empty dict."""
         config = load_config()
         assert config.aliases == {}
+
+
+class TestConfigCache:
+    """Tests for per-process config/registry caching."""
+
+    def test_parses_file_once(self, temp_config_dir, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Repeated loads of an unchanged file should not re-parse YAML."""
+        import yaml
+
+        (temp_config_dir / "config.yaml").write_text("default_model: openai/gpt-4o\n")
+        calls = 0
+        real_safe_load = yaml.safe_load
+
+        def counting_safe_load(stream):
+            nonlocal calls
+            calls += 1
+            return real_safe_load(stream)
+
+        monkeypatch.setattr("yaml.safe_load", counting_safe_load)
+        for _ in range(3):
+            assert load_config().default_model == "openai/gpt-4o"
+        assert calls == 1
+
+    def test_reloads_when_file_changes(self, temp_config_dir) -> None:
+        """A changed mtime/size should invalidate the cached config."""
+        import os
+
+        config_file = temp_config_dir / "config.yaml"
+        config_file.write_text("default_model: openai/gpt-4o\n")
+        assert load_config().default_model == "openai/gpt-4o"
+
+        config_file.write_text("default_model: anthropic/claude-sonnet-4\n")
+        stat = config_file.stat()
+        os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert load_config().default_model == "anthropic/claude-sonnet-4"
+
+    def test_refresh_forces_reload(self, temp_config_dir) -> None:
+        """refresh=True should re-read even when the signature is unchanged."""
+        import os
+
+        config_file = temp_config_dir / "config.yaml"
+        config_file.write_text("default_model: openai/gpt-4o\n")
+        stat = config_file.stat()
+        assert load_config().default_model == "openai/gpt-4o"
+
+        config_file.write_text("default_model: openai/gpt-4x\n")
+        os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert load_config().default_model == "openai/gpt-4o"
+        assert load_config(refresh=True).default_model == "openai/gpt-4x"
+
+    def test_returned_config_is_a_copy(self, temp_config_dir) -> None:
+        """Mutating a loaded config must not leak into later loads."""
+        (temp_config_dir / "config.yaml").write_text("aliases:\n  ds: deepseek/deepseek-v3.2\n")
+        load_config().aliases["ds"] = "mutated/model"
+        assert load_config().aliases["ds"] == "deepseek/deepseek-v3.2"
+
+    def test_env_keys_resolved_on_every_load(
+        self, temp_config_dir, clean_env, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Env var keys are not frozen into the cache."""
+        assert load_config().keys.openai is None
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-later")
+        assert load_config().keys.openai == "sk-later"
+
+    def test_prefs_warnings_printed_once(self, temp_config_dir, capsys) -> None:
+        """Provider pref warnings are emitted when parsing, not on every load."""
+        (temp_config_dir / "config.yaml").write_text(
+            "default_provider_prefs:\n  ignore: [NotAProvider]\n"
+        )
+        load_config()
+        load_config()
+        assert capsys.readouterr().err.count("Unknown provider") == 1
+
+    def test_registry_cached_and_invalidated_on_save(self, temp_config_dir) -> None:
+        """save_registry should invalidate the cached registry."""
+        from orcx.registry import load_registry, save_registry
+        from orcx.schema import AgentConfig
+
+        (temp_config_dir / "agents.yaml").write_text("agents:\n  a:\n    model: openai/gpt-4o\n")
+        registry = load_registry()
+        assert registry.list_names() == ["a"]
+
+        registry.add(AgentConfig(name="b", model="openai/gpt-4o"))
+        assert load_registry().list_names() == ["a"]
+
+        save_registry(registry)
+        assert load_registry().list_names() == ["a", "b"]
+
+
+class TestConfigSnapshot:
+    """Tests for compiled JSON snapshots of config files."""
+
+    @staticmethod
+    def _forbid_yaml(monkeypatch: pytest.MonkeyPatch) -> None:
+        def fail(stream):
+            raise AssertionError("YAML should not be parsed")
+
+        monkeypatch.setattr("yaml.safe_load", fail)
+
+    def test_first_load_writes_snapshot(self, temp_config_dir) -> None:
+        """Loading a YAML file should compile a snapshot next to it."""
+        from orcx.config import snapshot_path
+
+        config_file = temp_config_dir / "config.yaml"
+        config_file.write_text("default_model: openai/gpt-4o\n")
+        load_config()
+        snapshot = snapshot_path(config_file)
+        assert snapshot.exists()
+        assert snapshot.stat().st_mode & 0o777 == 0o600
+
+    def test_cold_load_uses_snapshot(
+        self, temp_config_dir, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A fresh process (empty memory cache) should read the snapshot, not YAML."""
+        from orcx.config import clear_cache
+
+        (temp_config_dir / "config.yaml").write_text("default_model: openai/gpt-4o\n")
+        load_config()
+        clear_cache()
+        self._forbid_yaml(monkeypatch)
+        assert load_config().default_model == "openai/gpt-4o"
+
+    def test_stale_snapshot_ignored(self, temp_config_dir) -> None:
+        """Editing the YAML should invalidate the snapshot."""
+        import os
+
+        from orcx.config import clear_cache
+
+        config_file = temp_config_dir / "config.yaml"
+        config_file.write_text("default_model: openai/gpt-4o\n")
+        load_config()
+        clear_cache()
+
+        config_file.write_text("default_model: anthropic/claude-sonnet-4\n")
+        stat = config_file.stat()
+        os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert load_config().default_model == "anthropic/claude-sonnet-4"
+
+    def test_snapshot_repeats_warnings(
+        self, temp_config_dir, monkeypatch: pytest.MonkeyPatch, capsys
+    ) -> None:
+        """Warnings found while parsing are printed again when loading from the snapshot."""
+        from orcx.config import clear_cache
+        from orcx.registry import load_registry
+
+        (temp_config_dir / "config.yaml").write_text(
+            "default_provider_prefs:\n  ignore: [NotAProvider]\n"
+        )
+        (temp_config_dir / "agents.yaml").write_text(
+            "agents:\n  a:\n    model: openai/gpt-4o\n    provider_prefs:\n"
+            "      only: [AlsoNotAProvider]\n"
+        )
+        load_config()
+        load_registry()
+        clear_cache()
+        capsys.readouterr()
+
+        self._forbid_yaml(monkeypatch)
+        load_config()
+        load_registry()
+        err = capsys.readouterr().err
+        assert "Unknown provider 'NotAProvider'" in err
+        assert "Unknown provider 'AlsoNotAProvider'" in err
+
+    def test_edit_while_parsing_leaves_snapshot_stale(
+        self, temp_config_dir, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """The snapshot is tagged with the signature taken before the YAML was read."""
+        import os
+
+        from orcx import config
+        from orcx.config import clear_cache
+
+        config_file = temp_config_dir / "config.yaml"
+        config_file.write_text("default_model: openai/gpt-4o\n")
+        parse = config._parse_config_file
+
+        def parse_then_edit():
+            parsed = parse()
+            config_file.write_text("default_model: anthropic/claude-sonnet-4\n")
+            stat = config_file.stat()
+            os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            return parsed
+
+        monkeypatch.setattr(config, "_parse_config_file", parse_then_edit)
+        assert load_config().default_model == "openai/gpt-4o"
+        monkeypatch.setattr(config, "_parse_config_file", parse)
+        clear_cache()
+        assert load_config().default_model == "anthropic/claude-sonnet-4"
+
+    def test_corrupt_snapshot_falls_back_to_yaml(self, temp_config_dir) -> None:
+        """An unreadable snapshot should be ignored and rewritten."""
+        from orcx.config import clear_cache, snapshot_path
+
+        config_file = temp_config_dir / "config.yaml"
+        config_file.write_text("default_model: openai/gpt-4o\n")
+        load_config()
+        clear_cache()
+        snapshot_path(config_file).write_text("{not json")
+        assert load_config().default_model == "openai/gpt-4o"
+
+    def test_save_registry_writes_snapshot(
+        self, temp_config_dir, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """save_registry should leave a snapshot that loads without YAML."""
+        from orcx.config import clear_cache
+        from orcx.registry import AgentRegistry, load_registry, save_registry
+        from orcx.schema import AgentConfig, ProviderPrefs
+
+        registry = AgentRegistry()
+        for i in range(200):
+            registry.add(
+                AgentConfig(
+                    name=f"agent-{i}",
+                    model="openrouter/deepseek/deepseek-v3.2",
+                    provider_prefs=ProviderPrefs(min_bits=8),
+                )
+            )
+        save_registry(registry)
+        clear_cache()
+        self._forbid_yaml(monkeypatch)
+
+        loaded = load_registry()
+        assert len(loaded.list_names()) == 200
+        assert loaded.get("agent-7").provider_prefs.min_bits == 8
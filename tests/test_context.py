@@ -0,0 +1,199 @@
+"""Tests for building file context."""
+
+from unittest.mock import patch
+
+import pytest
+
+from orcx import context
+from orcx.context import build_context, load_context
+from orcx.errors import ContextError
+from orcx.ignore import GitIgnore, parse_rules
+
+
+class TestBuildContext:
+    def test_formats_files_after_prefix(self, tmp_path) -> None:
+        (tmp_path / "a.py").write_text("print('a')")
+        (tmp_path / "b.md").write_text("# B")
+        result = build_context([str(tmp_path / "a.py"), str(tmp_path / "b.md")], prefix="ctx")
+        assert result == "ctx\n\n# a.py\n```\nprint('a')\n```\n\n# b.md\n```\n# B\n```"
+
+    def test_without_prefix(self, tmp_path) -> None:
+        (tmp_path / "a.txt").write_text("hi")
+        assert build_context([str(tmp_path / "a.txt")]) == "# a.txt\n```\nhi\n```"
+
+    def test_multibyte_across_chunks(self, tmp_path, monkeypatch) -> None:
+        """UTF-8 sequences split across chunk boundaries decode correctly."""
+        monkeypatch.setattr(context, "CHUNK_SIZE", 3)
+        text = "héllo wörld ✓" * 10
+        (tmp_path / "u.txt").write_text(text, encoding="utf-8")
+        assert text in build_context([str(tmp_path / "u.txt")])
+
+    def test_missing_file(self, tmp_path) -> None:
+        with pytest.raises(ContextError, match="File not found"):
+            build_context([str(tmp_path / "nope.txt")])
+
+    def test_empty_directory(self, tmp_path) -> None:
+        with pytest.raises(ContextError, match="No files matched"):
+            build_context([str(tmp_path)])
+
+    def test_binary_file(self, tmp_path) -> None:
+        (tmp_path / "img.png").write_bytes(b"\x89PNG\r\n\x1a\n\0\0\0\rIHDR")
+        with pytest.raises(ContextError, match="Binary file"):
+            build_context([str(tmp_path / "img.png")])
+
+    def test_non_utf8_file(self, tmp_path) -> None:
+        (tmp_path / "latin.txt").write_bytes("caf\xe9".encode("latin-1"))
+        with pytest.raises(ContextError, match="Not UTF-8"):
+            build_context([str(tmp_path / "latin.txt")])
+
+    def test_file_too_large(self, tmp_path) -> None:
+        (tmp_path / "big.txt").write_text("x" * 100)
+        with pytest.raises(ContextError, match="File too large"):
+            build_context([str(tmp_path / "big.txt")], max_file_size=10)
+
+    def test_total_budget_checked_before_reading(self, tmp_path) -> None:
+        """An over-budget set of files fails without reading any of them."""
+        for name in ("a.txt", "b.txt"):
+            (tmp_path / name).write_text("x" * 60)
+        paths = [str(tmp_path / "a.txt"), str(tmp_path / "b.txt")]
+        with (
+            patch("orcx.context._read_file") as read_file,
+            pytest.raises(ContextError, match="context budget"),
+        ):
+            build_context(paths, max_total_size=100)
+        read_file.assert_not_called()
+
+
+class TestLoadContext:
+    def test_locates_file_contents(self, tmp_path) -> None:
+        """Each included file records where its content sits and the stat it was read at."""
+        (tmp_path / "a.py").write_text("print('a')")
+        (tmp_path / "b.md").write_text("# B")
+        paths = [str(tmp_path / "a.py"), str(tmp_path / "b.md")]
+        text, files = load_context(paths, prefix="ctx")
+
+        assert text == build_context(paths, prefix="ctx")
+        assert [text[f.start : f.end] for f in files] == ["print('a')", "# B"]
+        stat = (tmp_path / "a.py").stat()
+        assert files[0].path == str((tmp_path / "a.py").resolve())
+        assert (files[0].mtime_ns, files[0].size) == (stat.st_mtime_ns, stat.st_size)
+
+    def test_skipped_files_not_listed(self, tmp_path, monkeypatch) -> None:
+        monkeypatch.chdir(tmp_path)
+        _tree(tmp_path, {"d/a.txt": "text", "d/b.bin": b"\0\1"})
+        text, files = load_context(["d"])
+        assert [text[f.start : f.end] for f in files] == ["text"]
+
+
+class TestFileCache:
+    def test_unchanged_files_are_not_reread(self, tmp_path, temp_cache) -> None:
+        """A second load reuses cached blocks and offsets while path, mtime and size match."""
+        (tmp_path / "a.py").write_text("a = 1")
+        (tmp_path / "b.py").write_text("b = 2")
+        paths = [str(tmp_path / "a.py"), str(tmp_path / "b.py")]
+        first = load_context(paths, prefix="ctx", use_cache=True)
+
+        with patch("orcx.context._read_file", wraps=context._read_file) as read_file:
+            assert load_context(paths, prefix="ctx", use_cache=True) == first
+        read_file.assert_not_called()
+
+    def test_changed_file_is_reread(self, tmp_path, temp_cache) -> None:
+        """A new mtime or size invalidates the cached block."""
+        path = tmp_path / "a.py"
+        path.write_text("a = 1")
+        build_context([str(path)], use_cache=True)
+        path.write_text("a = 22")
+
+        assert build_context([str(path)], use_cache=True) == "# a.py\n```\na = 22\n```"
+
+    def test_cached_binary_file_still_raises(self, tmp_path, temp_cache, monkeypatch) -> None:
+        """A binary file skipped during expansion still errors when named directly."""
+        monkeypatch.chdir(tmp_path)
+        _tree(tmp_path, {"src/a.py": "a", "src/blob.bin": b"\0\1"})
+        assert build_context(["src"], use_cache=True) == "# src/a.py\n```\na\n```"
+
+        with pytest.raises(ContextError, match="Binary file"):
+            build_context(["src/blob.bin"], use_cache=True)
+
+
+def _tree(root, files: dict[str, str | bytes]) -> None:
+    for name, content in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(content, bytes):
+            path.write_bytes(content)
+        else:
+            path.write_text(content)
+
+
+class TestExpansion:
+    def test_directory_recurses_in_path_order(self, tmp_path, monkeypatch) -> None:
+        _tree(tmp_path, {"src/b.py": "b", "src/a/z.py": "z", "src/a.py": "a"})
+        monkeypatch.chdir(tmp_path)
+        result = build_context(["src"])
+        headers = [line for line in result.splitlines() if line.startswith("# ")]
+        assert headers == ["# src/a/z.py", "# src/a.py", "# src/b.py"]
+
+    def test_directory_honors_gitignore(self, tmp_path, monkeypatch) -> None:
+        _tree(
+            tmp_path,
+            {
+                ".gitignore": "*.log\nbuild/\n/src/secret.py\n",
+                "src/.gitignore": "generated_*\n!generated_keep.py\n",
+                "src/main.py": "main",
+                "src/secret.py": "secret",
+                "src/debug.log": "log",
+                "src/build/out.py": "out",
+                "src/generated_x.py": "gen",
+                "src/generated_keep.py": "keep",
+            },
+        )
+        (tmp_path / ".git").mkdir()
+        monkeypatch.chdir(tmp_path)
+        result = build_context(["src"])
+        headers = {line for line in result.splitlines() if line.startswith("# ")}
+        assert headers == {"# src/.gitignore", "# src/generated_keep.py", "# src/main.py"}
+
+    def test_directory_skips_binary_files(self, tmp_path, monkeypatch) -> None:
+        _tree(tmp_path, {"d/a.txt": "text", "d/b.bin": b"\0\1", "d/c.txt": b"caf\xe9"})
+        monkeypatch.chdir(tmp_path)
+        assert build_context(["d"]) == "# d/a.txt\n```\ntext\n```"
+
+    def test_glob_recursive(self, tmp_path, monkeypatch) -> None:
+        _tree(tmp_path, {"src/a.py": "a", "src/pkg/b.py": "b", "src/c.txt": "c"})
+        monkeypatch.chdir(tmp_path)
+        result = build_context(["src/**/*.py"])
+        headers = [line for line in result.splitlines() if line.startswith("# ")]
+        assert headers == ["# src/a.py", "# src/pkg/b.py"]
+
+    def test_glob_without_matches(self, tmp_path, monkeypatch) -> None:
+        monkeypatch.chdir(tmp_path)
+        with pytest.raises(ContextError, match="No files matched"):
+            build_context(["*.nothing"])
+
+    def test_duplicates_included_once(self, tmp_path, monkeypatch) -> None:
+        _tree(tmp_path, {"src/a.py": "a"})
+        monkeypatch.chdir(tmp_path)
+        result = build_context(["src/a.py", "src", "src/*.py"])
+        assert result.count("```\na\n```") == 1
+
+    def test_expanded_files_share_budget(self, tmp_path, monkeypatch) -> None:
+        _tree(tmp_path, {f"d/{i}.txt": "x" * 40 for i in range(5)})
+        monkeypatch.chdir(tmp_path)
+        with pytest.raises(ContextError, match="context budget"):
+            build_context(["d"], max_total_size=100)
+
+
+class TestGitIgnore:
+    def test_patterns(self, tmp_path) -> None:
+        rules = parse_rules("*.pyc\n/dist\ndocs/**/*.tmp\n", tmp_path)
+        matched = [r.regex.match for r in rules]
+        assert matched[0]("a/b/x.pyc")
+        assert matched[1]("dist") and not matched[1]("a/dist")
+        assert matched[2]("docs/x.tmp") and matched[2]("docs/a/b/x.tmp")
+
+    def test_ignored_directory_hides_contents(self, tmp_path) -> None:
+        _tree(tmp_path, {".gitignore": "node_modules/\n", "node_modules/x/index.js": "x"})
+        ignore = GitIgnore(tmp_path)
+        assert ignore.ignored(tmp_path / "node_modules" / "x" / "index.js")
+        assert not ignore.ignored(tmp_path / ".gitignore")
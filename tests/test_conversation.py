@@ -1,13 +1,15 @@
 """Tests for conversation storage."""
 
+import multiprocessing
 import tempfile
+import threading
 from pathlib import Path
 from unittest import mock
 
 import pytest
 
 from orcx import conversation
-from orcx.schema import Message
+from orcx.schema import Message, Timings
 
 
 @pytest.fixture
@@ -17,6 +19,7 @@ def temp_db():
         db_path = Path(tmpdir) / "test.db"
         with mock.patch.object(conversation, "DB_PATH", db_path):
             yield db_path
+            conversation.close()
 
 
 class TestCreateConversation:
@@ -81,6 +84,155 @@ class TestUpdateConversation:
         assert fetched.total_cost == 0.001
 
 
+class TestAppend:
+    def test_append_persists_and_updates_in_place(self, temp_db):
+        conv = conversation.create(model="test/model")
+        conv.title = "greeting"
+        conversation.append(
+            conv,
+            [
+                Message(role="user", content="hello", tokens=5),
+                Message(role="assistant", content="hi", tokens=7, cost=0.002),
+            ],
+        )
+        assert len(conv.messages) == 2
+        assert conv.total_tokens == 12
+        assert conv.total_cost == 0.002
+
+        fetched = conversation.get(conv.id)
+        assert fetched is not None
+        assert [m.content for m in fetched.messages] == ["hello", "hi"]
+        assert fetched.messages[1].tokens == 7
+        assert fetched.messages[0].created_at is not None
+        assert fetched.total_tokens == 12
+        assert fetched.title == "greeting"
+
+    def test_append_only_writes_new_messages(self, temp_db):
+        conv = conversation.create(model="test/model")
+        for i in range(3):
+            conversation.append(
+                conv,
+                [Message(role="user", content=f"q{i}"), Message(role="assistant", content=f"a{i}")],
+            )
+        with conversation._connect() as conn:
+            seqs = [
+                row["seq"]
+                for row in conn.execute(
+                    "SELECT seq FROM messages WHERE conversation_id = ? ORDER BY seq", (conv.id,)
+                )
+            ]
+        assert seqs == list(range(6))
+        fetched = conversation.get(conv.id)
+        assert [m.content for m in fetched.messages] == ["q0", "a0", "q1", "a1", "q2", "a2"]
+
+    def test_append_keeps_existing_title(self, temp_db):
+        conv = conversation.create(model="test/model")
+        conv.title = "first"
+        conversation.append(conv, [Message(role="user", content="a")])
+        stale = conversation.get(conv.id)
+        stale.title = "second"
+        conversation.append(stale, [Message(role="user", content="b")])
+        assert conversation.get(conv.id).title == "first"
+
+    def test_append_missing_raises(self, temp_db):
+        conv = conversation.create(model="test/model")
+        conversation.delete(conv.id)
+        with pytest.raises(ValueError):
+            conversation.append(conv, [Message(role="user", content="a")])
+
+    def test_timings_round_trip(self, temp_db):
+        """Assistant timings are stored per message and survive a full rewrite."""
+        conv = conversation.create(model="test/model")
+        timings = Timings(send=0.2, ttft=0.3, generation=1.5, total=1.6, save=0.01)
+        conversation.append(
+            conv,
+            [
+                Message(role="user", content="q"),
+                Message(role="assistant", content="a", timings=timings),
+            ],
+        )
+        fetched = conversation.get(conv.id)
+        assert fetched.messages[0].timings is None
+        stored = fetched.messages[1].timings
+        assert (stored.ttft, stored.generation, stored.total) == (0.3, 1.5, 1.6)
+        assert stored.save is None  # measures the write itself, so not stored
+
+        conversation.update(fetched)
+        assert conversation.get(conv.id).messages[1].timings.ttft == 0.3
+
+        conversation.delete(conv.id)
+        with conversation._connect() as conn:
+            (count,) = conn.execute("SELECT COUNT(*) FROM timings").fetchone()
+        assert count == 0
+
+    def test_delete_cascades_to_messages(self, temp_db):
+        conv = conversation.create(model="test/model")
+        conversation.append(conv, [Message(role="user", content="a")])
+        conversation.delete(conv.id)
+        with conversation._connect() as conn:
+            (count,) = conn.execute("SELECT COUNT(*) FROM messages").fetchone()
+        assert count == 0
+
+
+class TestMigration:
+    def _write_v0(self, db_path: Path, rows: list[tuple]) -> None:
+        import sqlite3
+
+        conn = sqlite3.connect(db_path)
+        conn.executescript(
+            """
+            CREATE TABLE conversations (
+                id TEXT PRIMARY KEY, model TEXT NOT NULL, agent TEXT, title TEXT,
+                messages TEXT NOT NULL, total_tokens INTEGER DEFAULT 0,
+                total_cost REAL DEFAULT 0.0, created_at TEXT NOT NULL, updated_at TEXT NOT NULL
+            );
+            CREATE INDEX idx_updated ON conversations(updated_at DESC);
+            """
+        )
+        conn.executemany("INSERT INTO conversations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.commit()
+        conn.close()
+
+    def test_migrates_json_messages(self, temp_db):
+        import json
+
+        messages = [{"role": "user", "content": "hello"}, {"role": "assistant", "content": "hi"}]
+        self._write_v0(
+            temp_db,
+            [("abcd", "m/x", None, "t", json.dumps(messages), 30, 0.5, "2026-01-01", "2026-01-02")],
+        )
+
+        conv = conversation.get("abcd")
+        assert conv is not None
+        assert [(m.role, m.content) for m in conv.messages] == [
+            ("user", "hello"),
+            ("assistant", "hi"),
+        ]
+        assert conv.total_tokens == 30
+
+        conversation.append(conv, [Message(role="user", content="again")])
+        assert len(conversation.get("abcd").messages) == 3
+
+        with conversation._connect() as conn:
+            tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master")}
+        assert "conversations_v0" not in tables
+
+    def test_keeps_corrupted_rows(self, temp_db):
+        self._write_v0(
+            temp_db,
+            [
+                ("good", "m/x", None, None, "[]", 0, 0.0, "2026-01-01", "2026-01-01"),
+                ("bad1", "m/x", None, None, "{not json", 0, 0.0, "2026-01-01", "2026-01-01"),
+            ],
+        )
+
+        assert conversation.get("good") is not None
+        assert conversation.get("bad1").messages == []
+        with conversation._connect() as conn:
+            legacy = conn.execute("SELECT id, messages FROM conversations_v0").fetchall()
+        assert [(r["id"], r["messages"]) for r in legacy] == [("bad1", "{not json")]
+
+
 class TestListRecent:
     def test_list_returns_recent(self, temp_db):
         for i in range(5):
@@ -93,6 +245,329 @@ class TestListRecent:
         assert result == []
 
 
+class TestListSummaries:
+    def _seed(self) -> list:
+        convs = []
+        for i, (model, agent) in enumerate(
+            [("openai/gpt-4o", None), ("deepseek/deepseek-v3.2", "fast"), ("openai/gpt-4o", "fast")]
+        ):
+            conv = conversation.create(model=model, agent=agent)
+            conv.title = f"conv {i}"
+            conversation.append(
+                conv,
+                [
+                    Message(role="user", content="q", tokens=1),
+                    Message(role="assistant", content="a"),
+                ],
+            )
+            convs.append(conv)
+        return convs
+
+    def test_returns_metadata_without_messages(self, temp_db):
+        convs = self._seed()
+        with mock.patch.object(conversation, "_load_messages") as load_messages:
+            summaries = conversation.list_summaries()
+        load_messages.assert_not_called()
+        assert [s.id for s in summaries] == [c.id for c in reversed(convs)]
+        assert summaries[0].message_count == 2
+        assert summaries[0].title == "conv 2"
+        assert summaries[0].total_tokens == 1
+
+    def test_limit_and_offset(self, temp_db):
+        convs = self._seed()
+        page = conversation.list_summaries(limit=1, offset=1)
+        assert [s.id for s in page] == [convs[1].id]
+
+    def test_keyset_before(self, temp_db):
+        convs = self._seed()
+        first = conversation.list_summaries(limit=2)
+        rest = conversation.list_summaries(limit=2, before=first[-1].updated_at)
+        assert [s.id for s in rest] == [convs[0].id]
+
+    def test_keyset_ties(self, temp_db):
+        """Conversations updated at the same instant are neither skipped nor repeated."""
+        convs = self._seed()
+        with conversation._connect() as conn:
+            conn.execute("UPDATE conversations SET updated_at = '2026-01-01T00:00:00+00:00'")
+
+        seen = []
+        page = conversation.list_summaries(limit=1)
+        while page:
+            seen += [s.id for s in page]
+            page = conversation.list_summaries(
+                limit=1, before=page[-1].updated_at, before_id=page[-1].id
+            )
+        assert seen == sorted((c.id for c in convs), reverse=True)
+
+    def test_filters(self, temp_db):
+        convs = self._seed()
+        by_model = conversation.list_summaries(model="gpt-4o")
+        assert {s.id for s in by_model} == {convs[0].id, convs[2].id}
+        by_agent = conversation.list_summaries(agent="fast")
+        assert {s.id for s in by_agent} == {convs[1].id, convs[2].id}
+        assert conversation.list_summaries(model="gpt_4o") == []
+
+    def test_cli_listing(self, temp_db):
+        from typer.testing import CliRunner
+
+        from orcx.cli import app
+
+        convs = self._seed()
+        result = CliRunner().invoke(app, ["conversations", "--agent", "fast", "-n", "1"])
+        assert result.exit_code == 0
+        assert convs[2].id in result.stdout
+        assert convs[1].id not in result.stdout
+        assert f"--before {convs[2].updated_at},{convs[2].id}" in result.stderr
+
+        cursor = f"{convs[2].updated_at},{convs[2].id}"
+        result = CliRunner().invoke(
+            app, ["conversations", "--agent", "fast", "-n", "1", "--before", cursor]
+        )
+        assert result.exit_code == 0
+        assert convs[1].id in result.stdout
+        assert "More:" not in result.stderr  # a full page, but nothing after it
+
+
+class TestSearch:
+    def _add(self, title: str, *contents: str):
+        conv = conversation.create(model="test/model")
+        conv.title = title
+        conversation.append(
+            conv,
+            [
+                Message(role="user" if i % 2 == 0 else "assistant", content=c)
+                for i, c in enumerate(contents)
+            ],
+        )
+        return conv
+
+    def test_finds_message_content(self, temp_db):
+        conv = self._add("decorators", "explain python decorators", "they wrap functions")
+        self._add("rust", "explain the borrow checker", "ownership rules")
+
+        matches = conversation.search("wrap functions")
+        assert [m.id for m in matches] == [conv.id]
+        assert matches[0].role == "assistant"
+        assert matches[0].seq == 1
+        assert "[wrap]" in matches[0].snippet
+
+    def test_finds_titles(self, temp_db):
+        conv = self._add("kubernetes networking", "hello", "hi")
+        matches = conversation.search("kubernetes")
+        assert [(m.id, m.role) for m in matches] == [(conv.id, "title")]
+
+    def test_one_result_per_conversation_ranked(self, temp_db):
+        strong = self._add("a", "asyncio asyncio asyncio", "asyncio event loop")
+        weak = self._add("b", "a long message that mentions asyncio once among many other words")
+        matches = conversation.search("asyncio")
+        assert [m.id for m in matches] == [strong.id, weak.id]
+
+    def test_index_follows_update_and_delete(self, temp_db):
+        conv = self._add("t", "original text")
+        conv.messages[0].content = "replacement text"
+        conversation.update(conv)
+        assert conversation.search("original") == []
+        assert [m.id for m in conversation.search("replacement")] == [conv.id]
+
+        conversation.delete(conv.id)
+        assert conversation.search("replacement") == []
+
+    def test_user_input_is_escaped(self, temp_db):
+        conv = self._add("t", 'say "hello-world" AND (more)')
+        assert [m.id for m in conversation.search('"hello-world" AND (')] == [conv.id]
+
+    def test_raw_syntax_and_errors(self, temp_db):
+        conv = self._add("t", "prefix matching works")
+        assert [m.id for m in conversation.search("match*", raw=True)] == [conv.id]
+        with pytest.raises(ValueError):
+            conversation.search('"unterminated', raw=True)
+
+    def test_migrated_messages_are_indexed(self, temp_db):
+        import json
+        import sqlite3
+
+        conn = sqlite3.connect(temp_db)
+        conn.execute(
+            """
+            CREATE TABLE conversations (
+                id TEXT PRIMARY KEY, model TEXT NOT NULL, agent TEXT, title TEXT,
+                messages TEXT NOT NULL, total_tokens INTEGER DEFAULT 0,
+                total_cost REAL DEFAULT 0.0, created_at TEXT NOT NULL, updated_at TEXT NOT NULL
+            )
+            """
+        )
+        messages = json.dumps([{"role": "user", "content": "legacy zebra"}])
+        conn.execute(
+            "INSERT INTO conversations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            ("old1", "m/x", None, None, messages, 0, 0.0, "2026-01-01", "2026-01-01"),
+        )
+        conn.commit()
+        conn.close()
+
+        assert [m.id for m in conversation.search("zebra")] == ["old1"]
+
+    def test_survives_vacuum(self, temp_db):
+        """Deleting rows then vacuuming must not shift hits onto other messages."""
+        gone = self._add("first", "alpha text", "alpha reply")
+        kept = self._add("second", "bravo text", "bravo reply")
+        conversation.delete(gone.id)
+        with conversation._connect() as conn:
+            conn.execute("VACUUM")
+
+        (match,) = conversation.search("bravo reply")
+        assert (match.id, match.seq) == (kept.id, 1)
+        assert "[bravo]" in match.snippet
+        assert [m.id for m in conversation.search("second")] == [kept.id]
+
+    def test_upgrade_declares_rowids(self, temp_db):
+        """v5 tables are rebuilt with an explicit rowid, keeping data and the index."""
+        conv = self._add("upgrade", "charlie text")
+        reply = Message(role="assistant", content="charlie reply", timings=Timings(generation=1.0))
+        conversation.append(conv, [reply])
+        conversation.close()
+
+        import sqlite3
+
+        # Recreate the v5 layout: same columns, implicit rowids
+        conn = sqlite3.connect(temp_db)
+        conn.executescript(
+            """
+            PRAGMA foreign_keys = OFF;
+            PRAGMA legacy_alter_table = ON;
+            ALTER TABLE conversations RENAME TO c6;
+            ALTER TABLE messages RENAME TO m6;
+            CREATE TABLE conversations (
+                id TEXT PRIMARY KEY, model TEXT NOT NULL, agent TEXT, title TEXT,
+                total_tokens INTEGER DEFAULT 0, total_cost REAL DEFAULT 0.0,
+                created_at TEXT NOT NULL, updated_at TEXT NOT NULL
+            );
+            CREATE TABLE messages (
+                conversation_id TEXT NOT NULL REFERENCES conversations(id) ON DELETE CASCADE,
+                seq INTEGER NOT NULL, role TEXT NOT NULL, content TEXT NOT NULL,
+                tokens INTEGER, cost REAL, created_at TEXT NOT NULL, model TEXT, provider TEXT,
+                PRIMARY KEY (conversation_id, seq)
+            );
+            INSERT INTO conversations SELECT id, model, agent, title, total_tokens, total_cost,
+                created_at, updated_at FROM c6;
+            INSERT INTO messages SELECT conversation_id, seq, role, content, tokens, cost,
+                created_at, model, provider FROM m6;
+            DROP TABLE m6;
+            DROP TABLE c6;
+            PRAGMA user_version = 5;
+            """
+        )
+        conn.close()
+
+        columns = {r[1] for r in conversation._connect().execute("PRAGMA table_info(messages)")}
+        assert "rowid" in columns
+        assert [m.seq for m in conversation.search("charlie reply")] == [1]
+        assert conversation.get(conv.id).messages[1].timings.generation == 1.0
+        conversation.delete(conv.id)
+        with conversation._connect() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM timings").fetchone()[0] == 0
+
+    def test_cli_search(self, temp_db):
+        from typer.testing import CliRunner
+
+        from orcx.cli import app
+
+        conv = self._add("sorting", "how does timsort work")
+        result = CliRunner().invoke(app, ["conversations", "search", "timsort"])
+        assert result.exit_code == 0
+        assert conv.id in result.stdout
+        assert "[timsort]" in result.stdout
+
+
+def _reply(model: str, generation: float | None, cost: float = 0.01) -> list[Message]:
+    timings = Timings(generation=generation, ttft=generation / 10) if generation else None
+    return [
+        Message(role="user", content="q", tokens=100),
+        Message(
+            role="assistant",
+            content="a",
+            tokens=20,
+            cost=cost,
+            model=model,
+            provider=model.split("/")[0],
+            timings=timings,
+        ),
+    ]
+
+
+class TestUsageStats:
+    def test_groups_and_percentiles(self, temp_db):
+        conv = conversation.create(model="openai/gpt-4o", agent="reviewer")
+        for i in range(1, 21):
+            conversation.append(conv, _reply("openai/gpt-4o", i / 10))
+        # A fallback reply counts under the model that answered
+        conversation.append(conv, _reply("groq/llama-3.1-8b", None, cost=0.0))
+
+        gpt, llama = conversation.usage_stats(by="model")
+        assert (gpt.key, gpt.requests, gpt.input_tokens, gpt.output_tokens) == (
+            "openai/gpt-4o",
+            20,
+            2000,
+            400,
+        )
+        assert gpt.cost == pytest.approx(0.2)
+        assert (gpt.latency_p50, gpt.latency_p95, gpt.latency_p99) == (1.0, 1.9, 2.0)
+        assert gpt.ttft_p50 == pytest.approx(0.1)
+        assert llama.key == "groq/llama-3.1-8b"
+        assert llama.latency_p50 is None
+
+        assert [r.key for r in conversation.usage_stats(by="provider")] == ["openai", "groq"]
+        (agent,) = conversation.usage_stats(by="agent")
+        assert (agent.key, agent.requests) == ("reviewer", 21)
+        (day,) = conversation.usage_stats(by="day")
+        assert day.key == conv.messages[-1].created_at[:10]
+
+    def test_window(self, temp_db):
+        conv = conversation.create(model="openai/gpt-4o")
+        old = _reply("openai/gpt-4o", 1.0)
+        for m in old:
+            m.created_at = "2020-01-01T00:00:00+00:00"
+        conversation.append(conv, old)
+        conversation.append(conv, _reply("openai/gpt-4o", 2.0))
+
+        assert conversation.usage_stats(days=7)[0].requests == 1
+        assert conversation.usage_stats(days=None)[0].requests == 2
+
+    def test_scans_replies_by_index(self, temp_db):
+        """The window scan reads the covering reply index, not message bodies."""
+        key, order = conversation.STATS_GROUPS["model"]
+        sql = conversation.STATS_SQL.format(
+            key=key,
+            latency=conversation.PERCENTILES_SQL.format(column="latency"),
+            ttft=conversation.PERCENTILES_SQL.format(column="ttft"),
+            order=order,
+        )
+        plan = [
+            row[3] for row in conversation._connect().execute(f"EXPLAIN QUERY PLAN {sql}", ("",))
+        ]
+        scans = [step for step in plan if " m " in f" {step} "]
+        assert scans
+        assert all("COVERING INDEX idx_replies" in step for step in scans)
+
+    def test_unknown_grouping(self, temp_db):
+        with pytest.raises(ValueError, match="Unknown grouping"):
+            conversation.usage_stats(by="color")
+
+    def test_backfills_models_on_upgrade(self, temp_db):
+        """Replies stored before v5 are attributed to their conversation's model."""
+        conv = conversation.create(model="anthropic/claude-sonnet-4")
+        conversation.append(conv, _reply("anthropic/claude-sonnet-4", 1.0))
+        with conversation._connect() as conn:
+            conn.execute("DROP INDEX idx_replies")
+            conn.execute("ALTER TABLE messages DROP COLUMN provider")
+            conn.execute("ALTER TABLE messages DROP COLUMN model")
+            conn.execute("PRAGMA user_version = 4")
+        conversation.close()
+
+        (row,) = conversation.usage_stats(by="provider")
+        assert (row.key, row.requests) == ("anthropic", 1)
+        assert conversation.get(conv.id).messages[1].model == "anthropic/claude-sonnet-4"
+
+
 class TestDelete:
     def test_delete_existing(self, temp_db):
         conv = conversation.create(model="test/model")
@@ -135,3 +610,95 @@ class TestClean:
         assert conversation.clean(days=30) == 0
         # Should delete (10 > 5)
         assert conversation.clean(days=5) == 1
+
+
+def _append_worker(db_path: str, conv_id: str, worker: int, turns: int) -> None:
+    """Subprocess entry point: append turns to a shared conversation and create new ones."""
+    conversation.DB_PATH = Path(db_path)
+    conv = conversation.get(conv_id)
+    for turn in range(turns):
+        conversation.append(
+            conv,
+            [
+                Message(role="user", content=f"w{worker} q{turn}", tokens=1),
+                Message(role="assistant", content=f"w{worker} a{turn}", tokens=1, cost=0.001),
+            ],
+        )
+        conversation.create(model=f"worker/{worker}")
+
+
+class TestConcurrency:
+    def test_connection_reused(self, temp_db):
+        assert conversation._connect() is conversation._connect()
+
+    def test_wal_mode(self, temp_db):
+        conn = conversation._connect()
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+
+    def test_threads_get_own_connections(self, temp_db):
+        conv = conversation.create(model="test/model")
+        errors: list[BaseException] = []
+
+        def write(worker: int) -> None:
+            try:
+                for turn in range(10):
+                    conversation.append(conv, [Message(role="user", content=f"{worker}-{turn}")])
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                conversation.close()
+
+        threads = [threading.Thread(target=write, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert errors == []
+        assert len(conversation.get(conv.id).messages) == 80
+
+    def test_many_writer_processes(self, temp_db):
+        """Parallel orcx processes writing one DB must not hit 'database is locked'."""
+        workers, turns = 8, 15
+        conv = conversation.create(model="test/model")
+        conversation.close()
+
+        ctx = multiprocessing.get_context("spawn")
+        procs = [
+            ctx.Process(target=_append_worker, args=(str(temp_db), conv.id, w, turns))
+            for w in range(workers)
+        ]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join(timeout=120)
+        assert [p.exitcode for p in procs] == [0] * workers
+
+        fetched = conversation.get(conv.id)
+        assert len(fetched.messages) == workers * turns * 2
+        assert fetched.total_tokens == workers * turns * 2
+        assert abs(fetched.total_cost - workers * turns * 0.001) < 1e-9
+        # Each worker's turns stay in order and user/assistant pairs stay adjacent
+        contents = [m.content for m in fetched.messages]
+        for w in range(workers):
+            mine = [c for c in contents if c.startswith(f"w{w} ")]
+            assert mine == [f"w{w} {kind}{t}" for t in range(turns) for kind in ("q", "a")]
+        for i in range(0, len(contents), 2):
+            assert contents[i].split()[0] == contents[i + 1].split()[0]
+
+        with conversation._connect() as conn:
+            (created,) = conn.execute(
+                "SELECT COUNT(*) FROM conversations WHERE model LIKE 'worker/%'"
+            ).fetchone()
+        assert created == workers * turns
+
+
+class TestDeprecated:
+    def test_corrupted_error_still_importable(self) -> None:
+        with pytest.warns(DeprecationWarning, match="never raised"):
+            from orcx.conversation import ConversationCorruptedError
+
+        error = ConversationCorruptedError("abcd", "bad json")
+        assert error.conv_id == "abcd"
+        assert str(error) == "Corrupted conversation abcd: bad json"
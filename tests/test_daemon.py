@@ -0,0 +1,85 @@
+"""Tests for the local daemon and its client."""
+
+import asyncio
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from typer.testing import CliRunner
+
+from orcx import daemon
+from orcx.cli import app
+from orcx.errors import OrcxError, RateLimitError
+from orcx.schema import OrcxRequest
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def daemon_socket(tmp_path: Path, temp_config_dir: Path, start_server) -> Path:
+    """Run a daemon on a temporary socket in a background event loop."""
+    path = tmp_path / "orcx.sock"
+    start_server(daemon.start(path))
+    return path
+
+
+class TestDaemon:
+    def test_connect_without_daemon(self, tmp_path) -> None:
+        """No socket means no client; the CLI runs in-process."""
+        assert daemon.connect(tmp_path / "orcx.sock") is None
+
+    def test_run(self, daemon_socket, mock_litellm_response) -> None:
+        """Blocking requests return the daemon's response with usage and cost."""
+        client = daemon.connect(daemon_socket)
+        assert client is not None
+        with (
+            patch("orcx.router.litellm.acompletion", AsyncMock(return_value=mock_litellm_response)),
+            patch("orcx.router.litellm.completion_cost", return_value=0.001),
+        ):
+            response = client.run(OrcxRequest(prompt="hi", model="openai/gpt-4o"))
+
+        assert response.content == "Test response"
+        assert response.usage["total_tokens"] == 30
+        assert response.cost == 0.001
+
+    def test_run_stream(self, daemon_socket, chunk_stream) -> None:
+        """Streamed chunks are forwarded as they arrive, then the response."""
+        client = daemon.connect(daemon_socket)
+        acompletion = AsyncMock(return_value=chunk_stream("Hel", "lo"))
+        with patch("orcx.router.litellm.acompletion", acompletion):
+            stream = client.run_stream(OrcxRequest(prompt="hi", model="openai/gpt-4o"))
+            assert list(stream) == ["Hel", "lo"]
+
+        assert stream.response.content == "Hello"
+        assert acompletion.call_args.kwargs["stream"] is True
+
+    def test_errors_keep_their_type(self, daemon_socket) -> None:
+        """Daemon-side errors are raised as the same orcx error type."""
+        import litellm
+
+        client = daemon.connect(daemon_socket)
+        error = litellm.RateLimitError(message="slow down", llm_provider="openai", model="gpt-4o")
+        with (
+            patch("orcx.router.litellm.acompletion", AsyncMock(side_effect=error)),
+            pytest.raises(RateLimitError, match="Rate limited"),
+        ):
+            client.run(OrcxRequest(prompt="hi", model="openai/gpt-4o"))
+
+    def test_second_daemon_refused(self, daemon_socket) -> None:
+        """Starting on a socket that's already served is an error."""
+        with pytest.raises(OrcxError, match="already running"):
+            asyncio.run(daemon.start(daemon_socket))
+
+    def test_cli_forwards_to_daemon(self, daemon_socket, chunk_stream, tmp_path) -> None:
+        """`orcx run` uses a running daemon instead of calling litellm in-process."""
+        acompletion = AsyncMock(return_value=chunk_stream("from ", "daemon"))
+        with (
+            patch("orcx.daemon.SOCKET_PATH", daemon_socket),
+            patch("orcx.router.litellm.acompletion", acompletion),
+            patch("orcx.router.litellm.completion") as completion,
+        ):
+            result = runner.invoke(app, ["run", "-m", "openai/gpt-4o", "--no-save", "hi"])
+
+        assert result.exit_code == 0, result.output
+        assert "from daemon" in result.stdout
+        completion.assert_not_called()
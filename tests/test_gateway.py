@@ -0,0 +1,224 @@
+"""End-to-end tests for the OpenAI-compatible gateway against a mocked litellm."""
+
+import asyncio
+import json
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from orcx import conversation, gateway
+from orcx.gateway import HTTPError, to_request
+
+
+@pytest.fixture
+def gateway_url(temp_config_dir: Path, tmp_path: Path, start_server) -> Iterator[str]:
+    """Run the gateway on a free port in a background event loop."""
+    (temp_config_dir / "config.yaml").write_text("aliases:\n  fast: groq/llama-3.1-8b\n")
+    (temp_config_dir / "agents.yaml").write_text(
+        "agents:\n  reviewer:\n    model: anthropic/claude-sonnet-4\n"
+        "    system_prompt: Review carefully\n"
+    )
+    with patch.object(conversation, "DB_PATH", tmp_path / "conversations.db"):
+        server = start_server(gateway.start("127.0.0.1", 0))
+        port = server.sockets[0].getsockname()[1]
+        yield f"http://127.0.0.1:{port}/v1"
+
+
+def _body(model: str = "openai/gpt-4o", **extra) -> dict:
+    return {"model": model, "messages": [{"role": "user", "content": "hi"}], **extra}
+
+
+class TestToRequest:
+    def test_splits_system_history_and_prompt(self, temp_config_dir) -> None:
+        """System message, history and final prompt map onto the orcx request."""
+        request, history = to_request(
+            {
+                "model": "openai/gpt-4o",
+                "messages": [
+                    {"role": "system", "content": "Be brief"},
+                    {"role": "user", "content": "one"},
+                    {"role": "assistant", "content": "1"},
+                    {"role": "user", "content": [{"type": "text", "text": "two"}]},
+                ],
+                "max_tokens": 50,
+            }
+        )
+        assert request.system_prompt == "Be brief"
+        assert request.prompt == "two"
+        assert request.max_tokens == 50
+        assert [m["content"] for m in history] == ["one", "1"]
+
+    def test_last_message_must_be_user(self, temp_config_dir) -> None:
+        with pytest.raises(HTTPError, match="role 'user'"):
+            to_request({"model": "x", "messages": [{"role": "assistant", "content": "hi"}]})
+
+    def test_rejects_unsupported_parameters(self, temp_config_dir) -> None:
+        """Fields orcx would drop are an error; nulls and OpenAI defaults are fine."""
+        with pytest.raises(HTTPError, match="Unsupported parameters: response_format, tools"):
+            to_request(_body(tools=[{"type": "function"}], response_format={"type": "json_object"}))
+
+        request, _ = to_request(_body(n=1, top_p=1, stop=None, user="me"))
+        assert request.prompt == "hi"
+
+
+class TestGateway:
+    def test_chat_completion(self, gateway_url, mock_litellm_response) -> None:
+        """A blocking completion returns an OpenAI chat.completion and is logged."""
+        acompletion = AsyncMock(return_value=mock_litellm_response)
+        with (
+            patch("orcx.router.litellm.acompletion", acompletion),
+            patch("orcx.router.litellm.completion_cost", return_value=0.001),
+        ):
+            response = httpx.post(f"{gateway_url}/chat/completions", json=_body("fast"))
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["object"] == "chat.completion"
+        assert data["choices"][0]["message"] == {"role": "assistant", "content": "Test response"}
+        assert data["usage"]["total_tokens"] == 30
+        assert acompletion.call_args.kwargs["model"] == "groq/llama-3.1-8b"
+
+        saved = conversation.get_last()
+        assert saved is not None
+        assert [m.content for m in saved.messages] == ["hi", "Test response"]
+        assert saved.total_cost == 0.001
+
+    def test_finish_reason_passed_through(self, gateway_url, mock_litellm_response) -> None:
+        """The provider's finish_reason is reported, e.g. when max_tokens cuts a reply short."""
+        mock_litellm_response.choices[0].finish_reason = "length"
+        with (
+            patch("orcx.router.litellm.acompletion", AsyncMock(return_value=mock_litellm_response)),
+            patch("orcx.router.litellm.completion_cost", return_value=0.0),
+        ):
+            response = httpx.post(f"{gateway_url}/chat/completions", json=_body(max_tokens=5))
+
+        assert response.json()["choices"][0]["finish_reason"] == "length"
+
+    def test_unsupported_parameters_are_rejected(self, gateway_url) -> None:
+        acompletion = AsyncMock()
+        with patch("orcx.router.litellm.acompletion", acompletion):
+            response = httpx.post(f"{gateway_url}/chat/completions", json=_body(seed=1))
+
+        assert response.status_code == 400
+        assert response.json()["error"]["type"] == "invalid_request_error"
+        acompletion.assert_not_called()
+
+    def test_agent_model(self, gateway_url, mock_litellm_response) -> None:
+        """`model` naming an agent uses the agent's model and system prompt."""
+        acompletion = AsyncMock(return_value=mock_litellm_response)
+        with (
+            patch("orcx.router.litellm.acompletion", acompletion),
+            patch("orcx.router.litellm.completion_cost", return_value=0.0),
+        ):
+            response = httpx.post(f"{gateway_url}/chat/completions", json=_body("reviewer"))
+
+        assert response.status_code == 200
+        kwargs = acompletion.call_args.kwargs
+        assert kwargs["model"] == "anthropic/claude-sonnet-4"
+        assert kwargs["messages"][0] == {"role": "system", "content": "Review carefully"}
+
+    def test_streaming(self, gateway_url, chunk_stream) -> None:
+        """Streaming responses are SSE chat.completion.chunk events ending in [DONE]."""
+        acompletion = AsyncMock(return_value=chunk_stream("Hel", "lo"))
+        with (
+            patch("orcx.router.litellm.acompletion", acompletion),
+            httpx.stream(
+                "POST", f"{gateway_url}/chat/completions", json=_body(stream=True)
+            ) as response,
+        ):
+            assert response.headers["content-type"] == "text/event-stream"
+            events = [line.removeprefix("data: ") for line in response.iter_lines() if line]
+
+        assert events[-1] == "[DONE]"
+        chunks = [json.loads(e) for e in events[:-1]]
+        deltas = [c["choices"][0]["delta"].get("content") for c in chunks]
+        assert "".join(d for d in deltas if d) == "Hello"
+        assert chunks[-1]["choices"][0]["finish_reason"] == "stop"
+
+    def test_streaming_finish_reason(self, gateway_url) -> None:
+        """The final chunk carries the provider's finish_reason."""
+        from litellm.types.utils import Delta, ModelResponseStream, StreamingChoices
+
+        async def chunks():
+            for text, reason in (("Hel", None), ("lo", "length")):
+                choice = StreamingChoices(delta=Delta(content=text), finish_reason=reason)
+                yield ModelResponseStream(model="gpt-4o", choices=[choice])
+
+        with (
+            patch("orcx.router.litellm.acompletion", AsyncMock(return_value=chunks())),
+            patch("orcx.router.litellm.completion_cost", return_value=0.0),
+            httpx.stream(
+                "POST", f"{gateway_url}/chat/completions", json=_body(stream=True)
+            ) as response,
+        ):
+            events = [line.removeprefix("data: ") for line in response.iter_lines() if line]
+
+        assert json.loads(events[-2])["choices"][0]["finish_reason"] == "length"
+
+    def test_openai_client(self, gateway_url, chunk_stream) -> None:
+        """The official OpenAI client can stream through the gateway."""
+        from openai import OpenAI
+
+        client = OpenAI(base_url=gateway_url, api_key="unused")
+        with patch(
+            "orcx.router.litellm.acompletion", AsyncMock(return_value=chunk_stream("a", "b", "c"))
+        ):
+            stream = client.chat.completions.create(
+                model="openai/gpt-4o", messages=[{"role": "user", "content": "hi"}], stream=True
+            )
+            text = "".join(c.choices[0].delta.content or "" for c in stream if c.choices)
+        assert text == "abc"
+
+    def test_concurrent_clients(self, gateway_url, mock_litellm_response) -> None:
+        """Slow provider calls overlap instead of queueing behind each other."""
+
+        async def slow(**kwargs):
+            await asyncio.sleep(0.3)
+            return mock_litellm_response
+
+        async def fire(n: int) -> list[int]:
+            async with httpx.AsyncClient(timeout=10) as client:
+                responses = await asyncio.gather(
+                    *(
+                        client.post(f"{gateway_url}/chat/completions", json=_body())
+                        for _ in range(n)
+                    )
+                )
+            return [r.status_code for r in responses]
+
+        with (
+            patch("orcx.router.litellm.acompletion", side_effect=slow),
+            patch("orcx.router.litellm.completion_cost", return_value=0.0),
+        ):
+            start = time.perf_counter()
+            statuses = asyncio.run(fire(10))
+            elapsed = time.perf_counter() - start
+
+        assert statuses == [200] * 10
+        assert elapsed < 2.0
+
+    def test_models(self, gateway_url) -> None:
+        """/v1/models lists agents and aliases."""
+        data = httpx.get(f"{gateway_url}/models").json()
+        assert data["object"] == "list"
+        assert {m["id"] for m in data["data"]} == {"reviewer", "fast"}
+
+    def test_errors_use_openai_format(self, gateway_url) -> None:
+        """Router errors map to HTTP statuses with an OpenAI error body."""
+        import litellm
+
+        error = litellm.RateLimitError(message="slow down", llm_provider="openai", model="gpt-4o")
+        with patch("orcx.router.litellm.acompletion", AsyncMock(side_effect=error)):
+            response = httpx.post(f"{gateway_url}/chat/completions", json=_body())
+        assert response.status_code == 429
+        assert response.json()["error"]["type"] == "rate_limit_error"
+
+        response = httpx.post(f"{gateway_url}/chat/completions", json=_body("no-slash"))
+        assert response.status_code == 400
+
+        assert httpx.get(f"{gateway_url}/nope").status_code == 404
+        assert httpx.get(f"{gateway_url}/chat/completions").status_code == 405
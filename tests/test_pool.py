@@ -0,0 +1,133 @@
+"""Tests for the shared HTTP connection pool."""
+
+import asyncio
+import json
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from typer.testing import CliRunner
+
+from orcx import pool, router
+from orcx.cli import app
+from orcx.schema import OrcxRequest
+
+runner = CliRunner()
+
+COMPLETION = {
+    "id": "chatcmpl-1",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4o",
+    "choices": [
+        {
+            "index": 0,
+            "message": {"role": "assistant", "content": "pong"},
+            "finish_reason": "stop",
+        }
+    ],
+    "usage": {"prompt_tokens": 5, "completion_tokens": 1, "total_tokens": 6},
+}
+
+
+class _Provider(BaseHTTPRequestHandler):
+    """A keep-alive OpenAI-compatible endpoint."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = json.dumps(COMPLETION).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture(autouse=True)
+def fresh_pool() -> Iterator[None]:
+    pool.close()
+    yield
+    pool.close()
+
+
+@pytest.fixture
+def provider(monkeypatch: pytest.MonkeyPatch, temp_config_dir) -> Iterator[str]:
+    """Serve completions locally and point OpenAI requests at it."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Provider)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("OPENAI_API_BASE", base)
+    yield base
+    server.shutdown()
+    server.server_close()
+
+
+def _request() -> OrcxRequest:
+    return OrcxRequest(prompt="ping", model="openai/gpt-4o")
+
+
+class TestPool:
+    def test_config_limits(self, temp_config_dir) -> None:
+        """Pool limits and timeouts come from the `http` config section."""
+        (temp_config_dir / "config.yaml").write_text(
+            "http:\n  max_connections: 7\n  connect_timeout: 2.5\n  timeout: 30\n"
+        )
+        client = pool.get_client()
+        transport = client._transport
+        assert transport._pool._max_connections == 7
+        assert client.timeout.connect == 2.5
+        assert client.timeout.read == 30
+        assert transport._pool._http2 is False  # off by default
+
+    def test_http2_opt_in(self, temp_config_dir) -> None:
+        """`http2: true` negotiates HTTP/2 when h2 is installed."""
+        pytest.importorskip("h2")
+        (temp_config_dir / "config.yaml").write_text("http:\n  http2: true\n")
+        assert pool.get_client()._transport._pool._http2 is True
+
+    def test_client_is_shared(self, temp_config_dir) -> None:
+        assert pool.get_client() is pool.get_client()
+
+    def test_async_client_per_loop(self, temp_config_dir) -> None:
+        """Each event loop gets its own async client, reused within the loop."""
+
+        async def twice():
+            return pool.get_async_client(), pool.get_async_client()
+
+        first, again = asyncio.run(twice())
+        other, _ = asyncio.run(twice())
+        assert first is again
+        assert first is not other
+
+    def test_run_reuses_connection(self, provider) -> None:
+        """Sequential provider calls share one connection."""
+        for _ in range(3):
+            assert router.run(_request()).content == "pong"
+
+        stats = pool.stats()
+        assert stats.requests == 3
+        assert stats.connections == 1
+        assert stats.reused == 2
+
+    def test_arun_reuses_connection(self, provider) -> None:
+        async def main() -> list[str]:
+            return [(await router.arun(_request())).content for _ in range(3)]
+
+        assert asyncio.run(main()) == ["pong"] * 3
+        stats = pool.stats()
+        assert (stats.requests, stats.connections) == (3, 1)
+
+    def test_debug_shows_stats(self, provider) -> None:
+        result = runner.invoke(
+            app, ["--debug", "run", "--no-save", "--no-stream", "ping", "-m", "openai/gpt-4o"]
+        )
+        assert result.exit_code == 0, result.output
+        assert "[http: 1 requests, 1 connections (0 reused)" in result.stderr
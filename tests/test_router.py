@@ -1,9 +1,13 @@
 """Unit tests for router module."""
 
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
 import pytest
 
-from orcx.errors import InvalidModelFormatError
+from orcx.errors import InvalidModelFormatError, RateLimitError
 from orcx.router import expand_alias, extract_provider, validate_model_format
+from orcx.schema import OrcxRequest
 
 
 class TestExtractProvider:
@@ -237,3 +241,711 @@ default_provider_prefs:
         )
         provider = params["extra_body"]["provider"]
         assert provider["order"] == ["NovitaAI"]
+
+
+class _FakeStream:
+    """Async chunk stream that records whether it was closed."""
+
+    def __init__(self, chunks: list[MagicMock], hang: bool = False):
+        self.chunks = chunks
+        self.hang = hang
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> MagicMock:
+        if self.chunks:
+            return self.chunks.pop(0)
+        if self.hang:
+            await asyncio.sleep(3600)
+        raise StopAsyncIteration
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+class TestAsyncRun:
+    """Tests for arun and arun_stream."""
+
+    @patch("orcx.router.litellm")
+    def test_arun_uses_acompletion(
+        self, mock_litellm: MagicMock, mock_litellm_response: MagicMock, temp_config_dir
+    ) -> None:
+        """arun should await litellm.acompletion with the shared params."""
+        from orcx.router import arun
+
+        mock_litellm.acompletion = AsyncMock(return_value=mock_litellm_response)
+        mock_litellm.completion_cost.return_value = 0.001
+
+        response = asyncio.run(arun(OrcxRequest(prompt="hi", model="openai/gpt-4o")))
+
+        assert response.content == "Test response"
+        assert response.usage == {"prompt_tokens": 10, "completion_tokens": 20, "total_tokens": 30}
+        assert response.cost == 0.001
+        call_kwargs = mock_litellm.acompletion.call_args.kwargs
+        assert call_kwargs["model"] == "openai/gpt-4o"
+        assert call_kwargs["stream"] is False
+        mock_litellm.completion.assert_not_called()
+
+    def test_arun_wraps_errors(self, temp_config_dir) -> None:
+        """litellm errors should surface as orcx errors."""
+        import litellm
+
+        from orcx.router import arun
+
+        error = litellm.RateLimitError(message="slow down", llm_provider="openai", model="gpt-4o")
+        with (
+            patch("orcx.router.litellm.acompletion", AsyncMock(side_effect=error)),
+            pytest.raises(RateLimitError),
+        ):
+            asyncio.run(arun(OrcxRequest(prompt="hi", model="openai/gpt-4o")))
+
+    @patch("orcx.router.litellm")
+    def test_arun_stream_yields_chunks(
+        self, mock_litellm: MagicMock, temp_config_dir, make_chunk
+    ) -> None:
+        """arun_stream should yield content deltas and close the stream."""
+        from orcx.router import arun_stream
+
+        stream = _FakeStream([make_chunk("Hel"), make_chunk("lo")])
+        mock_litellm.acompletion = AsyncMock(return_value=stream)
+
+        async def collect() -> list[str]:
+            request = OrcxRequest(prompt="hi", model="openai/gpt-4o")
+            return [chunk async for chunk in arun_stream(request)]
+
+        assert asyncio.run(collect()) == ["Hel", "lo"]
+        assert mock_litellm.acompletion.call_args.kwargs["stream"] is True
+        assert stream.closed
+
+    @patch("orcx.router.litellm")
+    def test_arun_stream_cancellation_closes_stream(
+        self, mock_litellm: MagicMock, temp_config_dir, make_chunk
+    ) -> None:
+        """Cancelling a consumer mid-stream should close the provider stream."""
+        from orcx.router import arun_stream
+
+        stream = _FakeStream([make_chunk("first")], hang=True)
+        mock_litellm.acompletion = AsyncMock(return_value=stream)
+        received: list[str] = []
+
+        async def consume() -> None:
+            async for chunk in arun_stream(OrcxRequest(prompt="hi", model="openai/gpt-4o")):
+                received.append(chunk)
+
+        async def main() -> None:
+            task = asyncio.create_task(consume())
+            while not received:
+                await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(main())
+        assert received == ["first"]
+        assert stream.closed
+
+
+def _rate_limit_error() -> Exception:
+    import litellm
+
+    return litellm.RateLimitError(message="slow down", llm_provider="openai", model="gpt-4o")
+
+
+class TestFailover:
+    """Tests for failover through agent fallback_models."""
+
+    def _write_agent(self, config_dir, fallbacks: str = "[anthropic/claude-sonnet-4]") -> None:
+        (config_dir / "agents.yaml").write_text(
+            "agents:\n"
+            "  resilient:\n"
+            "    model: openai/gpt-4o\n"
+            f"    fallback_models: {fallbacks}\n"
+        )
+
+    def test_fails_over_on_rate_limit(self, temp_config_dir, mock_litellm_response) -> None:
+        """A rate-limited primary should fall through to the next model."""
+        from orcx.router import run
+
+        self._write_agent(temp_config_dir)
+        completion = MagicMock(side_effect=[_rate_limit_error(), mock_litellm_response])
+        with (
+            patch("orcx.router.litellm.completion", completion),
+            patch("orcx.router.litellm.completion_cost", return_value=0.001),
+        ):
+            response = run(OrcxRequest(prompt="hi", agent="resilient"))
+
+        assert response.provider == "anthropic"
+        assert [c.kwargs["model"] for c in completion.call_args_list] == [
+            "openai/gpt-4o",
+            "anthropic/claude-sonnet-4",
+        ]
+        assert [a.model for a in response.attempts] == [
+            "openai/gpt-4o",
+            "anthropic/claude-sonnet-4",
+        ]
+        assert response.attempts[0].error == "Rate limited by openai"
+        assert response.attempts[1].error is None
+
+    def test_raises_last_error_when_all_fail(self, temp_config_dir) -> None:
+        """When every model fails, the last model's error is raised."""
+        from orcx.router import run
+
+        self._write_agent(temp_config_dir)
+        completion = MagicMock(side_effect=[_rate_limit_error(), _rate_limit_error()])
+        with (
+            patch("orcx.router.litellm.completion", completion),
+            pytest.raises(RateLimitError) as exc_info,
+        ):
+            run(OrcxRequest(prompt="hi", agent="resilient"))
+
+        assert exc_info.value.provider == "anthropic"
+        assert completion.call_count == 2
+
+    def test_no_failover_on_other_errors(self, temp_config_dir) -> None:
+        """Errors that a different model won't fix are raised immediately."""
+        from orcx.router import run
+
+        self._write_agent(temp_config_dir)
+        completion = MagicMock(side_effect=ValueError("bad request"))
+        with (
+            patch("orcx.router.litellm.completion", completion),
+            pytest.raises(ValueError),
+        ):
+            run(OrcxRequest(prompt="hi", agent="resilient"))
+
+        assert completion.call_count == 1
+
+    def test_fallbacks_expand_aliases(self, temp_config_dir) -> None:
+        """Fallback entries go through alias expansion and format validation."""
+        from orcx.router import candidate_models
+        from orcx.schema import AgentConfig
+
+        config = "aliases:\n  sonnet: anthropic/claude-sonnet-4\n"
+        (temp_config_dir / "config.yaml").write_text(config)
+        agent = AgentConfig(
+            name="a", model="openai/gpt-4o", fallback_models=["sonnet", "openai/gpt-4o"]
+        )
+        assert candidate_models("openai/gpt-4o", agent) == [
+            "openai/gpt-4o",
+            "anthropic/claude-sonnet-4",
+        ]
+
+        agent.fallback_models = ["no-slash"]
+        with pytest.raises(InvalidModelFormatError):
+            candidate_models("openai/gpt-4o", agent)
+
+    def test_stream_fails_over_before_first_chunk(self, temp_config_dir, make_chunk) -> None:
+        """Streaming fails over while nothing has been yielded yet."""
+        from orcx.router import run_stream
+
+        self._write_agent(temp_config_dir)
+        completion = MagicMock(side_effect=[_rate_limit_error(), iter([make_chunk("ok")])])
+        with patch("orcx.router.litellm.completion", completion):
+            chunks = list(run_stream(OrcxRequest(prompt="hi", agent="resilient")))
+
+        assert chunks == ["ok"]
+        assert completion.call_args.kwargs["model"] == "anthropic/claude-sonnet-4"
+
+    def test_stream_does_not_fail_over_mid_stream(self, temp_config_dir, make_chunk) -> None:
+        """Once output has started, a failure is raised rather than retried elsewhere."""
+        from orcx.router import run_stream
+
+        def broken():
+            yield make_chunk("partial")
+            raise _rate_limit_error()
+
+        self._write_agent(temp_config_dir)
+        completion = MagicMock(return_value=broken())
+        received: list[str] = []
+        with (
+            patch("orcx.router.litellm.completion", completion),
+            pytest.raises(RateLimitError),
+        ):
+            for chunk in run_stream(OrcxRequest(prompt="hi", agent="resilient")):
+                received.append(chunk)
+
+        assert received == ["partial"]
+        assert completion.call_count == 1
+
+    def test_arun_stream_fails_over(self, temp_config_dir, make_chunk) -> None:
+        """The async stream fails over and closes the failed attempt's stream."""
+        from orcx.router import arun_stream
+
+        self._write_agent(temp_config_dir)
+        stream = _FakeStream([make_chunk("ok")])
+        acompletion = AsyncMock(side_effect=[_rate_limit_error(), stream])
+
+        async def collect() -> list[str]:
+            return [c async for c in arun_stream(OrcxRequest(prompt="hi", agent="resilient"))]
+
+        with patch("orcx.router.litellm.acompletion", acompletion):
+            assert asyncio.run(collect()) == ["ok"]
+        assert stream.closed
+
+
+class TestRetry:
+    """Tests for the retry policy and its use in run/run_stream."""
+
+    def test_delay_backs_off_exponentially(self) -> None:
+        """Delays double from `backoff`, capped at `max_backoff`, until attempts run out."""
+        from orcx.schema import RetryPolicy
+
+        policy = RetryPolicy(max_attempts=5, backoff=1.0, max_backoff=3.0, jitter=False)
+        assert [policy.delay(n) for n in range(5)] == [1.0, 2.0, 3.0, 3.0, None]
+
+    def test_delay_jitter_stays_in_range(self) -> None:
+        """Jitter scales the delay down by at most half."""
+        from orcx.schema import RetryPolicy
+
+        policy = RetryPolicy(max_attempts=3, backoff=2.0)
+        assert all(1.0 <= policy.delay(0) <= 2.0 for _ in range(50))
+
+    def test_delay_honors_retry_after(self) -> None:
+        """retry-after replaces the computed delay, unless it exceeds max_backoff."""
+        from orcx.schema import RetryPolicy
+
+        policy = RetryPolicy(max_attempts=3, max_backoff=10.0)
+        assert policy.delay(0, retry_after=7.0) == 7.0
+        assert policy.delay(0, retry_after=60.0) is None
+
+    def test_agent_policy_overrides_global(self, temp_config_dir) -> None:
+        """Fields set on the agent override the global policy; the rest are inherited."""
+        from orcx.router import get_retry_policy
+        from orcx.schema import AgentConfig, RetryPolicy
+
+        (temp_config_dir / "config.yaml").write_text("retry:\n  max_attempts: 4\n  backoff: 2\n")
+        agent = AgentConfig(name="a", model="openai/gpt-4o", retry=RetryPolicy(backoff=0.5))
+
+        policy = get_retry_policy(agent)
+        assert policy.max_attempts == 4
+        assert policy.backoff == 0.5
+        assert get_retry_policy(None).backoff == 2
+
+    def test_run_retries_then_succeeds(self, temp_config_dir, mock_litellm_response) -> None:
+        """Transient errors are retried on the same model after the backoff delay."""
+        from orcx.router import run
+
+        (temp_config_dir / "config.yaml").write_text(
+            "retry:\n  max_attempts: 3\n  backoff: 0.25\n  jitter: false\n"
+        )
+        completion = MagicMock(
+            side_effect=[_rate_limit_error(), _rate_limit_error(), mock_litellm_response]
+        )
+        with (
+            patch("orcx.router.litellm.completion", completion),
+            patch("orcx.router.litellm.completion_cost", return_value=0.001),
+            patch("orcx.router.time.sleep") as sleep,
+        ):
+            response = run(OrcxRequest(prompt="hi", model="openai/gpt-4o"))
+
+        assert response.content == "Test response"
+        assert response.retries == 2
+        assert [call.args[0] for call in sleep.call_args_list] == [0.25, 0.5]
+        assert [a.delay for a in response.attempts] == [0.25, 0.5, None]
+
+    def test_run_waits_for_retry_after(self, temp_config_dir, mock_litellm_response) -> None:
+        """A retry-after header from the provider sets the wait."""
+        from orcx.errors import RateLimitError as OrcxRateLimit
+        from orcx.router import run
+
+        (temp_config_dir / "config.yaml").write_text("retry:\n  max_attempts: 2\n")
+        completion = MagicMock(side_effect=[_rate_limit_error(), mock_litellm_response])
+        with (
+            patch("orcx.router.litellm.completion", completion),
+            patch("orcx.router.litellm.completion_cost", return_value=0.001),
+            patch("orcx.router._wrap_litellm_error", return_value=OrcxRateLimit("openai", 4.0)),
+            patch("orcx.router.time.sleep") as sleep,
+        ):
+            run(OrcxRequest(prompt="hi", model="openai/gpt-4o"))
+
+        sleep.assert_called_once_with(4.0)
+
+    def test_retries_exhausted_before_failover(
+        self, temp_config_dir, mock_litellm_response
+    ) -> None:
+        """Each model gets its full retry budget before moving to the fallback."""
+        from orcx.router import run
+
+        (temp_config_dir / "agents.yaml").write_text(
+            "agents:\n"
+            "  resilient:\n"
+            "    model: openai/gpt-4o\n"
+            "    fallback_models: [anthropic/claude-sonnet-4]\n"
+            "    retry:\n"
+            "      max_attempts: 2\n"
+        )
+        completion = MagicMock(
+            side_effect=[_rate_limit_error(), _rate_limit_error(), mock_litellm_response]
+        )
+        with (
+            patch("orcx.router.litellm.completion", completion),
+            patch("orcx.router.litellm.completion_cost", return_value=0.001),
+            patch("orcx.router.time.sleep"),
+        ):
+            response = run(OrcxRequest(prompt="hi", agent="resilient"))
+
+        assert [a.model for a in response.attempts] == [
+            "openai/gpt-4o",
+            "openai/gpt-4o",
+            "anthropic/claude-sonnet-4",
+        ]
+        assert response.retries == 1
+
+    def test_stream_retries_before_first_chunk(self, temp_config_dir, make_chunk) -> None:
+        """Streaming retries a failed connection before any output."""
+        from orcx.router import run_stream
+
+        (temp_config_dir / "config.yaml").write_text("retry:\n  max_attempts: 2\n")
+        completion = MagicMock(side_effect=[_rate_limit_error(), iter([make_chunk("ok")])])
+        with (
+            patch("orcx.router.litellm.completion", completion),
+            patch("orcx.router.time.sleep") as sleep,
+        ):
+            chunks = list(run_stream(OrcxRequest(prompt="hi", model="openai/gpt-4o")))
+
+        assert chunks == ["ok"]
+        assert completion.call_count == 2
+        sleep.assert_called_once()
+
+    def test_arun_retries_with_async_sleep(self, temp_config_dir, mock_litellm_response) -> None:
+        """arun waits with asyncio.sleep so the event loop isn't blocked."""
+        from orcx.router import arun
+
+        (temp_config_dir / "config.yaml").write_text("retry:\n  max_attempts: 2\n")
+        acompletion = AsyncMock(side_effect=[_rate_limit_error(), mock_litellm_response])
+        with (
+            patch("orcx.router.litellm.acompletion", acompletion),
+            patch("orcx.router.litellm.completion_cost", return_value=0.001),
+            patch("asyncio.sleep", AsyncMock()) as sleep,
+        ):
+            response = asyncio.run(arun(OrcxRequest(prompt="hi", model="openai/gpt-4o")))
+
+        assert response.retries == 1
+        sleep.assert_awaited_once()
+
+
+def _usage_stream(texts: list[str]) -> list:
+    """Real litellm chunks for `texts`, ending with the usage chunk include_usage asks for."""
+    from litellm.types.utils import Delta, ModelResponseStream, StreamingChoices, Usage
+
+    chunks = [
+        ModelResponseStream(
+            id="r", model="gpt-4o", choices=[StreamingChoices(delta=Delta(content=t))]
+        )
+        for t in texts
+    ]
+    usage = Usage(prompt_tokens=10, completion_tokens=len(texts), total_tokens=10 + len(texts))
+    chunks.append(ModelResponseStream(id="r", model="gpt-4o", choices=[], usage=usage))
+    return chunks
+
+
+class TestStreamUsage:
+    """Tests for usage and cost on streamed responses."""
+
+    def test_run_stream_reports_usage(self, temp_config_dir) -> None:
+        """The stream asks for usage and exposes the rebuilt response at the end."""
+        from orcx.router import run_stream
+
+        completion = MagicMock(return_value=iter(_usage_stream(["Hel", "lo"])))
+        with (
+            patch("orcx.router.litellm.completion", completion),
+            patch("orcx.router.litellm.completion_cost", return_value=0.002),
+        ):
+            stream = run_stream(OrcxRequest(prompt="hi", model="openai/gpt-4o"))
+            assert stream.response is None
+            assert list(stream) == ["Hel", "lo"]
+
+        assert completion.call_args.kwargs["stream_options"] == {"include_usage": True}
+        assert stream.response.content == "Hello"
+        assert stream.response.usage == {
+            "prompt_tokens": 10,
+            "completion_tokens": 2,
+            "total_tokens": 12,
+        }
+        assert stream.response.cost == 0.002
+        assert [a.model for a in stream.response.attempts] == ["openai/gpt-4o"]
+
+    def test_arun_stream_reports_usage(self, temp_config_dir) -> None:
+        """The async stream rebuilds usage the same way."""
+        from orcx.router import arun_stream
+
+        async def chunks():
+            for chunk in _usage_stream(["ok"]):
+                yield chunk
+
+        async def collect():
+            stream = arun_stream(OrcxRequest(prompt="hi", model="openai/gpt-4o"))
+            return [c async for c in stream], stream.response
+
+        with patch("orcx.router.litellm.acompletion", AsyncMock(return_value=chunks())):
+            received, response = asyncio.run(collect())
+
+        assert received == ["ok"]
+        assert response.usage["total_tokens"] == 11
+        assert response.cost is not None
+
+    def test_run_stream_closes_provider_stream(self, temp_config_dir, make_chunk) -> None:
+        """Abandoning a stream early closes the provider stream too."""
+        from orcx.router import run_stream
+
+        provider = MagicMock()
+        provider.__iter__.return_value = iter([make_chunk("Hel"), make_chunk("lo")])
+        with patch("orcx.router.litellm.completion", return_value=provider):
+            stream = run_stream(OrcxRequest(prompt="hi", model="openai/gpt-4o"))
+            assert next(stream) == "Hel"
+            stream.close()
+
+        provider.close.assert_called_once()
+
+    def test_unbuildable_chunks_keep_content(self, temp_config_dir, make_chunk) -> None:
+        """Chunks litellm can't rebuild still produce a response, without usage."""
+        from orcx.router import run_stream
+
+        completion = MagicMock(return_value=iter([make_chunk("ok")]))
+        with (
+            patch("orcx.router.litellm.completion", completion),
+            patch("orcx.router.litellm.stream_chunk_builder", side_effect=ValueError),
+        ):
+            stream = run_stream(OrcxRequest(prompt="hi", model="openai/gpt-4o"))
+            assert list(stream) == ["ok"]
+
+        assert stream.response.content == "ok"
+        assert stream.response.usage is None
+
+
+class TestTimings:
+    """Tests for per-request phase timings."""
+
+    def test_run_times_phases(self, temp_config_dir, mock_litellm_response) -> None:
+        """Blocking runs time each phase; send and first token only exist when streaming."""
+        from orcx.router import run
+
+        with (
+            patch("orcx.router.litellm.completion", return_value=mock_litellm_response),
+            patch("orcx.router.litellm.completion_cost", return_value=0.0),
+        ):
+            timings = run(OrcxRequest(prompt="hi", model="openai/gpt-4o")).timings
+
+        assert timings is not None
+        for phase in ("imports", "resolve", "messages", "generation", "total"):
+            assert getattr(timings, phase) >= 0
+        assert timings.send is None
+        assert timings.ttft is None
+        assert timings.total >= timings.generation
+        assert timings.tokens_per_second == pytest.approx(20 / timings.generation)
+
+    def test_stream_times_first_token(self, temp_config_dir) -> None:
+        """Streams record time to first token, and tokens/sec over the rest."""
+        import time
+
+        from orcx.router import run_stream
+
+        def slow_chunks():
+            for chunk in _usage_stream(["a", "b", "c"]):
+                time.sleep(0.02)
+                yield chunk
+
+        with (
+            patch("orcx.router.litellm.completion", return_value=slow_chunks()),
+            patch("orcx.router.litellm.completion_cost", return_value=0.0),
+        ):
+            stream = run_stream(OrcxRequest(prompt="hi", model="openai/gpt-4o"))
+            assert list(stream) == ["a", "b", "c"]
+
+        timings = stream.response.timings
+        assert timings.send <= timings.ttft < timings.generation <= timings.total
+        assert timings.ttft >= 0.02
+        assert timings.tokens_per_second == pytest.approx(3 / (timings.generation - timings.ttft))
+
+    def test_cache_hit_has_fresh_timings(
+        self, temp_config_dir, temp_cache, mock_litellm_response
+    ) -> None:
+        """A cached response reports this request's timings, not the original's."""
+        from orcx.router import run
+
+        request = OrcxRequest(prompt="hi", model="openai/gpt-4o")
+        with (
+            patch("orcx.router.litellm.completion", return_value=mock_litellm_response),
+            patch("orcx.router.litellm.completion_cost", return_value=0.0),
+        ):
+            run(request, cache=True)
+            hit = run(request, cache=True)
+
+        assert hit.cached
+        assert hit.timings.send is None
+        assert hit.timings.total is not None
+
+
+class TestPromptCaching:
+    """Tests for cache_prefix markers and prompt-cache usage reporting."""
+
+    def test_no_markers_by_default(self) -> None:
+        """Without cache_prefix, message content stays plain text."""
+        from orcx.router import build_messages
+
+        request = OrcxRequest(prompt="q", system_prompt="sys", context="ctx")
+        messages = build_messages(request, None)
+        assert all(isinstance(m["content"], str) for m in messages)
+
+    def test_marks_system_and_context(self) -> None:
+        """cache_prefix puts breakpoints on the system prompt and context only."""
+        from orcx.router import build_messages
+
+        request = OrcxRequest(prompt="q", system_prompt="sys", context="ctx", cache_prefix=True)
+        system, context, ack, prompt = build_messages(request, None, [])
+        assert system["content"] == [
+            {"type": "text", "text": "sys", "cache_control": {"type": "ephemeral"}}
+        ]
+        assert context["content"][0]["text"] == "ctx"
+        assert context["content"][0]["cache_control"] == {"type": "ephemeral"}
+        assert ack["content"] == "Understood."
+        assert prompt["content"] == "q"
+
+    def test_agent_enables_cache_prefix(self) -> None:
+        """An agent's cache_prefix applies to its requests."""
+        from orcx.router import build_messages
+        from orcx.schema import AgentConfig
+
+        agent = AgentConfig(name="a", model="anthropic/x", system_prompt="sys", cache_prefix=True)
+        [system, _] = build_messages(OrcxRequest(prompt="q"), agent)
+        assert system["content"][0]["cache_control"] == {"type": "ephemeral"}
+
+    def test_reports_anthropic_cache_tokens(self) -> None:
+        """Anthropic cache read/write counts land in usage."""
+        import litellm
+
+        from orcx.router import _prompt_cache_usage
+
+        usage = litellm.Usage(
+            prompt_tokens=100,
+            completion_tokens=5,
+            total_tokens=105,
+            cache_read_input_tokens=80,
+            cache_creation_input_tokens=20,
+        )
+        assert _prompt_cache_usage(usage) == {"cache_read_tokens": 80, "cache_write_tokens": 20}
+
+    def test_reports_openai_cached_tokens(self) -> None:
+        """OpenAI-style prompt_tokens_details.cached_tokens counts as a cache read."""
+        import litellm
+
+        from orcx.router import _prompt_cache_usage
+
+        usage = litellm.Usage(
+            prompt_tokens=100,
+            completion_tokens=5,
+            total_tokens=105,
+            prompt_tokens_details={"cached_tokens": 64},
+        )
+        assert _prompt_cache_usage(usage) == {"cache_read_tokens": 64}
+
+    def test_omits_counts_when_absent(self, mock_litellm_response) -> None:
+        """Nothing is added when the provider reports no cache activity."""
+        from orcx.router import _prompt_cache_usage
+
+        assert _prompt_cache_usage(mock_litellm_response.usage) == {}
+
+
+def _history(turns: int, words: int = 50) -> list[dict]:
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "content": f"question {i} " + "word " * words})
+        history.append({"role": "assistant", "content": f"answer {i} " + "word " * words})
+    return history
+
+
+class TestHistoryBudget:
+    """Tests for history truncation in build_messages."""
+
+    def test_keeps_everything_within_budget(self, temp_config_dir) -> None:
+        """Short conversations are sent unchanged."""
+        from orcx.router import build_messages
+
+        history = _history(3)
+        messages = build_messages(OrcxRequest(prompt="q"), None, history, "openai/gpt-4o")
+        assert messages == [*history, {"role": "user", "content": "q"}]
+
+    def test_fitting_history_counted_once(self, temp_config_dir) -> None:
+        """A history within budget costs one token count, not one per message."""
+        from orcx import router
+        from orcx.router import build_messages
+
+        with patch(
+            "orcx.router.litellm.token_counter", wraps=router.litellm.token_counter
+        ) as token_counter:
+            build_messages(OrcxRequest(prompt="q"), None, _history(20), "openai/gpt-4o")
+        assert token_counter.call_count == 1
+
+    def test_drops_oldest_turns_first(self, temp_config_dir) -> None:
+        """Over budget, whole turns are dropped from the front of the history."""
+        from orcx.router import build_messages
+
+        (temp_config_dir / "config.yaml").write_text("history:\n  max_tokens: 300\n")
+        history = _history(10)
+        messages = build_messages(OrcxRequest(prompt="q"), None, history, "openai/gpt-4o")
+
+        assert len(messages) < len(history) + 1
+        assert messages[0]["role"] == "user"
+        assert messages[-2:] == [history[-1], {"role": "user", "content": "q"}]
+        assert messages[:-1] == history[len(history) - len(messages) + 1 :]
+
+    def test_pins_system_and_context(self, temp_config_dir) -> None:
+        """The system prompt and context survive truncation by default."""
+        from orcx.router import build_messages
+
+        (temp_config_dir / "config.yaml").write_text("history:\n  max_tokens: 300\n")
+        request = OrcxRequest(prompt="q", system_prompt="sys", context="ctx")
+        messages = build_messages(request, None, _history(10), "openai/gpt-4o")
+
+        assert [m["content"] for m in messages[:3]] == ["sys", "ctx", "Understood."]
+        assert len(messages) < 3 + 20 + 1
+
+    def test_unpinned_prefix_slides_out(self, temp_config_dir) -> None:
+        """With pin_prefix off, the system prompt and context are dropped like old turns."""
+        from orcx.router import build_messages
+
+        (temp_config_dir / "config.yaml").write_text(
+            "history:\n  max_tokens: 300\n  pin_prefix: false\n"
+        )
+        request = OrcxRequest(prompt="q", system_prompt="sys", context="ctx")
+        messages = build_messages(request, None, _history(10), "openai/gpt-4o")
+
+        assert messages[0]["role"] == "user"
+        assert "sys" not in [m["content"] for m in messages]
+
+    def test_budget_from_context_window(self, temp_config_dir) -> None:
+        """Without max_tokens, the budget is the model's window minus reply room."""
+        from orcx.router import get_history_policy, history_budget
+        from orcx.schema import AgentConfig
+
+        agent = AgentConfig(name="a", model="openai/gpt-4o", max_tokens=1000)
+        policy = get_history_policy(agent)
+        with patch(
+            "orcx.router.litellm.get_model_info", return_value={"max_input_tokens": 128000}
+        ):
+            assert history_budget("openai/gpt-4o", OrcxRequest(prompt="q"), agent, policy) == 127000
+            assert history_budget("openai/gpt-4o", OrcxRequest(prompt="q"), None, policy) == 123904
+
+    def test_unknown_model_is_not_truncated(self, temp_config_dir) -> None:
+        """Models without context metadata get their full history."""
+        from orcx.router import build_messages
+
+        history = _history(10)
+        with patch("orcx.router.litellm.get_model_info", side_effect=Exception("unknown")):
+            messages = build_messages(OrcxRequest(prompt="q"), None, history, "custom/model")
+        assert len(messages) == len(history) + 1
+
+    def test_agent_overrides_global_policy(self, temp_config_dir) -> None:
+        """Agent history fields override the global policy field by field."""
+        from orcx.router import get_history_policy
+        from orcx.schema import AgentConfig, HistoryPolicy
+
+        (temp_config_dir / "config.yaml").write_text("history:\n  max_tokens: 500\n")
+        agent = AgentConfig(
+            name="a", model="openai/gpt-4o", history=HistoryPolicy(pin_prefix=False)
+        )
+        policy = get_history_policy(agent)
+        assert policy.max_tokens == 500
+        assert policy.pin_prefix is False
@@ -0,0 +1,74 @@
+"""Cold-start guards for CLI subcommands.
+
+Each subcommand is run in a fresh interpreter under `python -X importtime`,
+so regressions in the import graph (e.g. litellm pulled in eagerly) fail here.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Modules that must never load for commands that don't call a model
+HEAVY_MODULES = {"litellm", "openai", "tiktoken", "tokenizers"}
+
+# Cumulative import budget per subcommand (microseconds); override for slow CI
+IMPORT_BUDGET_US = int(os.environ.get("ORCX_IMPORT_BUDGET_US", "2000000"))
+
+
+def _import_profile(args: list[str], home: Path) -> list[tuple[str, int]]:
+    """Run `orcx ARGS` with -X importtime; return (module, cumulative_us) in import order.
+
+    Nested imports keep their leading indentation so top-level entries can be told apart.
+    """
+    env = {**os.environ, "HOME": str(home)}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "orcx.cli", *args],
+        capture_output=True,
+        text=True,
+        env=env,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+
+    profile: list[tuple[str, int]] = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        profile.append((name[1:].rstrip(), int(cumulative)))
+    return profile
+
+
+def _orcx_import_time(profile: list[tuple[str, int]]) -> int:
+    """Sum top-level import time from the first orcx import onward (skips interpreter startup)."""
+    top_level = [(name, us) for name, us in profile if not name.startswith(" ")]
+    start = next(i for i, (name, _) in enumerate(top_level) if name.startswith("orcx"))
+    return sum(us for _, us in top_level[start:])
+
+
+@pytest.mark.parametrize(
+    "args",
+    [["--version"], ["agents"], ["models"], ["conversations"]],
+    ids=["version", "agents", "models", "conversations"],
+)
+class TestColdStart:
+    """Commands that never call a model must not import litellm."""
+
+    def test_no_heavy_imports(self, args: list[str], tmp_path: Path) -> None:
+        profile = _import_profile(args, tmp_path)
+        loaded = {name.strip().split(".")[0] for name, _ in profile}
+        assert not loaded & HEAVY_MODULES
+
+    def test_within_import_budget(self, args: list[str], tmp_path: Path) -> None:
+        profile = _import_profile(args, tmp_path)
+        assert _orcx_import_time(profile) <= IMPORT_BUDGET_US
+
+
+def test_router_import_defers_litellm() -> None:
+    """Importing the router must not import litellm until a completion is made."""
+    code = "import sys, orcx.router; sys.exit('litellm' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, timeout=60)
+    assert result.returncode == 0
@@ -0,0 +1,127 @@
+"""Tests for the streaming output sink, plus a throughput benchmark."""
+
+import io
+import itertools
+import os
+import threading
+import time
+from collections.abc import Iterator
+
+import pytest
+
+from orcx.errors import OutputError
+from orcx.stream import StreamSink
+
+# Minimum sink throughput (MB/s) for the benchmark, far above any provider's
+# token rate; override for slow CI
+MIN_THROUGHPUT_MBPS = float(os.environ.get("ORCX_STREAM_MIN_MBPS", "2"))
+
+
+def _fake_chunks(total: int, size: int = 4) -> Iterator[str]:
+    """Token-sized chunks, like a provider stream, adding up to `total` characters."""
+    piece = "abcdefghij"[:size]
+    for _ in range(total // size):
+        yield piece
+
+
+class TestStreamSink:
+    def test_coalesces_small_chunks(self) -> None:
+        """Chunks are held until the size threshold, then written together."""
+        writes: list[str] = []
+        with StreamSink(writes.append, flush_size=10, flush_interval=60) as sink:
+            for chunk in ("abc", "def", "ghij", "k"):
+                sink.write(chunk)
+            assert writes == ["abcdefghij"]
+        assert writes == ["abcdefghij", "k"]
+        assert sink.content == "abcdefghijk"
+
+    def test_flushes_after_interval(self) -> None:
+        """A slow stream is written chunk by chunk once the interval has passed."""
+        clock = itertools.count(0, 1.0)
+        writes: list[str] = []
+        sink = StreamSink(
+            writes.append, flush_size=1000, flush_interval=0.5, clock=lambda: next(clock)
+        )
+        sink.write("a")
+        sink.write("b")
+        assert writes == ["a", "b"]
+
+    def test_flushes_during_stall(self) -> None:
+        """Text buffered just before the provider pauses is written without waiting for more."""
+        flushed = threading.Event()
+        writes: list[str] = []
+
+        def write(text: str) -> None:
+            writes.append(text)
+            flushed.set()
+
+        with StreamSink(write, flush_size=1000, flush_interval=0.05) as sink:
+            sink.write("a")  # just after the sink started: buffered
+            assert flushed.wait(5)  # no further chunks arrive
+            assert writes == ["a"]
+            sink.write("b")
+        assert "".join(writes) == "ab"
+
+    def test_background_flush_error_is_raised(self) -> None:
+        """A failed background write surfaces on the next call instead of being lost."""
+        failed = threading.Event()
+
+        def write(text: str) -> None:
+            failed.set()
+            raise OSError("terminal gone")
+
+        sink = StreamSink(write, flush_size=1000, flush_interval=0.01)
+        sink.write("a")
+        assert failed.wait(5)
+        with pytest.raises(OSError, match="terminal gone"):
+            sink.close()
+
+    def test_content_includes_pending(self) -> None:
+        """Content is complete even before the final flush."""
+        sink = StreamSink(lambda text: None, flush_size=1000, flush_interval=60)
+        sink.write("partial")
+        assert sink.content == "partial"
+
+    def test_writes_file_incrementally(self, tmp_path) -> None:
+        """The output file holds everything flushed so far, before the sink closes."""
+        path = tmp_path / "out.txt"
+        with StreamSink(lambda text: None, str(path), flush_size=5, flush_interval=60) as sink:
+            sink.write("hello")
+            sink.write(" wor")
+            assert path.read_text() == "hello"
+        assert path.read_text() == "hello wor"
+
+    def test_unwritable_path(self, tmp_path) -> None:
+        """A bad -o path fails before anything is streamed."""
+        with pytest.raises(OutputError, match="Error writing to"):
+            StreamSink(lambda text: None, str(tmp_path / "missing" / "out.txt"))
+
+
+class TestThroughput:
+    def test_sink_throughput(self, tmp_path) -> None:
+        """Benchmark: 4 MB of 4-character chunks to a terminal stand-in and a file.
+
+        Checks that coalescing cuts writes by orders of magnitude and that the
+        sink sustains at least MIN_THROUGHPUT_MBPS.
+        """
+        total = 4 * 1024 * 1024
+        terminal = io.StringIO()
+        writes = 0
+
+        def write(text: str) -> None:
+            nonlocal writes
+            writes += 1
+            terminal.write(text)
+
+        start = time.perf_counter()
+        with StreamSink(write, str(tmp_path / "out.txt")) as sink:
+            for chunk in _fake_chunks(total):
+                sink.write(chunk)
+        elapsed = time.perf_counter() - start
+
+        assert len(sink.content) == total
+        assert terminal.getvalue() == sink.content
+        assert (tmp_path / "out.txt").stat().st_size == total
+        assert writes <= total // 4 // 100
+        throughput = total / elapsed / 1024 / 1024
+        assert throughput >= MIN_THROUGHPUT_MBPS, f"{throughput:.1f} MB/s"